@@ -0,0 +1,25 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """Cursor pagination with a client-chosen page size.
+
+    Pages are fetched with an indexed range on the ordering instead of a
+    COUNT(*) and OFFSET scan, so deep pages cost the same as the first one.
+    The final ordering field breaks ties so the order is stable."""
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class WorkoutPagination(KeysetPagination):
+    ordering = ("-date", "-id")
+
+
+class SetDictPagination(KeysetPagination):
+    ordering = ("set_order", "id")
+
+
+class WeightPagination(KeysetPagination):
+    ordering = ("-date_recorded", "id")
@@ -230,6 +230,8 @@ if DEBUG:
         'user-agent',
         'x-csrftoken',
         'x-requested-with',
+        'if-match',
+        'if-none-match',
     ]
     CORS_ALLOW_METHODS = [
         'DELETE',
@@ -249,6 +251,9 @@ else:
 # Allow credentials for CORS
 CORS_ALLOW_CREDENTIALS = True
 
+# Let the frontend read workout versions for conditional requests
+CORS_EXPOSE_HEADERS = ['ETag']
+
 # Email Configuration for Password Reset
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.5 on 2026-10-18 01:31
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_delta_sync"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="exercise",
+            index=models.Index(
+                django.db.models.functions.text.Lower("name"),
+                name="exercise_name_lower_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="exercise",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["target_muscles"], name="exercise_target_gin_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="exercise",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["synergist_muscles"], name="exercise_synergist_gin_idx"
+            ),
+        ),
+    ]
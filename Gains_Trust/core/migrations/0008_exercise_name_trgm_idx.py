@@ -0,0 +1,20 @@
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_exercise_muscle_indexes"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="exercise",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"], name="exercise_name_trgm_idx", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.5 on 2026-10-18 03:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_exercise_name_trgm_idx"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="exercise",
+            name="exercise_name_lower_idx",
+        ),
+    ]
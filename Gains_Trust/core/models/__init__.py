@@ -1 +1,2 @@
 from .exercise import Exercise
+from .tombstone import Tombstone
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 
 
 class Exercise(models.Model):
@@ -16,5 +17,14 @@ class Exercise(models.Model):
     equipment = ArrayField(models.CharField(max_length=50, blank=True), default=list, blank=True, null=True)
     compound_movement = models.BooleanField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Serves typeahead: substring and fuzzy matches on the name
+            GinIndex(fields=["name"], opclasses=["gin_trgm_ops"], name="exercise_name_trgm_idx"),
+            # Serve "exercises working this muscle" containment/overlap filters
+            GinIndex(fields=["target_muscles"], name="exercise_target_gin_idx"),
+            GinIndex(fields=["synergist_muscles"], name="exercise_synergist_gin_idx"),
+        ]
+
     def __str__(self):
         return f"{self.name}\nDescription: {self.description}"
@@ -0,0 +1,32 @@
+from django.db import models
+from django.utils.timezone import now
+
+
+class Tombstone(models.Model):
+    """Records a deleted row so `/api/sync/` can tell clients to drop it."""
+
+    WORKOUT = "workout"
+    SET = "set"
+    WEIGHT = "weight"
+    KIND_CHOICES = [(WORKOUT, "Workout"), (SET, "Set"), (WEIGHT, "Weight")]
+
+    user = models.ForeignKey(
+        "users.User",
+        on_delete=models.CASCADE,
+        related_name="tombstones",
+        db_index=False,  # Covered by tombstone_user_deleted_idx
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.IntegerField()
+    deleted_at = models.DateTimeField(default=now)
+
+    class Meta:
+        indexes = [
+            # Serves "deleted since cursor" lookups for one user
+            models.Index(
+                fields=["user", "deleted_at"], name="tombstone_user_deleted_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Deleted {self.kind} {self.object_id} ({self.deleted_at})"
@@ -0,0 +1,116 @@
+from functools import lru_cache
+from time import monotonic
+from django.db import connection
+
+# Suggestions returned per list
+EXERCISE_SEARCH_LIMIT = 10
+# Longest query matched; no catalogue name is longer
+EXERCISE_SEARCH_MAX_LENGTH = 85
+# Other processes pick up catalogue changes within this long
+CATALOGUE_SEARCH_CACHE_SECONDS = 5 * 60
+# Fewest shared trigrams, by word similarity, for a fuzzy match
+CATALOGUE_MIN_SIMILARITY = 0.3
+# A user's latest workouts searched for their recent exercises, so each
+# keystroke reads a bounded number of sets however long the history is
+RECENT_EXERCISE_WORKOUTS = 100
+
+
+def _like_pattern(query):
+    """Wraps a query for a substring ILIKE, escaping its wildcards."""
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def search_catalogue(query, limit=EXERCISE_SEARCH_LIMIT):
+    """Returns catalogue exercises matching a typed query, best first.
+
+    Names starting with the query come first, then names containing it,
+    then fuzzy matches by trigram word similarity, so typos still find
+    their exercise; shorter names win ties. All three are served by the
+    trigram GIN index. Results are kept in a per-process LRU, cleared
+    whenever an exercise is saved or deleted in this process and expired
+    for the rest."""
+    query = " ".join(query.split())[:EXERCISE_SEARCH_MAX_LENGTH]
+    if not query:
+        return []
+    generation = int(monotonic() // CATALOGUE_SEARCH_CACHE_SECONDS)
+    return [
+        {"id": exercise_id, "name": name}
+        for exercise_id, name in _search_catalogue(query.lower(), limit, generation)
+    ]
+
+
+@lru_cache(maxsize=1024)
+def _search_catalogue(query, limit, generation):
+    with connection.cursor() as cursor:
+        # ✅ The threshold the `<%` operator (and so the index) uses, sent in
+        # one round trip with the query. Postgres runs the two as one
+        # transaction unless the caller has one open, so `SET LOCAL` ends
+        # with it and never reaches whatever next borrows the connection
+        cursor.execute(
+            f"""
+            SET LOCAL pg_trgm.word_similarity_threshold = {CATALOGUE_MIN_SIMILARITY};
+            SELECT id, name
+            FROM core_exercise
+            WHERE name ILIKE %(pattern)s OR %(query)s <%% name
+            ORDER BY lower(name) LIKE %(prefix)s DESC,
+                     name ILIKE %(pattern)s DESC,
+                     word_similarity(%(query)s, name) DESC,
+                     length(name),
+                     name
+            LIMIT %(limit)s
+            """,
+            {
+                "query": query,
+                "pattern": _like_pattern(query),
+                "prefix": _like_pattern(query)[1:],
+                "limit": limit,
+            },
+        )
+        return tuple(cursor.fetchall())
+
+
+def clear_catalogue_search_cache():
+    _search_catalogue.cache_clear()
+
+
+def recent_exercises(user, query="", limit=EXERCISE_SEARCH_LIMIT):
+    """Returns the exercises a user has logged in their latest
+    `RECENT_EXERCISE_WORKOUTS` workouts, most used first, optionally only
+    those whose name contains `query`.
+
+    Sets linked to the catalogue are listed under the catalogue name, so
+    every spelling of an exercise counts towards one entry."""
+    query = " ".join(query.split())[:EXERCISE_SEARCH_MAX_LENGTH]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT COALESCE(e.name, s.exercise_name) AS name,
+                   s.exercise_id,
+                   COUNT(*) AS uses
+            FROM (
+                -- ✅ Served by workout_user_date_idx
+                SELECT id, date FROM workouts_workout
+                WHERE user_id = %(user_id)s
+                ORDER BY date DESC, id DESC
+                LIMIT %(workouts)s
+            ) w
+            JOIN workouts_setdict s ON s.workout_id = w.id
+            LEFT JOIN core_exercise e ON e.id = s.exercise_id
+            WHERE COALESCE(e.name, s.exercise_name) ILIKE %(pattern)s
+            GROUP BY 1, 2
+            ORDER BY uses DESC, MAX(w.date) DESC, name
+            LIMIT %(limit)s
+            """,
+            {
+                "user_id": user.id,
+                "workouts": RECENT_EXERCISE_WORKOUTS,
+                "pattern": _like_pattern(query),
+                "limit": limit,
+            },
+        )
+        rows = cursor.fetchall()
+    return [
+        {"name": name, "exercise_id": exercise_id, "uses": uses}
+        for name, exercise_id, uses in rows
+    ]
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Exercise
+from .search import clear_catalogue_search_cache
+
+
+@receiver(post_save, sender=Exercise)
+@receiver(post_delete, sender=Exercise)
+def clear_catalogue_search(sender, **kwargs):
+    """Drops cached catalogue searches whenever the catalogue changes."""
+    clear_catalogue_search_cache()
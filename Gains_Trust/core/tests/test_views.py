@@ -1,6 +1,11 @@
 import pytest
+from datetime import timedelta
 from django.urls import reverse
+from django.utils.timezone import now
 from rest_framework.test import APIClient
+from tests.conftest import create_user, user_data, authenticated_client, clear_cache
+from users.models import Weight
+from workouts.models import SetDict, Workout
 
 
 @pytest.fixture
@@ -16,4 +21,380 @@ def test_homepage_view(api_client):
     response = api_client.get(url)
     
     assert response.status_code == 200
-    assert response.data == {"message": "Welcome to Gains Trust API"} 
\ No newline at end of file
+    assert response.data == {"message": "Welcome to Gains Trust API"}
+
+
+@pytest.mark.django_db
+def test_sync_without_cursor_returns_everything(authenticated_client, create_user):
+    """Test that a first sync returns the user's whole history and a cursor."""
+    workout = Workout.objects.create(user=create_user, workout_name="Push Day")
+    SetDict.objects.create(workout=workout, exercise_name="Bench Press")
+    Weight.objects.create(user=create_user, weight=80)
+
+    response = authenticated_client.get(reverse("sync"))
+
+    assert response.status_code == 200
+    assert [w["id"] for w in response.data["workouts"]] == [workout.id]
+    assert len(response.data["sets"]) == 1
+    assert response.data["sets"][0]["set_order"] == 1  # ✅ Position, not sort key
+    assert len(response.data["weights"]) == 1
+    assert response.data["cursor"]
+
+
+@pytest.mark.django_db
+def test_sync_returns_only_changes_since_cursor(
+    authenticated_client, create_user, django_assert_max_num_queries
+):
+    """Test that a delta sync returns just the rows changed and deleted since the cursor."""
+    old = Workout.objects.create(user=create_user, workout_name="Old")
+    old_set = SetDict.objects.create(workout=old, exercise_name="Squat")
+    untouched = Workout.objects.create(user=create_user, workout_name="Untouched")
+    SetDict.objects.create(workout=untouched, exercise_name="Row")
+    gone = Weight.objects.create(user=create_user, weight=80)
+
+    # ✅ Everything so far was synced an hour ago
+    synced_at = now() - timedelta(hours=1)
+    for model in (Workout, SetDict, Weight):
+        model.objects.update(updated_at=synced_at - timedelta(minutes=1))
+    since = synced_at.isoformat()
+
+    old_set.reps = 5
+    old_set.save()
+    new_set = SetDict.objects.create(workout=old, exercise_name="Squat")
+    doomed = SetDict.objects.create(workout=old, exercise_name="Squat")
+    doomed_id = doomed.id
+    doomed.delete()
+    gone_id = gone.id
+    gone.delete()
+
+    with django_assert_max_num_queries(6):
+        response = authenticated_client.get(reverse("sync"), {"since": since})
+
+    assert [w["id"] for w in response.data["workouts"]] == [old.id]
+    assert {s["id"] for s in response.data["sets"]} == {old_set.id, new_set.id}
+    assert response.data["weights"] == []
+    assert response.data["deleted"]["sets"] == [doomed_id]
+    assert response.data["deleted"]["weights"] == [gone_id]
+
+
+@pytest.mark.django_db
+def test_sync_reports_deleted_workouts(authenticated_client, create_user):
+    """Test that deleting a workout leaves a tombstone for the next sync."""
+    workout = Workout.objects.create(user=create_user, workout_name="Push Day")
+    workout_id = workout.id
+    since = (now() - timedelta(minutes=1)).isoformat()
+    workout.delete()
+
+    response = authenticated_client.get(reverse("sync"), {"since": since})
+
+    assert response.data["deleted"]["workouts"] == [workout_id]
+
+
+@pytest.mark.django_db
+def test_sync_rejects_bad_cursor(authenticated_client):
+    """Test that an unreadable cursor is a 400."""
+    response = authenticated_client.get(reverse("sync"), {"since": "yesterday"})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sync_cursor_waits_for_open_writes(authenticated_client, create_user, monkeypatch):
+    """Test that a write stamped before a sync but committed after it is in the next sync."""
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from django.db import connection, transaction
+
+    monkeypatch.setattr("core.views.SYNC_CURSOR_OVERLAP", timedelta(0))
+    workout = Workout.objects.create(user=create_user, workout_name="Push Day")
+    written, synced = threading.Event(), threading.Event()
+
+    def slow_write():
+        try:
+            with transaction.atomic():
+                Workout.objects.select_for_update().get(id=workout.id)
+                Workout.objects.filter(id=workout.id).update(notes="Heavy", updated_at=now())
+                written.set()
+                synced.wait(10)  # ✅ Still uncommitted while the sync runs
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        write = pool.submit(slow_write)
+        assert written.wait(10)
+        first = authenticated_client.get(reverse("sync"))
+        synced.set()
+        write.result()
+
+    assert first.data["workouts"][0]["notes"] != "Heavy"
+    second = authenticated_client.get(reverse("sync"), {"since": first.data["cursor"]})
+    assert [w["notes"] for w in second.data["workouts"]] == ["Heavy"]
+
+
+@pytest.fixture
+def training_history(create_user):
+    """Two dated workouts, the first with two sets, the second with none."""
+    first = Workout.objects.create(user=create_user, workout_name="Push Day", date="2024-01-01")
+    SetDict.objects.create(workout=first, exercise_name="Bench Press", reps=5, loading=100)
+    SetDict.objects.create(workout=first, exercise_name="Bench Press", reps=4, loading=105)
+    second = Workout.objects.create(user=create_user, workout_name="Rest Walk", date="2024-02-01")
+    return first, second
+
+
+def _export(client, **params):
+    response = client.get(reverse("export"), params)
+    return response, b"".join(response)  # ✅ Drains the stream
+
+
+@pytest.mark.django_db
+def test_export_csv_has_a_row_per_set(authenticated_client, training_history):
+    """Test that the CSV export repeats workout columns on every set row."""
+    import csv
+
+    response, body = _export(authenticated_client, format="csv")
+    rows = list(csv.DictReader(body.decode().splitlines()))
+
+    assert response["Content-Type"].startswith("text/csv")
+    assert [row["workout_workout_name"] for row in rows] == ["Push Day", "Push Day", "Rest Walk"]
+    assert [row["set_set_order"] for row in rows] == ["1", "2", ""]
+    assert rows[1]["set_loading"] == "105.0"
+
+
+@pytest.mark.django_db
+def test_export_ndjson_nests_sets(authenticated_client, training_history):
+    """Test that the NDJSON export has one line per workout with its sets."""
+    import json
+
+    _, body = _export(authenticated_client, format="ndjson")
+    workouts = [json.loads(line) for line in body.decode().splitlines()]
+
+    assert [w["workout_name"] for w in workouts] == ["Push Day", "Rest Walk"]
+    assert [s["reps"] for s in workouts[0]["sets"]] == [5, 4]
+    assert workouts[1]["sets"] == []
+
+
+@pytest.mark.django_db
+def test_export_filters_by_date(authenticated_client, training_history):
+    """Test that `from` and `to` limit the export to workouts in that range."""
+    import json
+
+    _, body = _export(authenticated_client, format="ndjson", **{"from": "2024-01-15", "to": "2024-12-31"})
+
+    assert [json.loads(line)["workout_name"] for line in body.decode().splitlines()] == ["Rest Walk"]
+
+
+@pytest.mark.django_db
+def test_export_gzips_when_accepted(authenticated_client, training_history):
+    """Test that the export is compressed on the fly for gzip-capable clients."""
+    import gzip
+
+    response = authenticated_client.get(
+        reverse("export"), {"format": "ndjson"}, HTTP_ACCEPT_ENCODING="gzip, deflate"
+    )
+    body = gzip.decompress(b"".join(response))
+
+    assert response["Content-Encoding"] == "gzip"
+    assert body.decode().count("\n") == 2
+
+
+@pytest.mark.django_db
+def test_export_honours_gzip_q_values(authenticated_client, training_history):
+    """Test that gzip is only used when the client's Accept-Encoding allows it."""
+    for accept_encoding, gzipped in [
+        ("gzip;q=0, deflate", False),
+        ("gzip; q=0.0, *", False),
+        ("deflate, *;q=0.5", True),
+        ("GZIP;q=0.8", True),
+        ("identity", False),
+    ]:
+        response = authenticated_client.get(
+            reverse("export"), {"format": "ndjson"}, HTTP_ACCEPT_ENCODING=accept_encoding
+        )
+        assert response.has_header("Content-Encoding") is gzipped, accept_encoding
+
+
+@pytest.mark.django_db
+def test_export_streams_under_wsgi(authenticated_client, training_history, monkeypatch):
+    """Test that WSGI gets a plain iterator it can send chunk by chunk."""
+    monkeypatch.setattr("core.views.EXPORT_CHUNK_SIZE", 1)
+
+    response = authenticated_client.get(reverse("export"), {"format": "ndjson"})
+    chunks = list(response.streaming_content)
+
+    assert not response.is_async
+    assert len(chunks) == 2  # ✅ One line per chunk, not one buffered body
+
+
+@pytest.mark.django_db(transaction=True)
+def test_export_streams_under_asgi(create_user, training_history, monkeypatch):
+    """Test that ASGI gets an async iterator, gzipped chunk by chunk."""
+    import asyncio
+    import gzip
+    from asgiref.sync import sync_to_async
+    from django.test import AsyncClient
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    monkeypatch.setattr("core.views.EXPORT_CHUNK_SIZE", 1)
+    token = str(AccessToken.for_user(create_user))
+
+    async def export():
+        response = await AsyncClient().get(
+            reverse("export"),
+            {"format": "ndjson"},
+            headers={"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip"},
+        )
+        chunks = [chunk async for chunk in response.streaming_content]
+        await sync_to_async(response.close)()  # ✅ Closes the request's connection
+        return response, chunks
+
+    response, chunks = asyncio.run(export())
+
+    assert response.is_async
+    assert response["Content-Encoding"] == "gzip"
+    assert gzip.decompress(b"".join(chunks)).decode().count("\n") == 2
+
+
+@pytest.mark.django_db
+def test_export_rejects_bad_dates(authenticated_client):
+    """Test that an unreadable date filter is a 400."""
+    response = authenticated_client.get(reverse("export"), {"from": "last week"})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_export_can_be_imported_again(authenticated_client, training_history, create_user):
+    """Test that a CSV export uploads back into an identical history."""
+    from django.core.files.uploadedfile import SimpleUploadedFile
+
+    _, body = _export(authenticated_client, format="csv")
+    Workout.objects.filter(user=create_user).delete()
+
+    response = authenticated_client.post(
+        reverse("import"),
+        {"file": SimpleUploadedFile("export.csv", body, content_type="text/csv")},
+        format="multipart",
+    )
+
+    assert response.status_code == 201
+    assert (response.data["workouts"], response.data["sets"]) == (2, 2)
+    assert list(
+        SetDict.objects.filter(workout__user=create_user)
+        .order_by("set_order")
+        .values_list("reps", flat=True)
+    ) == [5, 4]
+
+
+@pytest.mark.django_db
+def test_import_requires_a_file(authenticated_client):
+    """Test that an upload without a file is a 400."""
+    response = authenticated_client.post(reverse("import"), {}, format="multipart")
+
+    assert response.status_code == 400
+
+
+@pytest.fixture
+def exercise_catalogue(db):
+    """A small catalogue with shared words, for typeahead ordering."""
+    from core.models import Exercise
+
+    return {
+        name: Exercise.objects.create(name=name)
+        for name in ["Squat", "Front Squat", "Split Squat", "Bench Press", "Deadlift"]
+    }
+
+
+@pytest.mark.django_db
+def test_exercise_search_ranks_catalogue_matches(authenticated_client, exercise_catalogue):
+    """Test that prefix matches lead, then substrings, and typos still match."""
+    response = authenticated_client.get(reverse("exercise-search"), {"q": "squ"})
+
+    assert response.status_code == 200
+    assert [match["name"] for match in response.data["catalogue"]] == [
+        "Squat", "Front Squat", "Split Squat"
+    ]
+
+    response = authenticated_client.get(reverse("exercise-search"), {"q": "Sqat"})
+    assert response.data["catalogue"][0]["name"] == "Squat"  # ✅ Fuzzy by trigram
+
+
+@pytest.mark.django_db(transaction=True)
+def test_exercise_search_threshold_stays_in_its_query(exercise_catalogue):
+    """Test that the fuzzy match threshold is not left set on the connection."""
+    from django.db import connection
+    from core.search import search_catalogue
+
+    assert search_catalogue("sqat")[0]["name"] == "Squat"
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT current_setting('pg_trgm.word_similarity_threshold')")
+        assert cursor.fetchone()[0] == "0.6"  # ✅ pg_trgm's default
+
+
+@pytest.mark.django_db
+def test_exercise_search_cache_expires(exercise_catalogue, monkeypatch):
+    """Test that cached results expire, for catalogue changes this process never saw."""
+    from core import search
+    from core.models import Exercise
+
+    clock = [100.0 * search.CATALOGUE_SEARCH_CACHE_SECONDS]
+    monkeypatch.setattr(search, "monotonic", lambda: clock[0])
+    assert search.search_catalogue("row") == []
+
+    # ✅ No signals, like a change made by another process
+    Exercise.objects.bulk_create([Exercise(name="Barbell Row")])
+    clock[0] += search.CATALOGUE_SEARCH_CACHE_SECONDS - 1
+    assert search.search_catalogue("row") == []
+
+    clock[0] += 1
+    assert [match["name"] for match in search.search_catalogue("row")] == ["Barbell Row"]
+
+
+@pytest.mark.django_db
+def test_exercise_search_ranks_recent_by_use(
+    authenticated_client, create_user, exercise_catalogue
+):
+    """Test that the user's exercises are ranked by use, with spellings merged."""
+    workout = Workout.objects.create(user=create_user, workout_name="Legs")
+    for name in ["squat", "Squat ", "Squat", "Split Squat", "Goblet Squat", "Goblet Squat"]:
+        SetDict.objects.create(workout=workout, exercise_name=name)
+    SetDict.objects.create(workout=workout, exercise_name="Bench Press")
+
+    response = authenticated_client.get(reverse("exercise-search"), {"q": "squat"})
+
+    assert response.data["recent"] == [
+        {"name": "Squat", "exercise_id": exercise_catalogue["Squat"].id, "uses": 3},
+        {"name": "Goblet Squat", "exercise_id": None, "uses": 2},  # ❌ Not catalogued
+        {"name": "Split Squat", "exercise_id": exercise_catalogue["Split Squat"].id, "uses": 1},
+    ]
+
+
+@pytest.mark.django_db
+def test_recent_exercises_only_read_latest_workouts(create_user, monkeypatch):
+    """Test that recent exercises come from the user's latest workouts only."""
+    from core.search import recent_exercises
+
+    monkeypatch.setattr("core.search.RECENT_EXERCISE_WORKOUTS", 2)
+    for date, name in [("2024-01-01", "Deadlift"), ("2024-02-01", "Squat"), ("2024-03-01", "Row")]:
+        workout = Workout.objects.create(user=create_user, workout_name="Gym", date=date)
+        SetDict.objects.create(workout=workout, exercise_name=name)
+
+    assert [match["name"] for match in recent_exercises(create_user)] == ["Row", "Squat"]
+
+
+@pytest.mark.django_db
+def test_exercise_search_caches_catalogue_until_it_changes(
+    authenticated_client, exercise_catalogue, django_assert_num_queries
+):
+    """Test that repeat searches skip the catalogue query until an exercise is saved."""
+    from core.models import Exercise
+
+    authenticated_client.get(reverse("exercise-search"), {"q": "row"})
+    with django_assert_num_queries(1):  # ✅ Only the user's recent exercises
+        response = authenticated_client.get(reverse("exercise-search"), {"q": "row"})
+    assert response.data["catalogue"] == []
+
+    Exercise.objects.create(name="Barbell Row")
+    response = authenticated_client.get(reverse("exercise-search"), {"q": "row"})
+
+    assert [match["name"] for match in response.data["catalogue"]] == ["Barbell Row"]
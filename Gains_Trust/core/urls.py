@@ -1,6 +1,10 @@
 from django.urls import path
-from .views import homepage
+from .views import exercise_search, export, homepage, import_history, sync
 
 urlpatterns = [
     path("", homepage, name="homepage"),
+    path("sync/", sync, name="sync"),
+    path("export/", export, name="export"),
+    path("import/", import_history, name="import"),
+    path("exercises/search/", exercise_search, name="exercise-search"),
 ]
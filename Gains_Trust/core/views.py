@@ -1,5 +1,47 @@
-from rest_framework.decorators import api_view
+import csv
+import io
+import json
+import zlib
+from datetime import timedelta
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import is_naive, make_aware, now
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from users.models import Weight
+from users.serializers import WeightSerializer
+from workouts.models import SetDict, Workout
+from workouts.importing import import_workouts
+from workouts.ordering import attach_positions
+from workouts.serializers import SetDictSerializer, WorkoutSerializer
+from Gains_Trust.renderers import CSVRenderer, NDJSONRenderer
+from .models import Tombstone
+from .search import recent_exercises, search_catalogue
+
+# Timestamps are taken from the app servers' clocks, a little before the
+# transaction writing them starts, so each cursor also overlaps the previous
+# sync by this much; clients upsert by id
+SYNC_CURSOR_OVERLAP = timedelta(seconds=5)
+
+# Rows fetched per round trip from the export's server-side cursor, and
+# output lines handed to the response at a time
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_WORKOUT_FIELDS = [
+    "id", "workout_name", "date", "complete", "start_time", "duration",
+    "user_weight", "sleep_score", "sleep_quality", "notes",
+]
+EXPORT_SET_FIELDS = [
+    "id", "exercise_name", "set_number", "set_type", "loading", "reps",
+    "rest", "focus", "notes", "complete", "set_start_time", "set_duration",
+]
 
 # Create your views here.
 
@@ -7,3 +49,306 @@ from rest_framework.response import Response
 @api_view(["GET"])
 def homepage(request):
     return Response({"message": "Welcome to Gains Trust API"})
+
+
+def sync_cursor(sync_started):
+    """Returns the cursor for a sync that started at `sync_started`.
+
+    A row is stamped when it is written but only seen once its transaction
+    commits, so a long transaction can commit rows stamped well before a
+    sync that missed them. The cursor therefore goes back to the start of
+    the oldest transaction still writing, as rows it commits later can be
+    stamped no earlier than that. Must run before the sync reads anything."""
+    with connection.cursor() as cursor:
+        # ✅ Every app connection logs in as one role, so all are visible here
+        cursor.execute(
+            """
+            SELECT min(xact_start) FROM pg_stat_activity
+            WHERE datname = current_database()
+              AND backend_xid IS NOT NULL
+              AND pid <> pg_backend_pid()
+            """
+        )
+        (oldest_write,) = cursor.fetchone()
+    if oldest_write is not None:
+        sync_started = min(sync_started, oldest_write)
+    return sync_started - SYNC_CURSOR_OVERLAP
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def sync(request):
+    """Returns the user's workouts, sets and weights changed since `since`,
+    plus the ids of any deleted since then, and the cursor for next time.
+
+    Without `since` everything is returned, for a first sync. A workout's
+    `updated_at` moves whenever one of its sets changes, so sets are only
+    read for the workouts that changed."""
+    since = request.query_params.get("since")
+
+    if since:
+        since = parse_datetime(since)
+        if since is None:
+            return Response(
+                {"error": "since must be a cursor returned by a previous sync"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if is_naive(since):
+            since = make_aware(since)
+
+    cursor = sync_cursor(now())
+    workouts = Workout.objects.filter(user=request.user)
+    weights = Weight.objects.filter(user=request.user)
+    tombstones = Tombstone.objects.filter(user=request.user)
+    if since:
+        workouts = workouts.filter(updated_at__gt=since)
+        weights = weights.filter(updated_at__gt=since)
+        tombstones = tombstones.filter(deleted_at__gt=since)
+
+    workouts = list(workouts.select_related("summary").order_by("updated_at", "id"))
+    sets = SetDict.objects.filter(workout__in=[workout.id for workout in workouts])
+    if since:
+        sets = sets.filter(updated_at__gt=since)
+    sets = attach_positions(list(sets.order_by("workout_id", "set_order", "id")))
+
+    deleted = {kind: [] for kind, _ in Tombstone.KIND_CHOICES}
+    for kind, object_id in tombstones.values_list("kind", "object_id"):
+        deleted[kind].append(object_id)
+
+    return Response(
+        {
+            "cursor": cursor.isoformat(),
+            "workouts": WorkoutSerializer(workouts, many=True).data,
+            "sets": SetDictSerializer(sets, many=True).data,
+            "weights": WeightSerializer(
+                weights.order_by("updated_at", "id"), many=True
+            ).data,
+            "deleted": {
+                "workouts": deleted[Tombstone.WORKOUT],
+                "sets": deleted[Tombstone.SET],
+                "weights": deleted[Tombstone.WEIGHT],
+            },
+        },
+        status=status.HTTP_200_OK,
+    )
+
+
+def export_rows(user, date_from=None, date_to=None):
+    """Yields `(workout, set)` dict pairs for a user's history, oldest first,
+    from one LEFT JOIN read through a server-side cursor. A workout without
+    sets yields once, with `None` for its set.
+
+    Each set gets `set_order`: its 1-based position in the workout."""
+    workouts = Workout.objects.filter(user=user)
+    if date_from:
+        workouts = workouts.filter(date__gte=date_from)
+    if date_to:
+        workouts = workouts.filter(date__lte=date_to)
+
+    set_columns = [f"set_dicts__{field}" for field in EXPORT_SET_FIELDS]
+    rows = (
+        workouts.order_by("date", "id", "set_dicts__set_order", "set_dicts__id")
+        .values_list(*EXPORT_WORKOUT_FIELDS, *set_columns)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+    workout_width = len(EXPORT_WORKOUT_FIELDS)
+    current_id, position = None, 0
+    for row in rows:
+        workout = dict(zip(EXPORT_WORKOUT_FIELDS, row[:workout_width]))
+        position = position + 1 if workout["id"] == current_id else 1
+        current_id = workout["id"]
+
+        set_values = row[workout_width:]
+        if set_values[0] is None:
+            yield workout, None
+        else:
+            yield workout, {"set_order": position, **dict(zip(EXPORT_SET_FIELDS, set_values))}
+
+
+def export_csv_lines(rows):
+    """Yields CSV lines, one per set, repeating the workout's columns."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    set_columns = ["set_order", *EXPORT_SET_FIELDS]
+
+    def line(values):
+        writer.writerow(values)
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    yield line(
+        [f"workout_{field}" for field in EXPORT_WORKOUT_FIELDS]
+        + [f"set_{field}" for field in set_columns]
+    )
+    for workout, set_dict in rows:
+        workout_values = [workout[field] for field in EXPORT_WORKOUT_FIELDS]
+        set_values = [set_dict[field] if set_dict else None for field in set_columns]
+        yield line(workout_values + set_values)
+
+
+def export_ndjson_lines(rows):
+    """Yields one JSON line per workout, with its sets nested in order."""
+    current = None
+    for workout, set_dict in rows:
+        if current is None or current["id"] != workout["id"]:
+            if current is not None:
+                yield json.dumps(current, cls=DjangoJSONEncoder) + "\n"
+            current = {**workout, "sets": []}
+        if set_dict:
+            current["sets"].append(set_dict)
+    if current is not None:
+        yield json.dumps(current, cls=DjangoJSONEncoder) + "\n"
+
+
+def export_chunks(lines):
+    """Joins a line generator into encoded chunks of `EXPORT_CHUNK_SIZE` lines."""
+    try:
+        while chunk := "".join(islice(lines, EXPORT_CHUNK_SIZE)):
+            yield chunk.encode()
+    finally:
+        lines.close()  # ✅ Release the cursor on disconnect
+
+
+def gzip_chunks(chunks):
+    """Gzips a byte stream chunk by chunk as it is sent."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    try:
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+    finally:
+        chunks.close()
+
+
+async def stream_async(chunks):
+    """Serves a synchronous chunk generator to an ASGI server.
+
+    Each chunk is produced by `sync_to_async`, which keeps every step on the
+    request's database thread, so the server-side cursor stays open. WSGI
+    servers iterate the generator itself; an async one would be buffered."""
+    next_chunk = sync_to_async(lambda: next(chunks, None))
+    try:
+        while (chunk := await next_chunk()) is not None:
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close)()
+
+
+def accepts_gzip(accept_encoding):
+    """Whether an `Accept-Encoding` header allows gzip, honouring q-values,
+    so `gzip;q=0` refuses it, and the `*` wildcard."""
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, *params = item.split(";")
+        weight = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name.lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.strip().lower()] = weight
+    return weights.get("gzip", weights.get("*", 0.0)) > 0
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@renderer_classes([CSVRenderer, NDJSONRenderer])
+def export(request):
+    """Streams the user's full training history as CSV (default) or NDJSON.
+
+    Filter by workout date with `from` and `to` (YYYY-MM-DD, inclusive).
+    Memory stays flat however long the history is, under WSGI or ASGI, and
+    the stream is gzipped on the fly when the client accepts it."""
+    date_range = {}
+    for param in ("from", "to"):
+        value = request.query_params.get(param)
+        if value:
+            try:
+                date_range[param] = parse_date(value)
+            except ValueError:
+                date_range[param] = None
+            if date_range[param] is None:
+                return Response(
+                    {param: "Must be a date in YYYY-MM-DD format."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+    rows = export_rows(request.user, date_range.get("from"), date_range.get("to"))
+    export_format = request.accepted_renderer.format
+    if export_format == "ndjson":
+        lines = export_ndjson_lines(rows)
+    else:
+        lines = export_csv_lines(rows)
+
+    content = export_chunks(lines)
+    gzipped = accepts_gzip(request.headers.get("Accept-Encoding", ""))
+    if gzipped:
+        content = gzip_chunks(content)
+    if isinstance(request._request, ASGIRequest):
+        content = stream_async(content)
+
+    response = StreamingHttpResponse(
+        content, content_type=request.accepted_renderer.media_type
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="gains-trust-export.{export_format}"'
+    )
+    if gzipped:
+        response["Content-Encoding"] = "gzip"
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def import_history(request):
+    """Imports a Strong, Hevy or Gains Trust CSV export, uploaded as `file`.
+
+    Weights are taken as kg unless `unit` is `lb`. Rows that can't be read
+    are skipped and listed in `errors` with their line numbers."""
+    upload = request.FILES.get("file")
+    if upload is None:
+        return Response(
+            {"file": "A CSV file is required."}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    unit = request.data.get("unit", "kg")
+    if unit not in ("kg", "lb"):
+        return Response(
+            {"unit": "Must be kg or lb."}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    # ✅ Read the upload as a stream of text lines, never all at once
+    lines = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+    try:
+        summary = import_workouts(request.user, lines, unit=unit)
+    except (ValueError, csv.Error) as error:
+        return Response({"file": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(summary, status=status.HTTP_201_CREATED)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def exercise_search(request):
+    """Suggests exercises for the set editor as the user types `q`.
+
+    `recent` lists the user's own logged exercises containing `q`, most
+    used first; `catalogue` lists matching catalogue exercises, fuzzily,
+    best match first. Without `q` only the user's recent exercises are
+    returned."""
+    query = request.query_params.get("q", "")
+    return Response(
+        {
+            "query": query,
+            "recent": recent_exercises(request.user, query),
+            "catalogue": search_catalogue(query),
+        }
+    )
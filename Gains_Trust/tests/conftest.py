@@ -1,10 +1,21 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from core.search import clear_catalogue_search_cache
 from rest_framework.test import APIClient, APIRequestFactory
 
 User = get_user_model()
 
 
+# Each test rolls back its rows, so nothing cached from them may outlive it
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Fixture to start every test with empty caches"""
+    cache.clear()
+    clear_catalogue_search_cache()
+    yield
+
+
 # Fixture to return APIClient instance
 @pytest.fixture
 def api_client():
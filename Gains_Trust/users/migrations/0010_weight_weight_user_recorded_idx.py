@@ -0,0 +1,19 @@
+# Generated by Django 5.1.5 on 2026-10-18 00:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0009_delete_userrecord"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="weight",
+            index=models.Index(
+                fields=["user", "-date_recorded", "id"], name="weight_user_recorded_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.5 on 2026-10-18 00:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0010_weight_weight_user_recorded_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="weight",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="weights",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.5 on 2026-10-18 00:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0011_alter_weight_user"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="weight",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="weight",
+            index=models.Index(
+                fields=["user", "updated_at"], name="weight_user_updated_idx"
+            ),
+        ),
+    ]
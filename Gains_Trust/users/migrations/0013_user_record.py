@@ -0,0 +1,101 @@
+# Generated by Django 5.1.5 on 2026-10-18 01:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_delta_sync"),
+        ("users", "0012_delta_sync"),
+        ("workouts", "0019_setdict_workout_exercise_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserRecord",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("exercise_name", models.CharField(max_length=255)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("weight", "Heaviest weight for a rep count"),
+                            ("e1rm", "Best estimated one-rep max"),
+                            ("volume", "Most volume in one session"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("value", models.FloatField()),
+                (
+                    "weight",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=10, null=True
+                    ),
+                ),
+                ("reps", models.IntegerField(blank=True, null=True)),
+                ("date", models.DateField()),
+                (
+                    "exercise",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="user_records",
+                        to="core.exercise",
+                    ),
+                ),
+                (
+                    "set_dict",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="user_records",
+                        to="workouts.setdict",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="user_records",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["user", "exercise_name", "kind", "reps"],
+                        name="userrecord_user_exercise_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("kind", "weight")),
+                        fields=("user", "exercise_name", "reps"),
+                        name="userrecord_one_weight_per_reps",
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(("kind", "weight"), _negated=True),
+                        fields=("user", "exercise_name", "kind"),
+                        name="userrecord_one_per_kind",
+                    ),
+                ],
+            },
+        ),
+    ]
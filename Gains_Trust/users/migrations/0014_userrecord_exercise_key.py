@@ -0,0 +1,73 @@
+# Generated by Django 5.1.5 on 2026-10-18 02:11
+
+from django.db import migrations, models
+
+# Links records through the set holding them, names them after the catalogue,
+# then keeps only the best record of each kind per exercise. Session volumes
+# split across spellings are merged by the `backfill_records` command.
+MERGE_RECORDS_BY_EXERCISE = """
+    UPDATE users_userrecord AS r SET exercise_id = s.exercise_id
+    FROM workouts_setdict AS s
+    WHERE s.id = r.set_dict_id AND s.exercise_id IS NOT NULL;
+
+    UPDATE users_userrecord AS r SET exercise_name = e.name
+    FROM core_exercise AS e
+    WHERE e.id = r.exercise_id AND r.exercise_name <> e.name;
+
+    DELETE FROM users_userrecord AS r
+    USING users_userrecord AS better
+    WHERE better.user_id = r.user_id
+      AND better.exercise_id = r.exercise_id
+      AND better.kind = r.kind
+      AND (r.kind <> 'weight' OR better.reps = r.reps)
+      AND (better.value > r.value OR (better.value = r.value AND better.id < r.id));
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_exercise_muscle_indexes"),
+        ("users", "0013_user_record"),
+        ("workouts", "0021_setdict_workout_exercise_idx_concurrently"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="userrecord",
+            name="userrecord_one_weight_per_reps",
+        ),
+        migrations.RemoveConstraint(
+            model_name="userrecord",
+            name="userrecord_one_per_kind",
+        ),
+        migrations.RunSQL(MERGE_RECORDS_BY_EXERCISE, migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name="userrecord",
+            constraint=models.UniqueConstraint(
+                models.F("user"),
+                models.F("exercise"),
+                models.Case(
+                    models.When(exercise__isnull=True, then=models.F("exercise_name"))
+                ),
+                models.F("reps"),
+                condition=models.Q(("kind", "weight")),
+                name="userrecord_one_weight_per_reps",
+                nulls_distinct=False,
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="userrecord",
+            constraint=models.UniqueConstraint(
+                models.F("user"),
+                models.F("exercise"),
+                models.Case(
+                    models.When(exercise__isnull=True, then=models.F("exercise_name"))
+                ),
+                models.F("kind"),
+                condition=models.Q(("kind", "weight"), _negated=True),
+                name="userrecord_one_per_kind",
+                nulls_distinct=False,
+            ),
+        ),
+    ]
@@ -54,33 +54,111 @@ class PasswordResetToken(models.Model):
 
 class Weight(models.Model):
     user = models.ForeignKey(
-        "users.User", on_delete=models.CASCADE, related_name="weights"
+        "users.User",
+        on_delete=models.CASCADE,
+        related_name="weights",
+        db_index=False,  # Covered by weight_user_recorded_idx
     )
     weight = models.DecimalField(max_digits=5, decimal_places=2)
     date_recorded = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Serves the weight list's keyset pagination on (-date_recorded, id)
+            models.Index(
+                fields=["user", "-date_recorded", "id"],
+                name="weight_user_recorded_idx",
+            ),
+            # Serves delta sync: a user's weights changed since a cursor
+            models.Index(
+                fields=["user", "updated_at"], name="weight_user_updated_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.weight}kg on {self.date_recorded.strftime('%Y-%m-%d')}"
 
 
-# TODO: Uncomment when Exercise model is properly implemented
-# class UserRecord(models.Model):
-#     user = models.ForeignKey(
-#         User, on_delete=models.CASCADE, related_name="user_records"
-#     )
-#     exercise = models.ForeignKey(
-#         "core.Exercise", on_delete=models.CASCADE, related_name="user_records"
-#     )
-#     set_dict = models.ForeignKey(
-#         "workouts.SetDict",
-#         on_delete=models.CASCADE,
-#         related_name="user_records",
-#         null=True,
-#         blank=True,
-#     )
-#     weight = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
-#     reps = models.IntegerField(blank=True, null=True)
-#     date = models.DateTimeField(auto_now_add=True)
-#
-#     def __str__(self):
-#         return f"{self.exercise.name} - {self.weight}kg x {self.reps} reps"
+# A user's exercise, as sets are grouped: the catalogue exercise, or the
+# name for uncatalogued ones
+RECORD_EXERCISE_KEY = (
+    "user",
+    "exercise",
+    models.Case(models.When(exercise__isnull=True, then=models.F("exercise_name"))),
+)
+
+
+class UserRecord(models.Model):
+    """A user's personal record on one exercise, kept current as sets are
+    completed: the heaviest weight for each rep count, the best estimated
+    1RM, and the most volume in a single session."""
+
+    WEIGHT = "weight"
+    ESTIMATED_1RM = "e1rm"
+    SESSION_VOLUME = "volume"
+    KIND_CHOICES = [
+        (WEIGHT, "Heaviest weight for a rep count"),
+        (ESTIMATED_1RM, "Best estimated one-rep max"),
+        (SESSION_VOLUME, "Most volume in one session"),
+    ]
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="user_records",
+        db_index=False,  # Covered by userrecord_user_exercise_idx
+    )
+    # Linked when the set's exercise is in the catalogue, which then names the
+    # record; records are keyed by the exercise, or by the name when unlinked
+    exercise = models.ForeignKey(
+        "core.Exercise",
+        on_delete=models.SET_NULL,
+        related_name="user_records",
+        null=True,
+        blank=True,
+    )
+    exercise_name = models.CharField(max_length=255)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    # The set that set the record; for session volume, the session's last set
+    set_dict = models.ForeignKey(
+        "workouts.SetDict",
+        on_delete=models.CASCADE,
+        related_name="user_records",
+        null=True,
+        blank=True,
+    )
+    # The record itself: kg lifted, estimated kg, or kg × reps for the session
+    value = models.FloatField()
+    weight = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    reps = models.IntegerField(blank=True, null=True)
+    date = models.DateField()
+
+    class Meta:
+        indexes = [
+            # Serves the records list: all of a user's records in one range scan
+            models.Index(
+                fields=["user", "exercise_name", "kind", "reps"],
+                name="userrecord_user_exercise_idx",
+            ),
+        ]
+        constraints = [
+            # One weight record per rep count, one of each other kind per exercise
+            models.UniqueConstraint(
+                *RECORD_EXERCISE_KEY,
+                "reps",
+                condition=models.Q(kind="weight"),
+                nulls_distinct=False,
+                name="userrecord_one_weight_per_reps",
+            ),
+            models.UniqueConstraint(
+                *RECORD_EXERCISE_KEY,
+                "kind",
+                condition=~models.Q(kind="weight"),
+                nulls_distinct=False,
+                name="userrecord_one_per_kind",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.exercise_name} - {self.weight}kg x {self.reps} reps"
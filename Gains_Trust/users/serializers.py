@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import Weight
+from .models import UserRecord, Weight
 from django.contrib.auth.password_validation import validate_password
 
 User = get_user_model()
@@ -49,6 +49,23 @@ class WeightSerializer(serializers.ModelSerializer):
         fields = ["id", "weight", "date_recorded"]
 
 
+class UserRecordSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UserRecord
+        fields = [
+            "id",
+            "exercise",
+            "exercise_name",
+            "kind",
+            "value",
+            "weight",
+            "reps",
+            "date",
+            "set_dict",
+        ]
+        read_only_fields = fields
+
+
 class PasswordResetRequestSerializer(serializers.Serializer):
     email = serializers.EmailField()
 
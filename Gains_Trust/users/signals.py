@@ -1,6 +1,9 @@
 from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
+from core.models import Tombstone
+from .models import Weight
 
 User = get_user_model()
 
@@ -9,3 +12,17 @@ User = get_user_model()
 def update_login_history(sender, request, user, **kwargs):
     """Runs every time a user logs in and updates login history."""
     user.track_login()  # Custom method
+
+
+@receiver(post_delete, sender=Weight)
+def record_weight_tombstone(sender, instance, **kwargs):
+    """Leaves a tombstone so delta sync can tell clients the weight is gone."""
+    Tombstone.objects.create(
+        user_id=instance.user_id, kind=Tombstone.WEIGHT, object_id=instance.pk
+    )
+
+
+@receiver(post_delete, sender=User)
+def clear_user_tombstones(sender, instance, **kwargs):
+    """Drops tombstones left by the user's own cascade, which nobody will sync."""
+    Tombstone.objects.filter(user_id=instance.pk).delete()
@@ -8,7 +8,8 @@ from tests.conftest import (
     test_request,
     api_client,
     factory,
-    authenticated_client
+    authenticated_client,
+    clear_cache,
 )
 
 User = get_user_model()
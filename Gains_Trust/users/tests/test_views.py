@@ -144,6 +144,19 @@ def test_weight_list_pagination(authenticated_client, create_weight):
     assert isinstance(response.data["results"], list)  # ✅ Ensure results is a list
 
 
+@pytest.mark.django_db
+def test_weight_list_cursor_pagination(authenticated_client, create_user):
+    """Test that weight entries page by cursor, newest first, with a chosen size."""
+    weights = [Weight.objects.create(user=create_user, weight=80 + i) for i in range(3)]
+
+    response = authenticated_client.get(reverse("weights-list"), {"page_size": 2})
+
+    assert response.status_code == 200
+    assert [w["id"] for w in response.data["results"]] == [weights[2].id, weights[1].id]
+    response = authenticated_client.get(response.data["next"])
+    assert [w["id"] for w in response.data["results"]] == [weights[0].id]
+
+
 @pytest.mark.django_db
 def test_weight_cannot_be_created_without_auth(api_client):
     """Test that an unauthenticated user cannot create a weight entry."""
@@ -433,3 +446,29 @@ def test_password_reset_with_user_having_first_name(api_client):
     assert len(mail.outbox) == 1
     assert "John" in mail.outbox[0].body
 
+
+
+@pytest.mark.django_db
+def test_delete_own_account_clears_history(authenticated_client, create_user):
+    """Test that deleting an account removes its workouts and sets in bulk."""
+    from core.models import Tombstone
+    from workouts.models import SetDict, Workout
+
+    workout = Workout.objects.create(user=create_user, workout_name="Push Day")
+    SetDict.objects.create(workout=workout, exercise_name="Bench Press")
+
+    response = authenticated_client.delete(reverse("users-detail", args=[create_user.id]))
+
+    assert response.status_code == 204
+    assert not User.objects.filter(id=create_user.id).exists()
+    assert not SetDict.objects.exists()
+    assert not Tombstone.objects.exists()
+
+
+@pytest.mark.django_db
+def test_cannot_delete_another_account(authenticated_client, create_user_2):
+    """Test that a user can't delete someone else's account."""
+    response = authenticated_client.delete(reverse("users-detail", args=[create_user_2.id]))
+
+    assert response.status_code == 403
+    assert User.objects.filter(id=create_user_2.id).exists()
@@ -1,5 +1,6 @@
 from django.urls import path, include
 from .views import (
+    UserRecordViewSet,
     UserViewSet,
     WeightViewSet,
     check_availability,
@@ -13,6 +14,7 @@ from rest_framework.routers import DefaultRouter
 router = DefaultRouter()
 router.register(r"users", UserViewSet, basename="users")
 router.register(r"weights", WeightViewSet, basename="weights")
+router.register(r"records", UserRecordViewSet, basename="records")
 
 
 urlpatterns = [
@@ -2,10 +2,13 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.decorators import api_view, action, permission_classes
 from rest_framework.response import Response
-from .serializers import UserSerializer, WeightSerializer, PasswordResetRequestSerializer, PasswordResetConfirmSerializer
-from .models import Weight, PasswordResetToken
+from .serializers import UserSerializer, UserRecordSerializer, WeightSerializer, PasswordResetRequestSerializer, PasswordResetConfirmSerializer
+from .models import UserRecord, Weight, PasswordResetToken
+from Gains_Trust.pagination import WeightPagination
+from workouts.deletion import delete_user
+from workouts.exercises import exercise_id_for_name
 from django.contrib.auth import get_user_model, authenticate, login as django_login
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 from django.utils.timezone import now
 from django.core.mail import send_mail
 from django.conf import settings
@@ -195,6 +198,16 @@ class UserViewSet(ModelViewSet):
             )
         return super().update(request, *args, **kwargs)
 
+    def destroy(self, request, *args, **kwargs):
+        """Deletes the user's own account, clearing their workouts in bulk."""
+        user = self.get_object()
+        if user != request.user:
+            return Response(
+                {"error": "You can only delete your own account."}, status=403
+            )
+        delete_user(user)
+        return Response(status=204)
+
 
 # Weight ViewSet
 
@@ -205,6 +218,7 @@ class WeightViewSet(ModelViewSet):
     queryset = Weight.objects.all().order_by("-date_recorded")
     serializer_class = WeightSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = WeightPagination
 
     def get_queryset(self):
         """Ensure users only see their own weight entries."""
@@ -213,3 +227,30 @@ class WeightViewSet(ModelViewSet):
     def perform_create(self, serializer):
         """Assigns the logged-in user when creating a weight entry."""
         serializer.save(user=self.request.user)
+
+
+# Personal Records ViewSet
+
+
+class UserRecordViewSet(ReadOnlyModelViewSet):
+    """Lists the user's personal records, kept up to date as sets are completed.
+
+    Filter to one exercise with `?exercise_name=`. Records are read in one
+    range scan of the user's records, without touching their sets."""
+
+    serializer_class = UserRecordSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = None  # ✅ A handful of rows per exercise
+
+    def get_queryset(self):
+        """Ensure users only see their own records."""
+        queryset = UserRecord.objects.filter(user=self.request.user)
+        exercise_name = self.request.query_params.get("exercise_name")
+        if exercise_name:
+            # ✅ Catalogued exercises match however the name was typed
+            exercise_id = exercise_id_for_name(exercise_name)
+            if exercise_id is not None:
+                queryset = queryset.filter(exercise_id=exercise_id)
+            else:
+                queryset = queryset.filter(exercise__isnull=True, exercise_name=exercise_name)
+        return queryset.order_by("exercise_name", "kind", "reps")
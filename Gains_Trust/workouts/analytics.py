@@ -0,0 +1,333 @@
+from datetime import timedelta
+import numpy as np
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, F, FloatField, Max, Sum
+from django.db.models.functions import Coalesce
+from django.utils.timezone import now
+from .exercises import exercise_id_for_name
+from .models import SetDict, Workout
+
+# Groupings for progress series: one point per workout, or per calendar period
+PROGRESS_BUCKETS = ("session", "day", "week", "month")
+# Most points a series is returned with, and the default
+MAX_PROGRESS_POINTS = 1000
+DEFAULT_PROGRESS_POINTS = 200
+
+# Epley's estimate; a single rep is its own one-rep max
+ESTIMATED_1RM_SQL = (
+    "CASE WHEN s.reps = 1 THEN s.loading ELSE s.loading * (1 + s.reps / 30.0) END"
+)
+
+
+def exercise_progress(
+    user, exercise_name, bucket="session", points=DEFAULT_PROGRESS_POINTS,
+    date_from=None, date_to=None,
+):
+    """Returns a user's progress on one exercise over time, oldest first.
+
+    Completed sets with a load and reps are grouped per workout (`session`)
+    or per day, week or month of the workout date. Each point has the best
+    set by estimated 1RM, that estimate, total volume and reps. Series
+    longer than `points` are downsampled by merging neighbouring buckets.
+    Runs as one grouped query, whatever the length of the history."""
+    if bucket not in PROGRESS_BUCKETS:
+        raise ValueError(f"Unknown bucket: {bucket}")
+    if bucket == "session":
+        period = "w.date"
+        group_key = "w.id"
+    else:
+        period = f"date_trunc('{bucket}', w.date)::date"
+        group_key = period
+
+    filters = []
+    params = {
+        "user_id": user.id,
+        "exercise_name": exercise_name,
+        "exercise_id": exercise_id_for_name(exercise_name),
+        "points": points,
+    }
+    # ✅ Catalogued exercises match however the name was typed
+    if params["exercise_id"] is None:
+        # ✅ Matches the partial setdict_workout_name_idx
+        same_exercise = "s.exercise_id IS NULL AND s.exercise_name = %(exercise_name)s"
+    else:
+        same_exercise = "s.exercise_id = %(exercise_id)s"
+    if date_from:
+        filters.append("w.date >= %(date_from)s")
+        params["date_from"] = date_from
+    if date_to:
+        filters.append("w.date <= %(date_to)s")
+        params["date_to"] = date_to
+
+    sql = f"""
+        WITH sets AS (
+            SELECT {period} AS period,
+                   {group_key} AS group_key,
+                   w.id AS workout_id,
+                   s.loading,
+                   s.reps,
+                   {ESTIMATED_1RM_SQL} AS estimated_1rm
+            FROM workouts_setdict s
+            JOIN workouts_workout w ON w.id = s.workout_id
+            WHERE w.user_id = %(user_id)s
+              AND {same_exercise}
+              AND s.complete
+              AND s.loading IS NOT NULL
+              AND s.reps IS NOT NULL
+              {"".join(f" AND {condition}" for condition in filters)}
+        ),
+        buckets AS (
+            SELECT MIN(period) AS period,
+                   COUNT(DISTINCT workout_id) AS sessions,
+                   COUNT(*) AS sets,
+                   MAX(estimated_1rm) AS estimated_1rm,
+                   (ARRAY_AGG(loading ORDER BY estimated_1rm DESC, loading DESC))[1] AS best_loading,
+                   (ARRAY_AGG(reps ORDER BY estimated_1rm DESC, loading DESC))[1] AS best_reps,
+                   SUM(loading * reps) AS volume,
+                   SUM(reps) AS reps
+            FROM sets
+            GROUP BY group_key
+        ),
+        tiles AS (
+            SELECT *, NTILE(%(points)s) OVER (ORDER BY period) AS tile
+            FROM buckets
+        )
+        SELECT MIN(period),
+               SUM(sessions)::int,
+               SUM(sets)::int,
+               MAX(estimated_1rm),
+               (ARRAY_AGG(best_loading ORDER BY estimated_1rm DESC, best_loading DESC))[1],
+               (ARRAY_AGG(best_reps ORDER BY estimated_1rm DESC, best_loading DESC))[1],
+               SUM(volume),
+               SUM(reps)::bigint
+        FROM tiles
+        GROUP BY tile
+        ORDER BY tile
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    return [
+        {
+            "date": period,
+            "sessions": sessions,
+            "sets": sets,
+            "best_set": {"loading": best_loading, "reps": best_reps},
+            "estimated_1rm": round(estimated_1rm, 2),
+            "volume": round(volume, 2),
+            "reps": reps,
+        }
+        for (
+            period, sessions, sets, estimated_1rm, best_loading, best_reps, volume, reps
+        ) in rows
+    ]
+
+
+# Rolling windows for training load, in days
+ACUTE_LOAD_DAYS = 7
+CHRONIC_LOAD_DAYS = 28
+# Computed load series are cached until one of the user's workouts changes
+TRAINING_LOAD_CACHE_SECONDS = 60 * 60 * 24
+
+
+def _rolling_sum(values, window):
+    """Sums each day with the `window - 1` days before it, via a cumulative sum."""
+    totals = np.cumsum(np.concatenate([np.zeros(window), values]))
+    return totals[window:] - totals[:-window]
+
+
+def _divide(numerator, denominator):
+    """Elementwise division that yields NaN wherever the denominator is zero."""
+    result = np.full(numerator.shape, np.nan)
+    np.divide(numerator, denominator, out=result, where=denominator != 0)
+    return result
+
+
+def _series(values, decimals=2):
+    """A JSON-ready list, with NaN as None."""
+    rounded = np.round(values, decimals).astype(object)
+    rounded[~np.isfinite(values)] = None
+    return rounded.tolist()
+
+
+def _workouts_stamp(user):
+    """Changes whenever any of the user's workouts or their sets change,
+    as every such write moves the workout's `updated_at`, and deleting a
+    workout changes the count."""
+    stamp = Workout.objects.filter(user=user).aggregate(
+        changed=Max("updated_at"), count=Count("id")
+    )
+    changed = stamp["changed"].timestamp() if stamp["changed"] else 0
+    return f"{changed}-{stamp['count']}"
+
+
+def training_load(user, date_from=None, date_to=None):
+    """Returns a user's daily training load with rolling windows, as columns.
+
+    Daily load is the volume (loading × reps) and the `set_duration` of
+    completed sets. Acute load is the last 7 days' volume and chronic load
+    the weekly average over the last 28 days; their ratio is the
+    acute:chronic workload ratio. Monotony is the 7-day mean daily volume
+    over its standard deviation, and strain is acute load × monotony.
+
+    Days come from one grouped query; the windows are computed with NumPy
+    over every day of the history, so `from` never cuts a window short.
+    The series runs to `to`, or to today.
+    Results are cached per user until one of their workouts changes."""
+    # ✅ Without `to` the series runs to today, so the day is part of the key
+    date_to = date_to or now().date()
+    cache_key = (
+        f"training_load:{user.id}:{_workouts_stamp(user)}:{date_from}:{date_to}"
+    )
+    result = cache.get(cache_key)
+    if result is None:
+        result = _compute_training_load(user, date_from, date_to)
+        cache.set(cache_key, result, TRAINING_LOAD_CACHE_SECONDS)
+    return result
+
+
+def _compute_training_load(user, date_from, date_to):
+    sets = SetDict.objects.filter(workout__user=user, complete=True)
+    if date_from:
+        # ✅ Only the days the first window looks back over are needed
+        sets = sets.filter(
+            workout__date__gte=date_from - timedelta(days=CHRONIC_LOAD_DAYS - 1)
+        )
+    sets = sets.filter(workout__date__lte=date_to)
+    rows = list(
+        sets.values_list("workout__date")
+        .annotate(
+            volume=Coalesce(
+                Sum(F("loading") * F("reps"), output_field=FloatField()), 0.0
+            ),
+            duration=Coalesce(Sum("set_duration"), 0),
+        )
+        .order_by("workout__date")
+    )
+
+    empty = {
+        "from": date_from, "to": date_to, "days": [], "volume": [], "duration": [],
+        "acute_load": [], "chronic_load": [], "acwr": [], "monotony": [],
+        "strain": [], "acute_duration": [], "chronic_duration": [],
+    }
+    if not rows:
+        return empty
+
+    dates, volumes, durations = (np.array(column) for column in zip(*rows))
+    dates = dates.astype("datetime64[D]")
+    first = dates[0] if date_from is None else min(dates[0], np.datetime64(date_from))
+    days = np.arange(first, np.datetime64(date_to) + 1)
+
+    # ✅ Spread the training days over a calendar of every day, rest days at 0
+    offsets = (dates - first).astype(int)
+    volume = np.zeros(len(days))
+    volume[offsets] = volumes
+    duration = np.zeros(len(days))
+    duration[offsets] = durations
+
+    acute = _rolling_sum(volume, ACUTE_LOAD_DAYS)
+    chronic = _rolling_sum(volume, CHRONIC_LOAD_DAYS) * ACUTE_LOAD_DAYS / CHRONIC_LOAD_DAYS
+    mean = acute / ACUTE_LOAD_DAYS
+    variance = _rolling_sum(volume**2, ACUTE_LOAD_DAYS) / ACUTE_LOAD_DAYS - mean**2
+    monotony = _divide(mean, np.sqrt(np.clip(variance, 0, None)))
+    acute_duration = _rolling_sum(duration, ACUTE_LOAD_DAYS)
+    chronic_duration = (
+        _rolling_sum(duration, CHRONIC_LOAD_DAYS) * ACUTE_LOAD_DAYS / CHRONIC_LOAD_DAYS
+    )
+
+    shown = days >= np.datetime64(date_from) if date_from else slice(None)
+    return {
+        **empty,
+        "days": days[shown].astype(str).tolist(),
+        "volume": _series(volume[shown]),
+        "duration": _series(duration[shown], 0),
+        "acute_load": _series(acute[shown]),
+        "chronic_load": _series(chronic[shown]),
+        "acwr": _series(_divide(acute, chronic)[shown]),
+        "monotony": _series(monotony[shown]),
+        "strain": _series((acute * monotony)[shown]),
+        "acute_duration": _series(acute_duration[shown], 0),
+        "chronic_duration": _series(chronic_duration[shown]),
+    }
+
+
+# Share of a set credited to each synergist muscle; target muscles get all of it
+SYNERGIST_WEIGHT = 0.5
+
+
+def muscle_volume(user, date_from=None, date_to=None, muscle=None):
+    """Returns weekly completed sets and volume per muscle, oldest week first.
+
+    Sets join the exercise catalogue through their linked exercise. Each set
+    counts in full for the exercise's target muscles (or its muscle group,
+    when no targets are listed) and as `SYNERGIST_WEIGHT` of a set for its
+    synergists. Sets of exercises missing from the catalogue are left out.
+    `muscle` keeps only that muscle, narrowing the catalogue by GIN index."""
+    filters, params = [], {
+        "user_id": user.id,
+        "synergist_weight": SYNERGIST_WEIGHT,
+        "muscle": muscle,
+    }
+    if date_from:
+        filters.append("w.date >= %(date_from)s")
+        params["date_from"] = date_from
+    if date_to:
+        filters.append("w.date <= %(date_to)s")
+        params["date_to"] = date_to
+    exercise_filter = ""
+    if muscle:
+        exercise_filter = (
+            "AND (e.target_muscles && ARRAY[%(muscle)s]::varchar[]"
+            " OR e.synergist_muscles && ARRAY[%(muscle)s]::varchar[]"
+            " OR e.muscle_group = %(muscle)s)"
+        )
+
+    sql = f"""
+        WITH sets AS (
+            SELECT date_trunc('week', w.date)::date AS week,
+                   s.exercise_id,
+                   COUNT(*) AS sets,
+                   COALESCE(SUM(s.loading * s.reps), 0) AS volume
+            FROM workouts_setdict s
+            JOIN workouts_workout w ON w.id = s.workout_id
+            WHERE w.user_id = %(user_id)s
+              AND s.complete
+              AND s.exercise_id IS NOT NULL
+              {"".join(f" AND {condition}" for condition in filters)}
+            GROUP BY 1, 2
+        )
+        SELECT sets.week,
+               worked.muscle,
+               SUM(sets.sets * worked.weight),
+               SUM(sets.volume * worked.weight)
+        FROM sets
+        JOIN core_exercise e ON e.id = sets.exercise_id
+        CROSS JOIN LATERAL (
+            -- A muscle listed as both target and synergist counts once, in full
+            SELECT muscle, MAX(weight) AS weight
+            FROM (
+                SELECT unnest(
+                    CASE WHEN cardinality(e.target_muscles) > 0 THEN e.target_muscles
+                         ELSE ARRAY[e.muscle_group]::varchar[] END
+                ) AS muscle, 1.0 AS weight
+                UNION ALL
+                SELECT unnest(e.synergist_muscles), %(synergist_weight)s
+            ) listed
+            WHERE muscle <> ''
+            GROUP BY muscle
+        ) worked
+        WHERE (%(muscle)s IS NULL OR worked.muscle = %(muscle)s)
+          {exercise_filter}
+        GROUP BY sets.week, worked.muscle
+        ORDER BY sets.week, worked.muscle
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    return [
+        {"week": week, "muscle": name, "sets": round(sets, 2), "volume": round(volume, 2)}
+        for week, name, sets, volume in rows
+    ]
@@ -0,0 +1,63 @@
+from django.db import connection, transaction
+from core.models import Tombstone
+from .models import Workout
+from .records import rebuild_user_records
+
+
+def delete_workouts(workouts, rebuild_records=True):
+    """Deletes the given workouts, their sets, summaries and the records those
+    sets held, one DELETE each.
+
+    Sets of a workout that is going away need no renumbering, version bumps
+    or tombstones of their own, so no per-set signals are sent. Each workout
+    still leaves a tombstone for delta sync, and users who lost a record
+    have their records rebuilt from the sets left, unless `rebuild_records`
+    is off. Returns the number deleted."""
+    with transaction.atomic():
+        # ✅ Same lock as set writes, taken in id order to avoid deadlocks
+        rows = list(
+            Workout.objects.filter(id__in=workouts.values("id"))
+            .select_for_update()
+            .order_by("id")
+            .values_list("id", "user_id")
+        )
+        if not rows:
+            return 0
+
+        workout_ids = [workout_id for workout_id, _ in rows]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM users_userrecord WHERE set_dict_id IN ("
+                "SELECT id FROM workouts_setdict WHERE workout_id = ANY(%s)) "
+                "RETURNING user_id",
+                [workout_ids],
+            )
+            record_user_ids = {user_id for (user_id,) in cursor.fetchall()}
+            cursor.execute(
+                "DELETE FROM workouts_workoutsummary WHERE workout_id = ANY(%s)",
+                [workout_ids],
+            )
+            cursor.execute(
+                "DELETE FROM workouts_setdict WHERE workout_id = ANY(%s)",
+                [workout_ids],
+            )
+            cursor.execute(
+                "DELETE FROM workouts_workout WHERE id = ANY(%s)", [workout_ids]
+            )
+
+        Tombstone.objects.bulk_create(
+            [
+                Tombstone(user_id=user_id, kind=Tombstone.WORKOUT, object_id=workout_id)
+                for workout_id, user_id in rows
+            ]
+        )
+        if rebuild_records and record_user_ids:
+            rebuild_user_records(sorted(record_user_ids))
+    return len(rows)
+
+
+def delete_user(user):
+    """Deletes a user, clearing their training history in bulk first."""
+    with transaction.atomic():
+        delete_workouts(Workout.objects.filter(user=user), rebuild_records=False)
+        user.delete()
@@ -0,0 +1,203 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections
+
+logger = logging.getLogger(__name__)
+
+# One Postgres channel carries every workout's events; each payload names
+# its workout, so a process needs a single LISTEN however many streams it serves
+WORKOUT_EVENTS_CHANNEL = "workout_events"
+
+# Events a slow stream can fall behind by before newer ones are dropped;
+# every event carries the workout's version, so clients can spot the gap
+STREAM_QUEUE_SIZE = 100
+
+# Events held back by `deferred_workout_events`, if a block is collecting them
+_deferred_events = ContextVar("deferred_workout_events", default=None)
+
+
+def publish_workout_event(workout_id, event, **data):
+    """Sends a live-session event to every stream following the workout.
+
+    Uses Postgres NOTIFY, so it reaches streams in every worker process and
+    is only delivered if the surrounding transaction commits. The payload
+    carries the workout's version as of this write. Inside
+    `deferred_workout_events` the event is collected instead."""
+    deferred = _deferred_events.get()
+    if deferred is not None:
+        deferred.append((workout_id, event, data))
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT pg_notify(%s, json_build_object(
+                'workout', id, 'version', version, 'event', %s, 'data', %s::json
+            )::text)
+            FROM workouts_workout WHERE id = %s
+            """,
+            [
+                WORKOUT_EVENTS_CHANNEL,
+                event,
+                json.dumps(data, cls=DjangoJSONEncoder),
+                workout_id,
+            ],
+        )
+
+
+@contextmanager
+def deferred_workout_events():
+    """Collects the events published in the block, in order, instead of
+    sending them, so they can go out together with `send_workout_events`."""
+    events = []
+    token = _deferred_events.set(events)
+    try:
+        yield events
+    finally:
+        _deferred_events.reset(token)
+
+
+def send_workout_events(events, versions):
+    """Sends collected `(workout_id, event, data)` events in one statement,
+    each carrying its workout's entry in `versions`."""
+    if not events:
+        return
+    payloads = [
+        json.dumps(
+            {
+                "workout": workout_id,
+                "version": versions.get(workout_id),
+                "event": event,
+                "data": data,
+            },
+            cls=DjangoJSONEncoder,
+        )
+        for workout_id, event, data in events
+    ]
+    with connection.cursor() as cursor:
+        # ✅ Rows come out in array order, so streams see events as published
+        cursor.execute(
+            "SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload",
+            [WORKOUT_EVENTS_CHANNEL, payloads],
+        )
+
+
+class WorkoutEventHub:
+    """Fans notifications from one LISTEN connection out to the streams
+    subscribed to each workout, within one process and event loop.
+
+    The connection is opened for the first subscriber, on a worker thread
+    as connecting blocks, and closed after the last one leaves. It is read
+    from the event loop without a thread: `poll()` is only called once the
+    socket is readable, so it consumes data already received."""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.subscribers = defaultdict(set)
+        self.listener = None
+        self.connecting = asyncio.Lock()
+
+    async def subscribe(self, workout_id):
+        """Returns a queue receiving the workout's events until unsubscribed."""
+        queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        # ✅ Counted before connecting, so another stream leaving meanwhile
+        # doesn't close the connection being opened
+        self.subscribers[workout_id].add(queue)
+        try:
+            async with self.connecting:  # ✅ One connection for concurrent first streams
+                if self.listener is None:
+                    await self._listen()
+        except BaseException:
+            self.unsubscribe(workout_id, queue)
+            raise
+        return queue
+
+    def unsubscribe(self, workout_id, queue):
+        queues = self.subscribers.get(workout_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[workout_id]
+        if not self.subscribers:
+            self._close()
+
+    async def _listen(self):
+        params = connections["default"].get_connection_params()
+        listener = await self.loop.run_in_executor(None, self._connect, params)
+        if not self.subscribers:
+            listener.close()  # ✅ Every stream left while connecting
+            return
+        self.listener = listener
+        self.loop.add_reader(listener.fileno(), self._read)
+
+    @staticmethod
+    def _connect(params):
+        listener = psycopg2.connect(**params)
+        listener.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with listener.cursor() as cursor:
+            cursor.execute(f"LISTEN {WORKOUT_EVENTS_CHANNEL}")
+        return listener
+
+    def _read(self):
+        try:
+            self.listener.poll()
+        except psycopg2.Error:
+            logger.exception("Lost the workout events connection")
+            self._disconnect_all()
+            return
+
+        while self.listener.notifies:
+            notify = self.listener.notifies.pop(0)
+            try:
+                event = json.loads(notify.payload)
+            except ValueError:
+                continue
+            for queue in self.subscribers.get(event.get("workout"), ()):
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    pass  # ❌ Slow stream: it resyncs from the version gap
+
+    def _disconnect_all(self):
+        """Ends every stream, so clients reconnect and get a fresh snapshot."""
+        for queues in self.subscribers.values():
+            for queue in queues:
+                # ✅ Events still queued are stale once the snapshot is refetched,
+                # and dropping them makes room for the end marker on full queues
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+        self.subscribers.clear()
+        self._close()
+
+    def _close(self):
+        if self.listener is None:
+            return
+        try:
+            self.loop.remove_reader(self.listener.fileno())
+            self.listener.close()
+        except (psycopg2.Error, ValueError):
+            pass
+        self.listener = None
+
+
+_hubs = {}
+
+
+def get_event_hub():
+    """Returns this process's hub for the running event loop."""
+    loop = asyncio.get_running_loop()
+    hub = _hubs.get(loop)
+    if hub is None:
+        # ✅ Forget hubs of loops that have since closed (e.g. between tests)
+        for stale in [other for other in _hubs if other.is_closed()]:
+            del _hubs[stale]
+        hub = _hubs[loop] = WorkoutEventHub(loop)
+    return hub
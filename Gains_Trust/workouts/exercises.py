@@ -0,0 +1,54 @@
+from django.core.cache import cache
+from core.models import Exercise
+
+EXERCISE_IDS_CACHE_KEY = "exercise_ids_by_name"
+# Other processes pick up catalogue changes within this long
+EXERCISE_IDS_CACHE_SECONDS = 5 * 60
+
+# The columns sets are grouped by: the catalogue exercise, or the name for
+# uncatalogued sets. Matches `exercise_key`
+EXERCISE_KEY_SQL = "exercise_id, CASE WHEN exercise_id IS NULL THEN exercise_name END"
+
+
+def normalize_exercise_name(name):
+    """Folds case and runs of whitespace, so "Squat" and " squat " match."""
+    return " ".join((name or "").split()).lower()
+
+
+def exercise_ids_by_name():
+    """Returns the catalogue as a mapping of normalized name to exercise id.
+
+    Cached, and dropped whenever an exercise is saved or deleted."""
+    mapping = cache.get(EXERCISE_IDS_CACHE_KEY)
+    if mapping is None:
+        mapping = {}
+        for exercise_id, name in Exercise.objects.order_by("-id").values_list("id", "name"):
+            mapping[normalize_exercise_name(name)] = exercise_id  # ✅ Oldest wins
+        cache.set(EXERCISE_IDS_CACHE_KEY, mapping, EXERCISE_IDS_CACHE_SECONDS)
+    return mapping
+
+
+def clear_exercise_ids_cache():
+    cache.delete(EXERCISE_IDS_CACHE_KEY)
+
+
+def exercise_id_for_name(name):
+    """Returns the id of the catalogue exercise a logged name refers to, if any."""
+    return exercise_ids_by_name().get(normalize_exercise_name(name))
+
+
+def exercise_key(exercise_id, exercise_name):
+    """The `(exercise_id, exercise_name)` key sets are grouped by: catalogued
+    sets by their exercise alone, others by their name."""
+    return (exercise_id, None) if exercise_id is not None else (None, exercise_name)
+
+
+def link_exercises(sets):
+    """Points unsaved sets at their catalogue exercises, for bulk inserts
+    that skip the pre-save hook."""
+    mapping = exercise_ids_by_name()
+    for set_instance in sets:
+        set_instance.exercise_id = mapping.get(
+            normalize_exercise_name(set_instance.exercise_name)
+        )
+    return sets
@@ -0,0 +1,277 @@
+import csv
+from datetime import datetime
+import math
+import re
+from django.db import transaction
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import is_naive, make_aware
+from .models import SetDict, Workout
+from .exercises import link_exercises
+from .ordering import number_sets_in_memory
+from .records import rebuild_user_records
+from .summaries import rebuild_workout_summaries
+
+# Workouts held in memory before a batch is inserted, and sets per INSERT
+IMPORT_BATCH_WORKOUTS = 500
+IMPORT_SET_BATCH_SIZE = 2000
+# Row errors kept in the summary; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+LB_TO_KG = 0.45359237
+# Largest numbers the columns hold; anything bigger is a row error, not a
+# failed import. Loadings must also fit a record's 10-digit, 2-place weight
+MAX_INTEGER = 2**31 - 1
+MAX_LOADING = 10**8 - 1
+
+SET_TYPES = {
+    # Strong marks special sets in its set order column, Hevy in set_type
+    "W": "Warm-up", "D": "Drop set", "F": "Failure",
+    "warmup": "Warm-up", "dropset": "Drop set", "failure": "Failure", "normal": "",
+}
+
+
+class ImportRowError(ValueError):
+    """A CSV row that can't be imported; it is skipped and reported."""
+
+
+def _number(value, cast=float):
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        raise ImportRowError(f"'{value}' is not a number")
+    if math.isnan(number):
+        raise ImportRowError(f"'{value}' is not a number")
+    # ✅ Checked before `int()`, which overflows on infinity
+    if math.isinf(number) or (cast is int and abs(number) > MAX_INTEGER):
+        raise ImportRowError(f"'{value}' is out of range")
+    return int(number) if cast is int else number
+
+
+def _datetime(value, formats=()):
+    value = (value or "").strip()
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        parsed = None
+    for date_format in formats:
+        if parsed:
+            break
+        try:
+            parsed = datetime.strptime(value, date_format)
+        except ValueError:
+            pass
+    if parsed is None:
+        raise ImportRowError(f"'{value}' is not a date and time")
+    return make_aware(parsed) if is_naive(parsed) else parsed
+
+
+def _duration(value):
+    """Reads Strong's `1h 5m` style durations as seconds."""
+    parts = re.findall(r"(\d+)\s*([hms])", value or "")
+    if not parts:
+        return None
+    scale = {"h": 3600, "m": 60, "s": 1}
+    seconds = sum(int(amount) * scale[unit] for amount, unit in parts)
+    if seconds > MAX_INTEGER:
+        raise ImportRowError(f"'{value}' is out of range")
+    return seconds
+
+
+def _loading(value, unit):
+    weight = _number(value)
+    if weight is not None and unit == "lb":
+        weight = round(weight * LB_TO_KG, 2)
+    if weight is not None and abs(weight) > MAX_LOADING:
+        raise ImportRowError(f"'{value}' is out of range")
+    return weight
+
+
+def _exercise_name(value):
+    name = (value or "").strip()
+    if not name:
+        raise ImportRowError("Missing exercise name")
+    return name[:255]
+
+
+def parse_strong_row(row, unit):
+    start_time = _datetime(row.get("Date"))
+    workout_name = (row.get("Workout Name") or "").strip() or "Imported workout"
+    set_order = (row.get("Set Order") or "").strip()
+    workout = {
+        "workout_name": workout_name,
+        "date": start_time.date(),
+        "start_time": start_time,
+        "duration": _duration(row.get("Duration")),
+        "notes": (row.get("Workout Notes") or "").strip(),
+        "complete": True,  # ✅ Logged history is finished training
+    }
+    set_fields = {
+        "exercise_name": _exercise_name(row.get("Exercise Name")),
+        "set_type": SET_TYPES.get(set_order, ""),
+        "loading": _loading(row.get("Weight"), unit),
+        "reps": _number(row.get("Reps"), int),
+        "notes": (row.get("Notes") or "").strip(),
+        "complete": True,
+    }
+    return (start_time, workout_name), workout, set_fields
+
+
+def parse_hevy_row(row, unit):
+    formats = ("%d %b %Y, %H:%M",)
+    start_time = _datetime(row.get("start_time"), formats)
+    end_time = _datetime(row.get("end_time"), formats) if row.get("end_time") else None
+    workout_name = (row.get("title") or "").strip() or "Imported workout"
+    if "weight_lbs" in row:
+        weight, unit = row.get("weight_lbs"), "lb"
+    else:
+        weight = row.get("weight_kg")
+    workout = {
+        "workout_name": workout_name,
+        "date": start_time.date(),
+        "start_time": start_time,
+        "duration": (
+            int((end_time - start_time).total_seconds()) if end_time else None
+        ),
+        "notes": (row.get("description") or "").strip(),
+        "complete": True,  # ✅ Logged history is finished training
+    }
+    set_fields = {
+        "exercise_name": _exercise_name(row.get("exercise_title")),
+        "set_type": SET_TYPES.get((row.get("set_type") or "").strip(), ""),
+        "loading": _loading(weight, unit),
+        "reps": _number(row.get("reps"), int),
+        "notes": (row.get("exercise_notes") or "").strip(),
+        "complete": True,
+    }
+    return (start_time, workout_name), workout, set_fields
+
+
+def parse_export_row(row, unit):
+    """Reads the CSV produced by `/api/export/`, so exports can be restored."""
+    workout_date = parse_date((row.get("workout_date") or "").strip())
+    if workout_date is None:
+        raise ImportRowError(f"'{row.get('workout_date')}' is not a date")
+    workout = {
+        "workout_name": (row.get("workout_workout_name") or "").strip()
+        or "Imported workout",
+        "date": workout_date,
+        "start_time": (
+            _datetime(row["workout_start_time"]) if row.get("workout_start_time") else None
+        ),
+        "duration": _number(row.get("workout_duration"), int),
+        "complete": row.get("workout_complete") == "True",
+        "user_weight": _number(row.get("workout_user_weight")),
+        "sleep_score": _number(row.get("workout_sleep_score"), int),
+        "sleep_quality": row.get("workout_sleep_quality") or "",
+        "notes": row.get("workout_notes") or "",
+    }
+    if not (row.get("set_exercise_name") or "").strip():
+        return row.get("workout_id"), workout, None  # ✅ A workout without sets
+
+    set_fields = {
+        "exercise_name": _exercise_name(row.get("set_exercise_name")),
+        "set_type": row.get("set_set_type") or "",
+        "loading": _loading(row.get("set_loading"), unit),
+        "reps": _number(row.get("set_reps"), int),
+        "rest": _number(row.get("set_rest"), int),
+        "focus": row.get("set_focus") or "",
+        "notes": row.get("set_notes") or "",
+        "complete": row.get("set_complete") == "True",
+        "set_duration": _number(row.get("set_set_duration"), int),
+    }
+    return row.get("workout_id"), workout, set_fields
+
+
+# Each format is recognised by columns only its exports have
+IMPORT_FORMATS = {
+    "strong": ({"Date", "Workout Name", "Exercise Name", "Set Order"}, parse_strong_row),
+    "hevy": ({"title", "start_time", "exercise_title", "set_index"}, parse_hevy_row),
+    "gains_trust": ({"workout_id", "workout_date", "set_exercise_name"}, parse_export_row),
+}
+
+
+def detect_format(fieldnames):
+    """Returns the name of the format whose columns the CSV header contains."""
+    columns = set(fieldnames or ())
+    for name, (required, _) in IMPORT_FORMATS.items():
+        if required <= columns:
+            return name
+    raise ValueError(
+        "Unrecognised CSV: expected a Strong, Hevy or Gains Trust export"
+    )
+
+
+def _insert_batch(user, batch):
+    """Inserts a batch of parsed workouts and their sets with two bulk
+    INSERTs, numbering the sets in memory and summarising the workouts in
+    one more statement. Model signals are not sent."""
+    workouts = Workout.objects.bulk_create(
+        [Workout(user=user, **fields) for fields, _ in batch.values()]
+    )
+    sets = []
+    for workout, (_, set_rows) in zip(workouts, batch.values()):
+        sets.extend(
+            number_sets_in_memory(
+                link_exercises([SetDict(workout=workout, **fields) for fields in set_rows])
+            )
+        )
+    SetDict.objects.bulk_create(sets, batch_size=IMPORT_SET_BATCH_SIZE)
+    rebuild_workout_summaries([workout.id for workout in workouts])
+    return len(workouts), len(sets)
+
+
+def import_workouts(user, lines, unit="kg", progress=None):
+    """Imports a Strong, Hevy or Gains Trust CSV export for a user.
+
+    `lines` is any iterable of CSV text lines, read as a stream. Rows are
+    grouped into workouts (rows of one workout need only be in the same
+    batch, not adjacent) and inserted in batches in one transaction. Rows
+    that can't be read are skipped and reported with their line number.
+    `progress` is called with the running summary after every batch."""
+    reader = csv.DictReader(lines)
+    summary = {
+        "format": detect_format(reader.fieldnames),
+        "rows": 0,
+        "workouts": 0,
+        "sets": 0,
+        "error_count": 0,
+        "errors": [],
+    }
+    _, parse_row = IMPORT_FORMATS[summary["format"]]
+
+    def flush(batch):
+        workouts, sets = _insert_batch(user, batch)
+        summary["workouts"] += workouts
+        summary["sets"] += sets
+        if progress:
+            progress(summary)
+
+    batch = {}
+    with transaction.atomic():
+        for row in reader:
+            summary["rows"] += 1
+            try:
+                key, workout_fields, set_fields = parse_row(row, unit)
+            except ImportRowError as error:
+                summary["error_count"] += 1
+                if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+                    summary["errors"].append(
+                        {"line": reader.line_num, "error": str(error)}
+                    )
+                continue
+
+            if key not in batch and len(batch) >= IMPORT_BATCH_WORKOUTS:
+                flush(batch)
+                batch = {}
+            _, set_rows = batch.setdefault(key, (workout_fields, []))
+            if set_fields:
+                set_rows.append(set_fields)
+
+        if batch:
+            flush(batch)
+        if summary["sets"]:
+            rebuild_user_records([user.id])  # ✅ Imported sets may hold records
+
+    return summary
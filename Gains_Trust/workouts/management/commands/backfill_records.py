@@ -0,0 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from workouts.records import RECORD_BACKFILL_BATCH_SIZE, rebuild_user_records
+
+
+class Command(BaseCommand):
+    help = "Rebuilds every user's personal records from their completed sets, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=RECORD_BACKFILL_BATCH_SIZE,
+            help="Users rebuilt per transaction",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options["batch_size"], 1)
+        last_id, rebuilt = 0, 0
+        while True:
+            # ✅ Walks users by id, so each batch is a short transaction
+            user_ids = list(
+                get_user_model()
+                .objects.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not user_ids:
+                break
+            with transaction.atomic():
+                rebuild_user_records(user_ids)
+            last_id = user_ids[-1]
+            rebuilt += len(user_ids)
+            self.stdout.write(f"{rebuilt} users' records rebuilt")
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt records for {rebuilt} users"))
@@ -0,0 +1,81 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils.timezone import now
+from workouts.exercises import exercise_ids_by_name, normalize_exercise_name
+from workouts.models import SetDict
+from workouts.ordering import renumber_workouts
+from workouts.summaries import rebuild_workout_summaries
+from workouts.versioning import bump_workout_version, workout_write
+
+# Sets scanned per transaction by default
+SET_BACKFILL_BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        "Links logged sets to their catalogue exercises, in batches. "
+        "Safe to stop and rerun: only unlinked sets are touched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=SET_BACKFILL_BATCH_SIZE,
+            help="Sets scanned per transaction",
+        )
+        parser.add_argument(
+            "--after-id",
+            type=int,
+            default=0,
+            help="Resume after this set id, as printed by an earlier run",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options["batch_size"], 1)
+        last_id, linked = options["after_id"], 0
+        mapping = exercise_ids_by_name()
+        while True:
+            # ✅ Walks unlinked sets by id, so each batch is a short transaction
+            rows = list(
+                SetDict.objects.filter(id__gt=last_id, exercise__isnull=True)
+                .order_by("id")
+                .values_list("id", "workout_id", "exercise_name")[:batch_size]
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            links = []
+            workout_ids = set()
+            for set_id, workout_id, exercise_name in rows:
+                exercise_id = mapping.get(normalize_exercise_name(exercise_name))
+                if exercise_id is not None:
+                    links.append((set_id, exercise_id))
+                    workout_ids.add(workout_id)
+            if links:
+                with transaction.atomic(), workout_write():
+                    self.link(links)
+                    # ✅ Delta sync and ETags pick up the newly linked sets
+                    for workout_id in sorted(workout_ids):
+                        bump_workout_version(workout_id)
+                    # ✅ Linking can merge spellings into one exercise
+                    renumber_workouts(sorted(workout_ids))
+                    rebuild_workout_summaries(sorted(workout_ids))
+            linked += len(links)
+            self.stdout.write(f"{linked} sets linked, up to set {last_id}")
+
+        self.stdout.write(self.style.SUCCESS(f"Linked {linked} sets to exercises"))
+
+    def link(self, links):
+        values = ", ".join(["(%s, %s)"] * len(links))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE workouts_setdict AS s
+                SET exercise_id = linked.exercise_id, updated_at = %s
+                FROM (VALUES {values}) AS linked (id, exercise_id)
+                WHERE s.id = linked.id AND s.exercise_id IS NULL
+                """,
+                [now(), *(value for link in links for value in link)],
+            )
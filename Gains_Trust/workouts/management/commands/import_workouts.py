@@ -0,0 +1,51 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from workouts.importing import import_workouts
+
+
+class Command(BaseCommand):
+    help = "Imports a Strong, Hevy or Gains Trust CSV export into a user's history."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file to import")
+        parser.add_argument("--user", required=True, help="Username to import for")
+        parser.add_argument(
+            "--unit",
+            choices=["kg", "lb"],
+            default="kg",
+            help="Unit of the file's weights (Hevy files name their own)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options["user"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user named {options['user']}")
+
+        def report(summary):
+            self.stdout.write(
+                f"{summary['rows']} rows read: {summary['workouts']} workouts, "
+                f"{summary['sets']} sets imported"
+            )
+
+        try:
+            with open(options["path"], newline="", encoding="utf-8-sig") as csv_file:
+                summary = import_workouts(
+                    user, csv_file, unit=options["unit"], progress=report
+                )
+        except (OSError, ValueError) as error:
+            raise CommandError(str(error))
+
+        for error in summary["errors"]:
+            self.stderr.write(f"Line {error['line']}: {error['error']}")
+        if summary["error_count"] > len(summary["errors"]):
+            self.stderr.write(
+                f"... and {summary['error_count'] - len(summary['errors'])} more"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {summary['workouts']} workouts and {summary['sets']} sets "
+                f"from a {summary['format']} export ({summary['error_count']} rows skipped)"
+            )
+        )
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from workouts.models import Workout
+from workouts.summaries import SUMMARY_REBUILD_BATCH_SIZE, rebuild_workout_summaries
+
+
+class Command(BaseCommand):
+    help = "Recomputes every workout's summary counters from its sets, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=SUMMARY_REBUILD_BATCH_SIZE,
+            help="Workouts recomputed per transaction",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options["batch_size"], 1)
+        last_id, rebuilt = 0, 0
+        while True:
+            # ✅ Walks workouts by id, so each batch is a short transaction
+            workout_ids = list(
+                Workout.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not workout_ids:
+                break
+            with transaction.atomic():
+                rebuild_workout_summaries(workout_ids)
+            last_id = workout_ids[-1]
+            rebuilt += len(workout_ids)
+            self.stdout.write(f"{rebuilt} workouts summarised")
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} workout summaries"))
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.5 on 2026-10-18 09:12
+
+from django.db import migrations
+from django.db.models import F
+
+SET_ORDER_GAP = 1024
+
+
+def spread_set_order(apps, schema_editor):
+    SetDict = apps.get_model("workouts", "SetDict")
+    SetDict.objects.filter(set_order__isnull=False).update(
+        set_order=F("set_order") * SET_ORDER_GAP
+    )
+
+
+def compact_set_order(apps, schema_editor):
+    schema_editor.execute(
+        """
+        UPDATE workouts_setdict AS s
+        SET set_order = ranked.position
+        FROM (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY workout_id ORDER BY set_order, id
+            ) AS position
+            FROM workouts_setdict
+            WHERE set_order IS NOT NULL
+        ) AS ranked
+        WHERE s.id = ranked.id
+        """
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workouts", "0009_alter_workout_user"),
+    ]
+
+    operations = [
+        migrations.RunPython(spread_set_order, compact_set_order),
+    ]
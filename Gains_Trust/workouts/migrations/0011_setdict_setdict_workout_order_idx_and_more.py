@@ -0,0 +1,27 @@
+# Generated by Django 5.1.5 on 2026-10-18 00:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workouts", "0010_sparse_set_order"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="setdict",
+            index=models.Index(
+                fields=["workout", "set_order", "id"], name="setdict_workout_order_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="workout",
+            index=models.Index(
+                fields=["user", "-date", "-id"], name="workout_user_date_idx"
+            ),
+        ),
+    ]
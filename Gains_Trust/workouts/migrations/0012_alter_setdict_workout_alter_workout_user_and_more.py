@@ -0,0 +1,52 @@
+# Generated by Django 5.1.5 on 2026-10-18 00:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workouts", "0011_setdict_setdict_workout_order_idx_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="setdict",
+            name="workout",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="set_dicts",
+                to="workouts.workout",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="workout",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="workouts",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="setdict",
+            index=models.Index(
+                condition=models.Q(("complete", False)),
+                fields=["workout", "set_order"],
+                name="setdict_incomplete_order_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="setdict",
+            index=models.Index(
+                condition=models.Q(("is_active_set", True)),
+                fields=["workout"],
+                name="setdict_active_set_idx",
+            ),
+        ),
+    ]
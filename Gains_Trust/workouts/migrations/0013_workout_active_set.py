@@ -0,0 +1,36 @@
+# Generated by Django 5.1.5 on 2026-10-18 00:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def point_at_active_sets(apps, schema_editor):
+    Workout = apps.get_model("workouts", "Workout")
+    SetDict = apps.get_model("workouts", "SetDict")
+    active = SetDict.objects.filter(
+        workout_id=OuterRef("pk"), is_active_set=True
+    ).order_by("set_order", "id")
+    Workout.objects.update(active_set=Subquery(active.values("id")[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workouts", "0012_alter_setdict_workout_alter_workout_user_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="workout",
+            name="active_set",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="workouts.setdict",
+            ),
+        ),
+        migrations.RunPython(point_at_active_sets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.1.5 on 2026-10-18 00:42
+
+from django.db import migrations
+
+SET_ORDER_GAP = 1024
+
+
+def resolve_duplicates(apps, schema_editor):
+    # Re-spread the keys of any workout where concurrent writes left two
+    # sets sharing a set_order, keeping their current relative order
+    schema_editor.execute(
+        """
+        UPDATE workouts_setdict AS s
+        SET set_order = ranked.position * %s
+        FROM (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY workout_id ORDER BY set_order, id
+            ) AS position
+            FROM workouts_setdict
+            WHERE workout_id IN (
+                SELECT workout_id FROM workouts_setdict
+                WHERE set_order IS NOT NULL
+                GROUP BY workout_id, set_order HAVING COUNT(*) > 1
+            )
+        ) AS ranked
+        WHERE s.id = ranked.id
+        """,
+        [SET_ORDER_GAP],
+    )
+    # Keep one active set per workout: the one the workout points at, else
+    # the earliest in the running order
+    schema_editor.execute(
+        """
+        UPDATE workouts_setdict AS s
+        SET is_active_set = false
+        FROM (
+            SELECT sd.id, ROW_NUMBER() OVER (
+                PARTITION BY sd.workout_id
+                ORDER BY (sd.id = w.active_set_id) DESC, sd.set_order, sd.id
+            ) AS rank
+            FROM workouts_setdict AS sd
+            JOIN workouts_workout AS w ON w.id = sd.workout_id
+            WHERE sd.is_active_set
+        ) AS ranked
+        WHERE s.id = ranked.id AND ranked.rank > 1
+        """
+    )
+    schema_editor.execute(
+        """
+        UPDATE workouts_workout AS w
+        SET active_set_id = (
+            SELECT id FROM workouts_setdict
+            WHERE workout_id = w.id AND is_active_set
+        )
+        """
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workouts", "0013_workout_active_set"),
+    ]
+
+    operations = [
+        migrations.RunPython(resolve_duplicates, migrations.RunPython.noop),
+    ]
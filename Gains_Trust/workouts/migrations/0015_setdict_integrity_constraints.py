@@ -0,0 +1,34 @@
+# Generated by Django 5.1.5 on 2026-10-18 00:42
+
+import django.db.models.constraints
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workouts", "0014_resolve_duplicate_set_state"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="setdict",
+            name="setdict_active_set_idx",
+        ),
+        migrations.AddConstraint(
+            model_name="setdict",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_active_set", True)),
+                fields=("workout",),
+                name="setdict_one_active_set",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="setdict",
+            constraint=models.UniqueConstraint(
+                deferrable=django.db.models.constraints.Deferrable["DEFERRED"],
+                fields=("workout", "set_order"),
+                name="setdict_unique_workout_order",
+            ),
+        ),
+    ]
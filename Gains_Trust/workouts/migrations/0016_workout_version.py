@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 00:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workouts", "0015_setdict_integrity_constraints"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="workout",
+            name="version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
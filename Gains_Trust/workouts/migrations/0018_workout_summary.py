@@ -0,0 +1,58 @@
+# Generated by Django 5.1.5 on 2026-10-18 01:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def summarise_workouts(apps, schema_editor):
+    """Summarises every existing workout from its sets.
+
+    Frozen from `rebuild_workout_summaries` as of this migration: sets are
+    not linked to catalogue exercises yet, so exercises count by name."""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO workouts_workoutsummary (
+                workout_id, set_count, completed_set_count, exercise_count, total_volume
+            )
+            SELECT w.id,
+                   COUNT(s.id),
+                   COUNT(s.id) FILTER (WHERE s.complete),
+                   COUNT(DISTINCT s.exercise_name),
+                   COALESCE(SUM(s.loading * s.reps), 0)
+            FROM workouts_workout w
+            LEFT JOIN workouts_setdict s ON s.workout_id = w.id
+            GROUP BY w.id
+            ON CONFLICT (workout_id) DO NOTHING
+            """
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workouts", "0017_delta_sync"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WorkoutSummary",
+            fields=[
+                (
+                    "workout",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="summary",
+                        serialize=False,
+                        to="workouts.workout",
+                    ),
+                ),
+                ("set_count", models.PositiveIntegerField(default=0)),
+                ("completed_set_count", models.PositiveIntegerField(default=0)),
+                ("exercise_count", models.PositiveIntegerField(default=0)),
+                ("total_volume", models.FloatField(default=0)),
+            ],
+        ),
+        migrations.RunPython(summarise_workouts, migrations.RunPython.noop),
+    ]
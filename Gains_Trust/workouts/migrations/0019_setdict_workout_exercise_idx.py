@@ -0,0 +1,21 @@
+# Generated by Django 5.1.5 on 2026-10-18 01:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workouts", "0018_workout_summary"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="setdict",
+            index=models.Index(
+                fields=["workout", "exercise_name"],
+                include=("loading", "reps", "complete"),
+                name="setdict_workout_exercise_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.5 on 2026-10-18 01:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_exercise_muscle_indexes"),
+        ("workouts", "0019_setdict_workout_exercise_idx"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="setdict",
+            name="setdict_workout_exercise_idx",
+        ),
+        migrations.AddField(
+            model_name="setdict",
+            name="exercise",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="set_dicts",
+                to="core.exercise",
+            ),
+        ),
+    ]
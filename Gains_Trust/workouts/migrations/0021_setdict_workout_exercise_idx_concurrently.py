@@ -0,0 +1,22 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # ✅ Built without blocking writes to workouts_setdict
+    atomic = False
+
+    dependencies = [
+        ("workouts", "0020_setdict_exercise"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="setdict",
+            index=models.Index(
+                fields=["workout", "exercise"],
+                include=("loading", "reps", "complete"),
+                name="setdict_workout_exercise_idx",
+            ),
+        ),
+    ]
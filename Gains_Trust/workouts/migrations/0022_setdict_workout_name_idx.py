@@ -0,0 +1,23 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # ✅ Built without blocking writes to workouts_setdict
+    atomic = False
+
+    dependencies = [
+        ("workouts", "0021_setdict_workout_exercise_idx_concurrently"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="setdict",
+            index=models.Index(
+                condition=models.Q(("exercise__isnull", True)),
+                fields=["workout", "exercise_name"],
+                include=("loading", "reps", "complete"),
+                name="setdict_workout_name_idx",
+            ),
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
 from django.utils.timezone import now
 
 
@@ -9,7 +11,10 @@ def get_today():
 # Create your models here.
 class Workout(models.Model):
     user = models.ForeignKey(
-        "users.User", on_delete=models.CASCADE, related_name="workouts"
+        "users.User",
+        on_delete=models.CASCADE,
+        related_name="workouts",
+        db_index=False,  # Covered by workout_user_date_idx
     )
     workout_name = models.CharField(max_length=255)
     date = models.DateField(default=get_today)
@@ -20,16 +25,65 @@ class Workout(models.Model):
     notes = models.TextField(blank=True)
     start_time = models.DateTimeField(blank=True, null=True)
     duration = models.IntegerField(blank=True, null=True)
+    active_set = models.ForeignKey(
+        "workouts.SetDict",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    # Bumped on every change to the workout or its sets; served as the ETag
+    version = models.PositiveIntegerField(default=1)
+    # Touched with `version`, so it also moves when any of the sets change
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Serves the workout list's keyset pagination on (-date, -id)
+            models.Index(
+                fields=["user", "-date", "-id"], name="workout_user_date_idx"
+            ),
+            # Serves delta sync: a user's workouts changed since a cursor
+            models.Index(
+                fields=["user", "updated_at"], name="workout_user_updated_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.workout_name} ({self.date})"
 
 
+class SetDictQuerySet(models.QuerySet):
+    def with_positions(self):
+        """Annotates each set with its 1-based running-order `position`
+        within its workout, derived from the sparse `set_order` keys."""
+        return self.annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=[F("workout_id")],
+                order_by=[F("set_order").asc(), F("id").asc()],
+            )
+        )
+
+
 class SetDict(models.Model):
     workout = models.ForeignKey(
-        "workouts.Workout", on_delete=models.CASCADE, related_name="set_dicts"
+        "workouts.Workout",
+        on_delete=models.CASCADE,
+        related_name="set_dicts",
+        db_index=False,  # Covered by setdict_workout_order_idx
     )
     exercise_name = models.CharField(max_length=255)
+    # The catalogue exercise the name refers to, ignoring case and spacing;
+    # sets are grouped by it when present, and by name otherwise
+    exercise = models.ForeignKey(
+        "core.Exercise",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="set_dicts",
+        db_index=False,  # Covered by setdict_workout_exercise_idx
+    )
     set_order = models.IntegerField(null=True, blank=True)
     set_number = models.IntegerField(null=True, blank=True)
     set_type = models.CharField(max_length=100, blank=True)
@@ -42,8 +96,77 @@ class SetDict(models.Model):
     is_active_set = models.BooleanField(default=False)
     set_start_time = models.DateTimeField(blank=True, null=True)
     set_duration = models.IntegerField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = SetDictQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Serves running-order reads and keyset pagination on (set_order, id)
+            models.Index(
+                fields=["workout", "set_order", "id"], name="setdict_workout_order_idx"
+            ),
+            # Serves "next incomplete set" lookups when activating a set
+            models.Index(
+                fields=["workout", "set_order"],
+                condition=Q(complete=False),
+                name="setdict_incomplete_order_idx",
+            ),
+            # Serves per-exercise renumbering and analytics over a user's
+            # workouts; covers the columns the charts read, so each workout's
+            # sets need no heap reads
+            models.Index(
+                fields=["workout", "exercise"],
+                include=["loading", "reps", "complete"],
+                name="setdict_workout_exercise_idx",
+            ),
+            # The same for sets not linked to the catalogue, which are grouped
+            # by name; partial, so it only holds the sets no catalogue id covers
+            models.Index(
+                fields=["workout", "exercise_name"],
+                include=["loading", "reps", "complete"],
+                condition=Q(exercise__isnull=True),
+                name="setdict_workout_name_idx",
+            ),
+        ]
+        constraints = [
+            # At most one active set per workout; also serves active set lookups
+            models.UniqueConstraint(
+                fields=["workout"],
+                condition=Q(is_active_set=True),
+                name="setdict_one_active_set",
+            ),
+            # Sort keys are unique per workout. Deferred to commit, so a ranged
+            # shift or a full reorder may pass through duplicates mid-transaction
+            models.UniqueConstraint(
+                fields=["workout", "set_order"],
+                name="setdict_unique_workout_order",
+                deferrable=models.Deferrable.DEFERRED,
+            ),
+        ]
 
     def __str__(self):
         return (
-            f"{self.workout.workout_name} - {self.exercise_name} (Set {self.set_order})"
+            f"{self.workout.workout_name} - {self.exercise_name} "
+            f"(Set {self.set_number})"
         )
+
+
+class WorkoutSummary(models.Model):
+    """Per-workout set counters, kept up to date by the set save and delete
+    hooks so lists of workouts never need to read their sets."""
+
+    workout = models.OneToOneField(
+        "workouts.Workout",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="summary",
+    )
+    set_count = models.PositiveIntegerField(default=0)
+    completed_set_count = models.PositiveIntegerField(default=0)
+    exercise_count = models.PositiveIntegerField(default=0)
+    # Sum of loading × reps over the workout's sets
+    total_volume = models.FloatField(default=0)
+
+    def __str__(self):
+        return f"Summary of workout {self.workout_id}"
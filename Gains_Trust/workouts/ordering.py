@@ -0,0 +1,283 @@
+import hashlib
+from django.db import connection, transaction
+from django.db.models import Count, F, Max, Q
+from django.utils.timezone import now
+from .exercises import EXERCISE_KEY_SQL, exercise_key
+from .models import SetDict, Workout
+
+# `set_order` is a sparse sort key: new sets are appended SET_ORDER_GAP after
+# the current last set, so inserts and moves only ever write the row that
+# changes. When a gap runs out, only the sets between a move's old and new
+# positions are shifted.
+SET_ORDER_GAP = 1024
+
+
+def lock_workout(workout_id):
+    """Locks a workout row until the end of the current transaction.
+
+    Every write to a workout's running order or active set takes this lock
+    first, so concurrent writers to one workout queue up behind each other
+    while other workouts are unaffected."""
+    return Workout.objects.select_for_update().get(id=workout_id)
+
+
+def next_set_order(workout_id):
+    """Returns the key that places a set after every other set in the workout."""
+    last = SetDict.objects.filter(workout_id=workout_id).aggregate(
+        last=Max("set_order")
+    )["last"]
+    return (last or 0) + SET_ORDER_GAP
+
+
+def number_appended_sets(workout_id, new_sets):
+    """Assigns `set_order`, `set_number` and `position` to unsaved sets that
+    are about to be appended to a workout, in a single pass.
+
+    Lets callers insert many sets with one `bulk_create` instead of running
+    the per-save signals for each one. The sets must already be linked to
+    their catalogue exercises."""
+    existing = (
+        SetDict.objects.filter(workout_id=workout_id)
+        .values_list("exercise_id", "exercise_name")
+        .annotate(total=Count("id"))
+    )
+    exercise_count = {}
+    for exercise_id, exercise_name, total in existing:
+        key = exercise_key(exercise_id, exercise_name)
+        exercise_count[key] = exercise_count.get(key, 0) + total
+    return number_sets_in_memory(
+        new_sets, exercise_count, next_set_order(workout_id)
+    )
+
+
+def number_sets_in_memory(new_sets, exercise_count=None, first_key=SET_ORDER_GAP):
+    """Numbers unsaved sets in the order given, without touching the database.
+
+    `exercise_count` holds how many sets of each exercise (by `exercise_key`)
+    the workout already has, and `first_key` is the `set_order` for the first new set; the
+    defaults suit a brand new workout."""
+    exercise_count = dict(exercise_count or {})
+    position = sum(exercise_count.values())
+    key = first_key
+
+    for set_instance in new_sets:
+        exercise = exercise_key(set_instance.exercise_id, set_instance.exercise_name)
+        exercise_count[exercise] = exercise_count.get(exercise, 0) + 1
+        position += 1
+
+        set_instance.set_order = key
+        set_instance.set_number = exercise_count[exercise]
+        set_instance.position = position
+        key += SET_ORDER_GAP
+
+    return new_sets
+
+
+def attach_positions(sets):
+    """Sets `position` on already-fetched sets with one windowed query over
+    their workouts, so paginated pages report whole-workout positions."""
+    workout_ids = {set_instance.workout_id for set_instance in sets}
+    positions = dict(
+        SetDict.objects.filter(workout_id__in=workout_ids)
+        .with_positions()
+        .values_list("id", "position")
+    )
+    for set_instance in sets:
+        set_instance.position = positions[set_instance.id]
+    return sets
+
+
+def set_position(set_dict):
+    """Returns the 1-based running-order position of a set within its workout."""
+    return (
+        SetDict.objects.filter(workout_id=set_dict.workout_id)
+        .filter(
+            Q(set_order__lt=set_dict.set_order)
+            | Q(set_order=set_dict.set_order, id__lt=set_dict.id)
+        )
+        .count()
+        + 1
+    )
+
+
+def renumber_exercise_sets(workout_id, exercise):
+    """Renumbers `set_number` for one exercise in one workout in a single
+    statement, writing only the rows whose number actually changes.
+
+    `exercise` is an `exercise_key`. Returns a mapping of set id to its new
+    `set_number` for the rows written."""
+    exercise_id, exercise_name = exercise
+    if exercise_id is not None:
+        same_exercise, params = "exercise_id = %s", [exercise_id]
+    else:
+        same_exercise = "exercise_id IS NULL AND exercise_name = %s"
+        params = [exercise_name]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE workouts_setdict AS s
+            SET set_number = ranked.set_number, updated_at = %s
+            FROM (
+                SELECT id, ROW_NUMBER() OVER (ORDER BY set_order, id) AS set_number
+                FROM workouts_setdict
+                WHERE workout_id = %s AND {same_exercise}
+            ) AS ranked
+            WHERE s.id = ranked.id
+              AND s.set_number IS DISTINCT FROM ranked.set_number
+            RETURNING s.id, s.set_number
+            """,
+            [now(), workout_id, *params],
+        )
+        return dict(cursor.fetchall())
+
+
+def renumber_workouts(workout_ids):
+    """Renumbers every exercise of the given workouts in one statement, for
+    changes to how sets are grouped rather than to one set. Workouts with
+    any number changed get a new version.
+
+    Returns the ids of those workouts."""
+    if not workout_ids:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH renumbered AS (
+                UPDATE workouts_setdict AS s
+                SET set_number = ranked.set_number, updated_at = %(now)s
+                FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY workout_id, {EXERCISE_KEY_SQL}
+                        ORDER BY set_order, id
+                    ) AS set_number
+                    FROM workouts_setdict
+                    WHERE workout_id = ANY(%(workout_ids)s)
+                ) AS ranked
+                WHERE s.id = ranked.id
+                  AND s.set_number IS DISTINCT FROM ranked.set_number
+                RETURNING s.workout_id
+            )
+            UPDATE workouts_workout
+            SET version = version + 1, updated_at = %(now)s
+            WHERE id IN (SELECT workout_id FROM renumbered)
+            RETURNING id
+            """,
+            {"now": now(), "workout_ids": list(workout_ids)},
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def order_version(set_ids):
+    """Returns a short token identifying one running order of set ids."""
+    joined = ",".join(str(set_id) for set_id in set_ids)
+    return hashlib.sha1(joined.encode()).hexdigest()[:16]
+
+
+def apply_set_order(ordered_sets):
+    """Writes `set_order` and `set_number` for a workout's full running order
+    in one UPDATE ... FROM (VALUES ...) statement.
+
+    `ordered_sets` is every set of the workout as `(id, exercise_key)` pairs,
+    in the new order."""
+    exercise_count = {}
+    rows = []
+    for index, (set_id, exercise) in enumerate(ordered_sets, start=1):
+        exercise_count[exercise] = exercise_count.get(exercise, 0) + 1
+        rows.extend([set_id, index * SET_ORDER_GAP, exercise_count[exercise]])
+
+    if not rows:
+        return
+
+    values = ", ".join(["(%s, %s, %s)"] * len(ordered_sets))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE workouts_setdict AS s
+            SET set_order = v.set_order, set_number = v.set_number, updated_at = %s
+            FROM (VALUES {values}) AS v (id, set_order, set_number)
+            WHERE s.id = v.id
+            """,
+            [now(), *rows],
+        )
+
+
+def _key_between(before, after):
+    """Returns a key strictly between two neighbouring keys, or None if no gap."""
+    if after is None:
+        return before + SET_ORDER_GAP
+    low = before if before is not None else 0
+    if after - low < 2:
+        return None
+    return (low + after) // 2
+
+
+def _neighbour_keys(set_dict, position):
+    """Returns the keys of the sets that will sit either side of `set_dict`
+    once it is at the 1-based `position` among the other sets of its workout."""
+    others = (
+        SetDict.objects.filter(workout_id=set_dict.workout_id)
+        .exclude(id=set_dict.id)
+        .order_by("set_order", "id")
+        .values_list("set_order", flat=True)
+    )
+    neighbours = list(others[max(position - 2, 0) : position])
+
+    if position == 1:
+        return None, (neighbours[0] if neighbours else None)
+    if len(neighbours) == 2:
+        return neighbours[0], neighbours[1]
+    if neighbours:
+        return neighbours[0], None
+    # Past the end of the workout: append after the last set
+    last = others.last()
+    return last, None
+
+
+def _shift_range(set_dict, old_key, before, after):
+    """Makes room for `set_dict` by shifting only the sets between its old
+    and new positions one step towards the slot it vacates, in one UPDATE.
+    Returns the key the moved set should take."""
+    sets = SetDict.objects.filter(workout_id=set_dict.workout_id).exclude(
+        id=set_dict.id
+    )
+
+    if after <= old_key:  # Moving up: [after, old_key) shifts down the order
+        sets.filter(set_order__gte=after, set_order__lt=old_key).update(
+            set_order=F("set_order") + 1, updated_at=now()
+        )
+        return after
+
+    # Moving down: (old_key, before] shifts up the order
+    sets.filter(set_order__gt=old_key, set_order__lte=before).update(
+        set_order=F("set_order") - 1, updated_at=now()
+    )
+    return before
+
+
+def move_set_to_position(set_dict, position):
+    """Moves a set to the 1-based `position` among the other sets of its workout.
+
+    The moved set takes a key between its new neighbours, so normally it is
+    the only row written. When the neighbours leave no gap, only the sets
+    between the old and new positions are shifted, so the cost depends on
+    how far the set moves rather than on the size of the workout. The shift
+    briefly duplicates a key, which the deferred unique constraint allows
+    until the transaction commits."""
+    with transaction.atomic():
+        lock_workout(set_dict.workout_id)
+        old_key = SetDict.objects.values_list("set_order", flat=True).get(
+            id=set_dict.id
+        )
+        before, after = _neighbour_keys(set_dict, position)
+
+        if before is None and after is None:
+            return set_dict  # ✅ Only set in the workout, nothing to move
+
+        key = _key_between(before, after)
+        if key is None:
+            key = _shift_range(set_dict, old_key, before, after)
+
+        set_dict.set_order = key
+        set_dict.save(update_fields=["set_order", "updated_at"])
+
+    return set_dict
@@ -0,0 +1,183 @@
+from django.db import connection
+from django.db.models import Q
+from users.models import UserRecord
+from .analytics import ESTIMATED_1RM_SQL
+from .exercises import exercise_key
+
+# Users whose records are rebuilt per statement by `backfill_records`
+RECORD_BACKFILL_BATCH_SIZE = 200
+
+# Sets that can hold a record: lifted, with a load and reps
+RECORD_SET_FILTER = "s.complete AND s.loading > 0 AND s.reps > 0"
+
+
+def holds_record(complete, loading, reps):
+    """Whether a set with this lift can hold a record; see `RECORD_SET_FILTER`."""
+    return bool(complete) and (loading or 0) > 0 and (reps or 0) > 0
+
+
+_RECORD_COLUMNS = (
+    "user_id, exercise_id, exercise_name, kind, set_dict_id, value, weight, reps, date"
+)
+# Matches `RECORD_EXERCISE_KEY`, the conflict target of both record upserts
+_RECORD_KEY = "user_id, exercise_id, (CASE WHEN exercise_id IS NULL THEN exercise_name END)"
+# A record is only replaced by a strictly better one, so the earliest stands on ties
+_REPLACE_IF_BETTER = """
+    DO UPDATE SET exercise_id = EXCLUDED.exercise_id,
+                  set_dict_id = EXCLUDED.set_dict_id,
+                  value = EXCLUDED.value,
+                  weight = EXCLUDED.weight,
+                  reps = EXCLUDED.reps,
+                  date = EXCLUDED.date
+    WHERE record.value < EXCLUDED.value
+"""
+
+# Records are named after the catalogue exercise, or as logged when uncatalogued
+_RECORD_NAME = "COALESCE(e.name, s.exercise_name)"
+
+# The completed set, with its workout's user and date
+_COMPLETED_SET = f"""
+    WITH done AS (
+        SELECT w.user_id, s.exercise_id, {_RECORD_NAME} AS exercise_name,
+               s.exercise_name AS logged_name, s.workout_id, s.id, s.loading,
+               s.reps, w.date, {ESTIMATED_1RM_SQL} AS estimated_1rm
+        FROM workouts_setdict s
+        JOIN workouts_workout w ON w.id = s.workout_id
+        LEFT JOIN core_exercise e ON e.id = s.exercise_id
+        WHERE s.id = %(set_id)s AND {RECORD_SET_FILTER}
+    )"""
+
+
+def update_records_for_set(set_dict):
+    """Raises the user's records with a newly completed set, if it beats them.
+
+    Checks the heaviest weight for the set's rep count, the best estimated
+    1RM, and the volume of the exercise in this session so far, in one
+    statement of upserts that only write when a record improves. Every
+    spelling of a catalogue exercise counts towards the same records."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            {_COMPLETED_SET},
+            weight_record AS (
+                INSERT INTO users_userrecord AS record ({_RECORD_COLUMNS})
+                SELECT user_id, exercise_id, exercise_name, '{UserRecord.WEIGHT}', id,
+                       loading, loading, reps, date
+                FROM done
+                ON CONFLICT ({_RECORD_KEY}, reps) WHERE kind = '{UserRecord.WEIGHT}'
+                {_REPLACE_IF_BETTER}
+            )
+            INSERT INTO users_userrecord AS record ({_RECORD_COLUMNS})
+            SELECT user_id, exercise_id, exercise_name, '{UserRecord.ESTIMATED_1RM}', id,
+                   estimated_1rm, loading, reps, date
+            FROM done
+            UNION ALL
+            SELECT done.user_id, done.exercise_id, done.exercise_name, '{UserRecord.SESSION_VOLUME}', done.id,
+                   SUM(s.loading * s.reps), NULL, SUM(s.reps), done.date
+            FROM done
+            JOIN workouts_setdict s
+              ON s.workout_id = done.workout_id
+             AND (s.exercise_id = done.exercise_id
+                  OR (done.exercise_id IS NULL AND s.exercise_id IS NULL
+                      AND s.exercise_name = done.logged_name))
+            WHERE {RECORD_SET_FILTER}
+            GROUP BY done.user_id, done.exercise_id, done.exercise_name, done.id, done.date
+            ON CONFLICT ({_RECORD_KEY}, kind) WHERE NOT (kind = '{UserRecord.WEIGHT}')
+            {_REPLACE_IF_BETTER}
+            """,
+            {"set_id": set_dict.id},
+        )
+
+
+def rebuild_user_records(user_ids, exercise=None):
+    """Recomputes the users' records from every set they have completed,
+    optionally for one exercise (an `exercise_key`) only, replacing what
+    was stored."""
+    exercise_id, exercise_name = exercise or (None, None)
+    params = {
+        "user_ids": list(user_ids),
+        "exercise_id": exercise_id,
+        "exercise_name": exercise_name,
+    }
+    record_filter = set_filter = ""
+    if exercise_id is not None:
+        record_filter = "AND exercise_id = %(exercise_id)s"
+        set_filter = "AND s.exercise_id = %(exercise_id)s"
+    elif exercise_name is not None:
+        record_filter = "AND exercise_id IS NULL AND exercise_name = %(exercise_name)s"
+        set_filter = "AND s.exercise_id IS NULL AND s.exercise_name = %(exercise_name)s"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM users_userrecord WHERE user_id = ANY(%(user_ids)s) {record_filter}",
+            params,
+        )
+        cursor.execute(
+            f"""
+            WITH sets AS (
+                SELECT w.user_id, s.exercise_id, {_RECORD_NAME} AS exercise_name,
+                       s.workout_id, s.id AS set_id, s.loading, s.reps, w.date,
+                       {ESTIMATED_1RM_SQL} AS estimated_1rm
+                FROM workouts_setdict s
+                JOIN workouts_workout w ON w.id = s.workout_id
+                LEFT JOIN core_exercise e ON e.id = s.exercise_id
+                WHERE w.user_id = ANY(%(user_ids)s) AND {RECORD_SET_FILTER}
+                      {set_filter}
+            ),
+            -- The name is fixed by the exercise when catalogued, so
+            -- (exercise_id, exercise_name) groups exactly as `_RECORD_KEY`
+            sessions AS (
+                SELECT user_id, exercise_id, exercise_name, MAX(set_id) AS set_id,
+                       SUM(loading * reps) AS volume, SUM(reps) AS reps, MIN(date) AS date
+                FROM sets
+                GROUP BY user_id, exercise_id, exercise_name, workout_id
+            ),
+            best AS (
+                (SELECT DISTINCT ON (user_id, exercise_id, exercise_name, reps)
+                        user_id, exercise_id, exercise_name, '{UserRecord.WEIGHT}' AS kind, set_id,
+                        loading AS value, loading AS weight, reps, date
+                 FROM sets
+                 ORDER BY user_id, exercise_id, exercise_name, reps, loading DESC, date, set_id)
+                UNION ALL
+                (SELECT DISTINCT ON (user_id, exercise_id, exercise_name)
+                        user_id, exercise_id, exercise_name, '{UserRecord.ESTIMATED_1RM}', set_id,
+                        estimated_1rm, loading, reps, date
+                 FROM sets
+                 ORDER BY user_id, exercise_id, exercise_name, estimated_1rm DESC, date, set_id)
+                UNION ALL
+                (SELECT DISTINCT ON (user_id, exercise_id, exercise_name)
+                        user_id, exercise_id, exercise_name, '{UserRecord.SESSION_VOLUME}', set_id,
+                        volume, NULL, reps, date
+                 FROM sessions
+                 ORDER BY user_id, exercise_id, exercise_name, volume DESC, date, set_id)
+            )
+            INSERT INTO users_userrecord ({_RECORD_COLUMNS})
+            SELECT * FROM best
+            """,
+            params,
+        )
+
+
+def revoke_records_for_set(set_dict, exercise=None):
+    """Rebuilds an exercise's records after a set is undone or edited, if it
+    held one or belongs to the session holding the volume record.
+
+    `exercise` is the `exercise_key` the set had, if it has since changed."""
+    exercise = exercise or exercise_key(set_dict.exercise_id, set_dict.exercise_name)
+    if exercise[0] is not None:
+        same_exercise = Q(exercise_id=exercise[0])
+    else:
+        same_exercise = Q(exercise__isnull=True, exercise_name=exercise[1])
+    held = (
+        UserRecord.objects.filter(
+            Q(set_dict_id=set_dict.id)
+            | Q(
+                same_exercise,
+                kind=UserRecord.SESSION_VOLUME,
+                set_dict__workout_id=set_dict.workout_id,
+            )
+        )
+        .values_list("user_id", flat=True)
+        .first()
+    )
+    if held:
+        rebuild_user_records([held], exercise)
@@ -1,13 +1,24 @@
 from rest_framework import serializers
+from .importing import MAX_LOADING
 from .models import Workout, SetDict
+from .ordering import set_position
 
 
 class WorkoutSerializer(serializers.ModelSerializer):
+    # ✅ Read from the workout's summary row, never from its sets
+    set_count = serializers.IntegerField(source="summary.set_count", read_only=True)
+    completed_set_count = serializers.IntegerField(
+        source="summary.completed_set_count", read_only=True
+    )
+    exercise_count = serializers.IntegerField(
+        source="summary.exercise_count", read_only=True
+    )
+    total_volume = serializers.FloatField(source="summary.total_volume", read_only=True)
 
     class Meta:
         model = Workout
         fields = "__all__"
-        read_only_fields = ["user", "id"]
+        read_only_fields = ["user", "id", "active_set", "version"]
         extra_kwargs = {
             "user_weight": {"required": False, "allow_null": True},
             "sleep_score": {"required": False, "allow_null": True},
@@ -22,7 +33,9 @@ class WorkoutSerializer(serializers.ModelSerializer):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
 
-        instance.save()
+        # ✅ Only the fields sent: `active_set` is moved by set writes under
+        # the workout's lock, and a copy loaded before them must not undo them
+        instance.save(update_fields=[*validated_data, "updated_at"])
         return instance
 
 
@@ -31,13 +44,30 @@ class SetDictSerializer(serializers.ModelSerializer):
     class Meta:
         model = SetDict
         fields = "__all__"
-        read_only_fields = ["workout", "set_number", "id", "set_order"]
+        # The active set is managed by the server, one per workout
+        read_only_fields = [
+            "workout", "exercise", "set_number", "id", "set_order", "is_active_set"
+        ]
         extra_kwargs = {
-            "loading": {"allow_null": True, "required": False},
+            # Bounded like imports, so a personal record can always hold it
+            "loading": {
+                "allow_null": True,
+                "required": False,
+                "min_value": -MAX_LOADING,
+                "max_value": MAX_LOADING,
+            },
             "reps": {"allow_null": True, "required": False},
             "rest": {"allow_null": True, "required": False},
         }
 
+    def to_representation(self, instance):
+        """`set_order` is stored as a sparse sort key; clients always receive
+        the set's 1-based position in the workout's running order."""
+        data = super().to_representation(instance)
+        position = getattr(instance, "position", None)
+        data["set_order"] = position if position is not None else set_position(instance)
+        return data
+
     def create(self, validated_data):
         # The workout will be passed via the ViewSet's perform_create method
         return SetDict.objects.create(**validated_data)
@@ -49,3 +79,13 @@ class SetDictSerializer(serializers.ModelSerializer):
 
         instance.save()
         return instance
+
+
+class WorkoutDetailSerializer(WorkoutSerializer):
+    """Workout with its sets embedded, in running order.
+
+    Expects `set_dicts` to be prefetched with positions annotated, so the
+    whole payload costs two queries."""
+
+    sets = SetDictSerializer(source="set_dicts", many=True, read_only=True)
+
@@ -1,71 +1,267 @@
-from django.db.models.signals import pre_save, post_save, post_delete
+from django.db.models import F
+from django.db.models.signals import post_init, pre_save, post_save, pre_delete, post_delete
 from django.dispatch import receiver
-from .models import SetDict
-import threading
-
-
-# ✅ Thread-local storage to track when `move_set` is being used
-local_storage = threading.local()
+from core.models import Exercise, Tombstone
+from users.models import UserRecord
+from .exercises import clear_exercise_ids_cache, exercise_id_for_name, exercise_key
+from .models import SetDict, Workout, WorkoutSummary
+from .ordering import next_set_order, renumber_exercise_sets
+from .records import (
+    holds_record,
+    rebuild_user_records,
+    revoke_records_for_set,
+    update_records_for_set,
+)
+from .summaries import adjust_workout_summary, rebuild_workout_summaries, set_contribution
+from .versioning import bump_workout_version
 
 
 @receiver(pre_save, sender=SetDict)
 def assign_set_order(sender, instance, **kwargs):
-    """Assigns set_order dynamically BEFORE saving a new set."""
+    """Appends a new set to the end of its workout BEFORE saving it."""
     if not instance.pk:  # Only assign if this is a new object
-        instance.set_order = (
-            SetDict.objects.filter(workout=instance.workout).count() + 1
+        instance.set_order = next_set_order(instance.workout_id)
+
+
+@receiver(pre_save, sender=SetDict)
+def link_catalogue_exercise(sender, instance, update_fields=None, **kwargs):
+    """Points the set at the catalogue exercise its name refers to, if any."""
+    if update_fields is not None and "exercise_name" not in update_fields:
+        return
+    instance.exercise_id = exercise_id_for_name(instance.exercise_name)
+    if update_fields is not None and "exercise" not in update_fields and instance.pk:
+        # ✅ A partial save would not write the link itself
+        SetDict.objects.filter(pk=instance.pk).update(exercise_id=instance.exercise_id)
+
+
+# The fields a set's summary contribution and records are worked out from
+LIFT_FIELDS = ("complete", "loading", "reps")
+
+
+@receiver(post_init, sender=SetDict)
+def remember_exercise_name(sender, instance, **kwargs):
+    """Remembers the exercise a set was loaded with, so a rename can
+    renumber the exercise it left as well as the one it joined.
+
+    Also remembers the set's lift, so a save only applies the difference
+    to its workout's summary and to the user's records."""
+    loaded = instance.__dict__
+    instance._loaded_exercise_key = (
+        exercise_key(loaded.get("exercise_id"), loaded["exercise_name"])
+        if "exercise_name" in loaded
+        else None
+    )
+    if instance.pk and all(field in loaded for field in LIFT_FIELDS):
+        instance._loaded_lift = tuple(loaded[field] for field in LIFT_FIELDS)
+    else:
+        instance._loaded_lift = None  # ✅ New or partly loaded set
+
+
+def renumber_affected_exercises(instance, exercises):
+    """Renumbers only the given exercise keys, syncing the in-memory instance."""
+    for exercise in exercises:
+        renumbered = renumber_exercise_sets(instance.workout_id, exercise)
+        if instance.pk in renumbered:
+            instance.set_number = renumbered[instance.pk]
+
+
+# Saves that touch none of these fields cannot change any `set_number`
+NUMBERING_FIELDS = {"set_order", "exercise_name"}
+# Saves that touch none of these fields cannot change the workout's summary
+# or the user's records
+SUMMARY_FIELDS = {"complete", "loading", "reps", "exercise_name"}
+
+
+@receiver(post_save, sender=SetDict)
+def update_records_after_save(sender, instance, created, update_fields, **kwargs):
+    """Keeps the user's personal records in step with the set's lift.
+
+    A newly lifted set can only raise records. Editing or undoing a lifted
+    set rebuilds the records it held. Registered first, before the hooks
+    that move `_loaded_lift` and `_loaded_exercise_key`."""
+    if update_fields is not None and not SUMMARY_FIELDS & set(update_fields):
+        return
+
+    lift = (instance.complete, instance.loading, instance.reps)
+    exercise = exercise_key(instance.exercise_id, instance.exercise_name)
+    if not created:
+        loaded_lift, loaded_exercise = instance._loaded_lift, instance._loaded_exercise_key
+        if (loaded_lift, loaded_exercise) == (lift, exercise):
+            return  # ✅ Nothing records depend on changed
+        if loaded_lift is None or holds_record(*loaded_lift):
+            revoke_records_for_set(instance, loaded_exercise or exercise)
+    if holds_record(*lift):
+        update_records_for_set(instance)
+
+
+@receiver(post_save, sender=SetDict)
+def update_summary_after_save(sender, instance, created, update_fields, **kwargs):
+    """Applies the change in what the set adds to its workout's summary.
+
+    Registered before the renumbering hook, which moves `_loaded_exercise_key`."""
+    if update_fields is not None and not SUMMARY_FIELDS & set(update_fields):
+        return
+
+    lift = (instance.complete, instance.loading, instance.reps)
+    contribution = set_contribution(*lift)
+    if created:
+        adjust_workout_summary(instance.workout_id, contribution, recount_exercises=True)
+    elif instance._loaded_lift is None:
+        rebuild_workout_summaries([instance.workout_id])
+    else:
+        delta = tuple(
+            new - old
+            for new, old in zip(contribution, set_contribution(*instance._loaded_lift))
+        )
+        renamed = instance._loaded_exercise_key != exercise_key(
+            instance.exercise_id, instance.exercise_name
         )
+        if any(delta) or renamed:
+            adjust_workout_summary(instance.workout_id, delta, recount_exercises=renamed)
+    instance._loaded_lift = lift
 
 
 @receiver(post_save, sender=SetDict)
-def reorder_sets_after_creation(sender, instance, created, **kwargs):
-    """Ensures `set_number` is assigned uniquely and sequentially,
-    while skipping manually moved sets."""
+def reorder_sets_after_creation(sender, instance, created, update_fields, **kwargs):
+    """Keeps `set_number` sequential for the saved set's exercise only."""
+    bump_workout_version(instance.workout_id)
 
-    # 🚨 Check if the move_set function is active and SKIP reordering if true
-    if getattr(local_storage, "disable_reorder_signal", False):
+    if update_fields is not None and not NUMBERING_FIELDS & set(update_fields):
         return
 
-    sets = SetDict.objects.filter(workout=instance.workout).order_by("set_order")
-    exercise_count = {}
+    exercise = exercise_key(instance.exercise_id, instance.exercise_name)
+    exercises = {exercise}
+    if not created and instance._loaded_exercise_key is not None:
+        exercises.add(instance._loaded_exercise_key)
 
-    for index, set_instance in enumerate(sets, start=1):
-        exercise_name = set_instance.exercise_name
+    renumber_affected_exercises(instance, exercises)
+    instance._loaded_exercise_key = exercise
 
-        if exercise_name not in exercise_count:
-            exercise_count[exercise_name] = 1
-        else:
-            exercise_count[exercise_name] += 1
 
-        set_instance.set_number = exercise_count[exercise_name]
-        set_instance.set_order = index  # ✅ Reassign `set_order` for other sets
+def deleted_with_workout(origin):
+    """Whether a set's deletion cascaded from its workout (or user) going away."""
+    if origin is None:
+        return False
+    return not (isinstance(origin, SetDict) or getattr(origin, "model", None) is SetDict)
 
-    SetDict.objects.bulk_update(sets, ["set_number", "set_order"])
+
+@receiver(post_delete, sender=SetDict)
+def reorder_sets_after_deletion(sender, instance, origin=None, **kwargs):
+    """Keeps `set_number` sequential for the deleted set's exercise only.
+
+    Gaps left in `set_order` are harmless, so the remaining keys are untouched.
+    Nothing is renumbered when the whole workout is being deleted."""
+    if deleted_with_workout(origin):
+        return
+    renumber_exercise_sets(
+        instance.workout_id, exercise_key(instance.exercise_id, instance.exercise_name)
+    )
+    bump_workout_version(instance.workout_id)
 
 
 @receiver(post_delete, sender=SetDict)
-def reorder_sets_after_deletion(sender, instance, **kwargs):
-    """Ensures `set_number` and `set_order` update correctly after a set is deleted."""
+def update_summary_after_deletion(sender, instance, origin=None, **kwargs):
+    """Takes the deleted set out of its workout's summary."""
+    if deleted_with_workout(origin):
+        return  # ✅ The summary goes with the workout
+    if instance._loaded_lift is None:
+        rebuild_workout_summaries([instance.workout_id])
+        return
+    delta = tuple(-value for value in set_contribution(*instance._loaded_lift))
+    adjust_workout_summary(instance.workout_id, delta, recount_exercises=True)
+
+
+def workout_user_id(instance):
+    """Returns the user owning a set's workout, looked up once per instance."""
+    if not hasattr(instance, "_workout_user_id"):
+        instance._workout_user_id = (
+            Workout.objects.filter(id=instance.workout_id)
+            .values_list("user_id", flat=True)
+            .first()
+        )
+    return instance._workout_user_id
+
+
+@receiver(post_delete, sender=SetDict)
+def rebuild_records_after_deletion(sender, instance, origin=None, **kwargs):
+    """Hands the records a deleted lifted set held to the next best sets.
+
+    Its records went with it, and it may have counted towards a session
+    volume record, so the exercise's records are rebuilt."""
+    if deleted_with_workout(origin):
+        return  # ✅ Rebuilt once for the workout, if it was deleted alone
+    if instance._loaded_lift is not None and not holds_record(*instance._loaded_lift):
+        return
+    user_id = workout_user_id(instance)
+    if user_id:
+        rebuild_user_records(
+            [user_id], exercise_key(instance.exercise_id, instance.exercise_name)
+        )
+
 
-    # ✅ Fetch all remaining sets in this workout ordered by `set_order`
-    remaining_sets = list(
-        SetDict.objects.filter(workout=instance.workout).order_by("set_order")
+@receiver(post_delete, sender=SetDict)
+def record_set_tombstone(sender, instance, origin=None, **kwargs):
+    """Leaves a tombstone so delta sync can tell clients the set is gone."""
+    if deleted_with_workout(origin):
+        return  # ✅ The workout's own tombstone covers it
+    user_id = workout_user_id(instance)
+    if user_id:
+        Tombstone.objects.create(
+            user_id=user_id, kind=Tombstone.SET, object_id=instance.pk
+        )
+
+
+@receiver(post_delete, sender=Workout)
+def record_workout_tombstone(sender, instance, **kwargs):
+    """Leaves a tombstone so delta sync can tell clients the workout is gone."""
+    Tombstone.objects.create(
+        user_id=instance.user_id, kind=Tombstone.WORKOUT, object_id=instance.pk
+    )
+
+
+def deleted_on_its_own(origin):
+    """Whether a workout's deletion was asked for, rather than its user's."""
+    return isinstance(origin, Workout) or getattr(origin, "model", None) is Workout
+
+
+@receiver(pre_delete, sender=Workout)
+def remember_held_records(sender, instance, origin=None, **kwargs):
+    """Notes whether the workout's sets hold records, before they cascade away."""
+    instance._held_records = deleted_on_its_own(origin) and (
+        UserRecord.objects.filter(set_dict__workout_id=instance.pk).exists()
     )
 
-    # ✅ Dictionary to track counts for each exercise
-    exercise_count = {}
 
-    # ✅ Reassign `set_number` and `set_order` dynamically
-    for index, set_instance in enumerate(remaining_sets, start=1):
-        exercise_name = set_instance.exercise_name
+@receiver(post_delete, sender=Workout)
+def rebuild_records_after_workout_deletion(sender, instance, **kwargs):
+    """Rebuilds the user's records once a workout took those its sets held."""
+    if getattr(instance, "_held_records", False):
+        rebuild_user_records([instance.user_id])
+
+
+@receiver(post_save, sender=Workout)
+def create_workout_summary(sender, instance, created, **kwargs):
+    """Starts every new workout with an empty summary."""
+    if created:
+        WorkoutSummary.objects.create(workout=instance)
+
+
+@receiver(pre_save, sender=Workout)
+def keep_stored_version(sender, instance, **kwargs):
+    """Stops a save from writing back a `version` loaded before other changes."""
+    if not instance._state.adding:
+        instance.version = F("version")
+
 
-        if exercise_name not in exercise_count:
-            exercise_count[exercise_name] = 1  # ✅ Start from 1 for each exercise
-        else:
-            exercise_count[exercise_name] += 1  # ✅ Increment count
+@receiver(post_save, sender=Workout)
+def bump_version_after_save(sender, instance, created, **kwargs):
+    """Counts every save of an existing workout as a new version."""
+    if not created:
+        instance.version = bump_workout_version(instance.pk, instance)
 
-        set_instance.set_number = exercise_count[exercise_name]
-        set_instance.set_order = index  # ✅ Ensure order remains sequential
 
-    # ✅ Bulk update all affected sets
-    SetDict.objects.bulk_update(remaining_sets, ["set_number", "set_order"])
+@receiver(post_save, sender=Exercise)
+@receiver(post_delete, sender=Exercise)
+def clear_exercise_lookup(sender, **kwargs):
+    """Drops the cached name lookup whenever the catalogue changes."""
+    clear_exercise_ids_cache()
@@ -0,0 +1,82 @@
+from django.db import connection
+
+# Distinct exercises among a workout's sets: catalogued by id, others by name
+EXERCISE_COUNT_SQL = (
+    "COUNT(DISTINCT {p}exercise_id) "
+    "+ COUNT(DISTINCT {p}exercise_name) FILTER (WHERE {p}exercise_id IS NULL)"
+)
+
+# Workouts recomputed per statement by `rebuild_workout_summaries`
+SUMMARY_REBUILD_BATCH_SIZE = 1000
+
+
+def set_contribution(complete, loading, reps):
+    """What one set adds to its workout's `(set_count, completed_set_count,
+    total_volume)` counters."""
+    volume = loading * reps if loading is not None and reps is not None else 0.0
+    return (1, 1 if complete else 0, volume)
+
+
+def rebuild_workout_summaries(workout_ids):
+    """Recomputes the summaries of the given workouts from their sets in one
+    statement, creating any that are missing. Used by bulk writes, which
+    skip the set hooks, and by the backfill."""
+    if not workout_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO workouts_workoutsummary AS summary (
+                workout_id, set_count, completed_set_count, exercise_count, total_volume
+            )
+            SELECT w.id,
+                   COUNT(s.id),
+                   COUNT(s.id) FILTER (WHERE s.complete),
+                   {EXERCISE_COUNT_SQL.format(p='s.')},
+                   COALESCE(SUM(s.loading * s.reps), 0)
+            FROM workouts_workout w
+            LEFT JOIN workouts_setdict s ON s.workout_id = w.id
+            WHERE w.id = ANY(%s)
+            GROUP BY w.id
+            ON CONFLICT (workout_id) DO UPDATE SET
+                set_count = EXCLUDED.set_count,
+                completed_set_count = EXCLUDED.completed_set_count,
+                exercise_count = EXCLUDED.exercise_count,
+                total_volume = EXCLUDED.total_volume
+            """,
+            [list(workout_ids)],
+        )
+
+
+def adjust_workout_summary(workout_id, delta, recount_exercises=False):
+    """Applies a `(sets, completed, volume)` delta to a workout's summary.
+
+    `recount_exercises` recounts distinct exercises from the sets,
+    for writes that may add or remove an exercise. A workout without a
+    summary row yet gets one rebuilt from scratch instead."""
+    sets, completed, volume = delta
+    exercise_count = "exercise_count"
+    params = [sets, completed, volume]
+    if recount_exercises:
+        exercise_count = (
+            f"(SELECT {EXERCISE_COUNT_SQL.format(p='')} FROM workouts_setdict "
+            "WHERE workout_id = %s)"
+        )
+        params.append(workout_id)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE workouts_workoutsummary SET
+                set_count = set_count + %s,
+                completed_set_count = completed_set_count + %s,
+                total_volume = total_volume + %s,
+                exercise_count = {exercise_count}
+            WHERE workout_id = %s
+            """,
+            params + [workout_id],
+        )
+        updated = cursor.rowcount
+
+    if not updated:
+        rebuild_workout_summaries([workout_id])
@@ -8,7 +8,7 @@ from tests.conftest import (
     api_client,
     factory,
     authenticated_client,
-    
+    clear_cache,
 )
 from django.utils.timezone import now
 
@@ -0,0 +1,217 @@
+import io
+import pytest
+from datetime import date, timedelta
+from django.core.management import call_command
+from django.urls import reverse
+from workouts.exercises import exercise_ids_by_name
+from workouts.models import SetDict, Workout
+
+
+@pytest.fixture
+def squat_history(create_user):
+    """Six weekly squat sessions, each with two completed sets and a planned one."""
+    workouts = Workout.objects.bulk_create(
+        [
+            Workout(
+                user=create_user,
+                workout_name="Legs",
+                date=date(2024, 1, 1) + timedelta(weeks=week),
+            )
+            for week in range(6)
+        ]
+    )
+    sets = []
+    for week, workout in enumerate(workouts):
+        sets += [
+            SetDict(workout=workout, exercise_name="Squat", set_order=1,
+                    loading=100 + 5 * week, reps=5, complete=True),
+            SetDict(workout=workout, exercise_name="Squat", set_order=2,
+                    loading=120 + 5 * week, reps=1, complete=True),
+            SetDict(workout=workout, exercise_name="Squat", set_order=3,
+                    loading=200, reps=5),  # ❌ Planned, not lifted
+            SetDict(workout=workout, exercise_name="Bench Press", set_order=4,
+                    loading=80, reps=5, complete=True),
+        ]
+    SetDict.objects.bulk_create(sets)
+    return workouts
+
+
+def _progress(client, name="Squat", **params):
+    return client.get(reverse("exercise-analytics", args=[name]), params)
+
+
+@pytest.mark.django_db
+def test_exercise_progress_per_session(
+    authenticated_client, squat_history, django_assert_num_queries
+):
+    """Test that each session gets its best set, estimated 1RM, volume and reps."""
+    exercise_ids_by_name()  # ✅ The catalogue lookup is cached across requests
+    with django_assert_num_queries(1):  # ✅ One grouped query
+        response = _progress(authenticated_client)
+
+    assert response.status_code == 200
+    points = response.data["points"]
+    assert len(points) == 6
+    assert points[0] == {
+        "date": date(2024, 1, 1),
+        "sessions": 1,
+        "sets": 2,
+        "best_set": {"loading": 120.0, "reps": 1},  # ✅ 120 beats 100 × 5 (116.67)
+        "estimated_1rm": 120.0,
+        "volume": 620.0,
+        "reps": 6,
+    }
+    assert points[-1]["best_set"] == {"loading": 125.0, "reps": 5}
+    assert points[-1]["estimated_1rm"] == 145.83
+
+
+@pytest.mark.django_db
+def test_exercise_progress_buckets_and_downsamples(authenticated_client, squat_history):
+    """Test that sessions can be bucketed by month and merged down to fewer points."""
+    monthly = _progress(authenticated_client, bucket="month").data["points"]
+    assert [(p["date"], p["sessions"]) for p in monthly] == [
+        (date(2024, 1, 1), 5),
+        (date(2024, 2, 1), 1),
+    ]
+
+    downsampled = _progress(authenticated_client, points=2).data["points"]
+    assert [p["sessions"] for p in downsampled] == [3, 3]
+    assert sum(p["volume"] for p in downsampled) == sum(
+        620 + 30 * week for week in range(6)
+    )
+
+
+@pytest.mark.django_db
+def test_exercise_progress_filters_and_validates(authenticated_client, squat_history):
+    """Test the date range filter and the parameter checks."""
+    points = _progress(authenticated_client, **{"from": "2024-01-15"}).data["points"]
+    assert points[0]["date"] == date(2024, 1, 15)
+
+    assert _progress(authenticated_client, bucket="year").status_code == 400
+    assert _progress(authenticated_client, points=0).status_code == 400
+    assert _progress(authenticated_client, to="soon").status_code == 400
+
+
+@pytest.mark.django_db
+def test_exercise_progress_is_per_user(api_client, squat_history, create_user_2):
+    """Test that other users' sets never appear in a progress series."""
+    api_client.force_authenticate(user=create_user_2)
+
+    assert _progress(api_client).data["points"] == []
+
+
+@pytest.fixture
+def daily_training(create_user):
+    """Fourteen days of training: 1000 kg a day, then 2000 kg a day."""
+    workouts = Workout.objects.bulk_create(
+        [
+            Workout(user=create_user, workout_name="Daily", date=date(2024, 3, 1) + timedelta(days=day))
+            for day in range(14)
+        ]
+    )
+    SetDict.objects.bulk_create(
+        [
+            SetDict(workout=workout, exercise_name="Squat", set_order=1,
+                    loading=100 if day < 7 else 200, reps=10, set_duration=30, complete=True)
+            for day, workout in enumerate(workouts)
+        ]
+    )
+    return workouts
+
+
+def _load(client, **params):
+    return client.get(reverse("load-analytics"), params)
+
+
+@pytest.mark.django_db
+def test_training_load_windows(authenticated_client, daily_training):
+    """Test rolling load, acute:chronic ratio, monotony and strain."""
+    data = _load(authenticated_client, to="2024-03-14").data
+
+    assert data["days"][0] == "2024-03-01"
+    assert len(data["days"]) == 14
+    assert data["volume"][:2] == [1000.0, 1000.0]
+    assert data["acute_load"][6] == 7000.0
+    assert data["acute_load"][13] == 14000.0
+    assert data["chronic_load"][13] == 5250.0  # ✅ 21000 over 28 days, per week
+    assert data["acwr"][13] == 2.67
+    assert data["monotony"][6] is None  # ✅ Identical days: no spread to divide by
+    # ✅ Days 4-10: four at 1000 kg and three at 2000 kg
+    assert data["monotony"][9] == 2.89
+    assert data["strain"][9] == pytest.approx(28867.5, abs=0.1)
+    assert data["acute_duration"][13] == 210
+
+
+@pytest.mark.django_db
+def test_training_load_from_keeps_windows_whole(authenticated_client, daily_training):
+    """Test that `from` trims the days shown, not the history the windows cover."""
+    data = _load(authenticated_client, **{"from": "2024-03-10", "to": "2024-03-20"}).data
+
+    assert data["days"][0] == "2024-03-10"
+    assert data["acute_load"][0] == 10000.0  # ✅ Still counts 4-9 March
+    assert data["volume"][-1] == 0.0  # ✅ Rest days after the last workout count
+
+
+@pytest.mark.django_db
+def test_training_load_cache_follows_workout_changes(
+    authenticated_client, daily_training, django_assert_num_queries
+):
+    """Test that load is served from the cache until a workout changes."""
+    first = _load(authenticated_client, to="2024-03-14").data
+    with django_assert_num_queries(1):  # ✅ Just the change stamp
+        assert _load(authenticated_client, to="2024-03-14").data == first
+
+    SetDict.objects.create(
+        workout=daily_training[-1], exercise_name="Squat", loading=100, reps=10, complete=True
+    )
+
+    assert _load(authenticated_client, to="2024-03-14").data["volume"][-1] == 3000.0
+
+
+@pytest.mark.django_db
+def test_training_load_validates_dates(authenticated_client):
+    """Test that bad or reversed date ranges are refused."""
+    assert _load(authenticated_client, to="soon").status_code == 400
+    assert _load(authenticated_client, **{"from": "2024-02-01", "to": "2024-01-01"}).status_code == 400
+    assert _load(authenticated_client).data["days"] == []
+
+
+@pytest.fixture
+def catalogue(db):
+    """Catalogue entries for squats (with an overlapping synergist) and curls,
+    with any sets already logged linked to them."""
+    from core.models import Exercise
+
+    Exercise.objects.create(
+        name="Squat", target_muscles=["Quads", "Glutes"],
+        synergist_muscles=["Hamstrings", "Glutes"],
+    )
+    Exercise.objects.create(name="Bicep Curl", muscle_group="Biceps")
+    call_command("backfill_set_exercises", stdout=io.StringIO())
+
+
+@pytest.mark.django_db
+def test_muscle_volume_weights_synergists(authenticated_client, squat_history, catalogue):
+    """Test weekly per-muscle totals, with synergists counting half a set."""
+    response = authenticated_client.get(
+        reverse("muscle-analytics"), {"from": "2024-01-01", "to": "2024-01-07"}
+    )
+
+    assert response.status_code == 200
+    assert response.data["totals"] == [
+        {"week": date(2024, 1, 1), "muscle": "Glutes", "sets": 2.0, "volume": 620.0},
+        {"week": date(2024, 1, 1), "muscle": "Hamstrings", "sets": 1.0, "volume": 310.0},
+        {"week": date(2024, 1, 1), "muscle": "Quads", "sets": 2.0, "volume": 620.0},
+    ]  # ✅ Bench Press isn't catalogued, so it is left out
+
+
+@pytest.mark.django_db
+def test_muscle_volume_matches_names_ignoring_case(authenticated_client, create_workout, catalogue):
+    """Test that logged names join the catalogue regardless of case, and `muscle` filters."""
+    SetDict.objects.create(
+        workout=create_workout, exercise_name="bicep curl", loading=10, reps=10, complete=True
+    )
+
+    totals = authenticated_client.get(reverse("muscle-analytics"), {"muscle": "Biceps"}).data["totals"]
+
+    assert [(t["muscle"], t["sets"], t["volume"]) for t in totals] == [("Biceps", 1.0, 100.0)]
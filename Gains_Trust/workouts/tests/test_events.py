@@ -0,0 +1,153 @@
+import asyncio
+import json
+import pytest
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.test import AsyncClient
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from workouts.models import Workout, SetDict
+from workouts.views import update_active_set
+
+
+def _parse(message):
+    """Returns the event name and payload of one server-sent event."""
+    fields = dict(line.split(": ", 1) for line in message.decode().strip().split("\n"))
+    return fields["event"], json.loads(fields["data"])
+
+
+def _complete_set(user, set_id):
+    """Completes a set through the API from another thread, so it commits."""
+    client = APIClient()
+    client.force_authenticate(user=user)
+    try:
+        return client.patch(reverse("sets-complete-set", args=[set_id])).status_code
+    finally:
+        connection.close()
+
+
+@pytest.mark.django_db
+def test_events_require_authentication(create_workout):
+    """Test that the stream rejects requests without a valid token."""
+    url = reverse("workout-events", args=[create_workout.id])
+
+    response = asyncio.run(AsyncClient().get(url, {"token": "not-a-token"}))
+
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db(transaction=True)
+def test_events_stream_pushes_committed_changes(create_user):
+    """Test that the stream opens with a snapshot, then pushes changes made by
+    other connections as Postgres delivers them."""
+    workout = Workout.objects.create(user=create_user, workout_name="Push Day", start_time=now())
+    first = SetDict.objects.create(workout=workout, exercise_name="Squat", rest=60)
+    second = SetDict.objects.create(workout=workout, exercise_name="Squat")
+    update_active_set(workout.id)
+    url = reverse("workout-events", args=[workout.id])
+    token = str(AccessToken.for_user(create_user))
+
+    async def follow():
+        response = await AsyncClient().get(url, {"token": token})
+        stream = aiter(response.streaming_content)
+        try:
+            snapshot = _parse(await anext(stream))
+            status = await sync_to_async(_complete_set, thread_sensitive=False)(
+                create_user, first.id
+            )
+            events = [
+                _parse(await asyncio.wait_for(anext(stream), timeout=5))
+                for _ in range(2)
+            ]
+        finally:
+            await stream.aclose()
+        return response, snapshot, status, events
+
+    response, snapshot, status, events = asyncio.run(follow())
+
+    assert response["Content-Type"] == "text/event-stream"
+    assert snapshot[0] == "snapshot"
+    assert snapshot[1]["data"]["active_set"]["id"] == first.id
+    assert status == 200
+    assert [name for name, _ in events] == ["set_completed", "active_set"]
+    assert events[1][1]["data"]["set"] == second.id
+    assert events[1][1]["data"]["set_start_time"] is not None
+    assert events[1][1]["version"] > snapshot[1]["version"]
+
+
+def test_event_hub_connects_off_the_event_loop(monkeypatch):
+    """Test that opening the LISTEN connection leaves the event loop free, and
+    that streams subscribing together share one connection."""
+    import socket
+    import time
+    from workouts.events import WorkoutEventHub
+
+    readable, writable = socket.socketpair()
+    connects = []
+
+    class Listener:
+        closed = False
+
+        def fileno(self):
+            return readable.fileno()
+
+        def close(self):
+            self.closed = True
+
+    listener = Listener()
+
+    def slow_connect(params):
+        time.sleep(0.2)  # ✅ Blocks like a real connect
+        connects.append(params)
+        return listener
+
+    monkeypatch.setattr(WorkoutEventHub, "_connect", staticmethod(slow_connect))
+
+    async def subscribe_twice():
+        hub = WorkoutEventHub(asyncio.get_running_loop())
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(tick())
+        first, second = await asyncio.gather(hub.subscribe(1), hub.subscribe(2))
+        ticker.cancel()
+        hub.unsubscribe(1, first)
+        hub.unsubscribe(2, second)
+        return ticks
+
+    try:
+        ticks = asyncio.run(subscribe_twice())
+    finally:
+        readable.close()
+        writable.close()
+
+    assert ticks > 5  # ✅ The loop kept running while connecting
+    assert len(connects) == 1
+    assert listener.closed
+
+
+def test_event_hub_ends_full_streams_on_disconnect():
+    """Test that losing the LISTEN connection ends even streams too slow to
+    have room for another event, so every client reconnects."""
+    from workouts.events import STREAM_QUEUE_SIZE, WorkoutEventHub
+
+    async def disconnect():
+        hub = WorkoutEventHub(asyncio.get_running_loop())
+        slow, idle = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE), asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        for number in range(STREAM_QUEUE_SIZE):
+            slow.put_nowait({"event": "reorder", "version": number})
+        hub.subscribers[1].update([slow, idle])
+        hub._disconnect_all()
+        return [await queue.get() for queue in (slow, idle)], hub.subscribers
+
+    ends, subscribers = asyncio.run(disconnect())
+
+    assert ends == [None, None]
+    assert not subscribers
@@ -0,0 +1,96 @@
+import io
+import pytest
+from django.core.management import call_command
+from workouts.importing import import_workouts
+from workouts.models import SetDict, Workout
+from workouts.ordering import SET_ORDER_GAP
+
+STRONG_CSV = """Date,Workout Name,Duration,Exercise Name,Set Order,Weight,Reps,Distance,Seconds,Notes,Workout Notes,RPE
+2023-01-05 18:30:00,Push,1h 5m,Bench Press (Barbell),W,40,10,0,0,,Felt good,
+2023-01-05 18:30:00,Push,1h 5m,Bench Press (Barbell),1,80,5,0,0,,Felt good,
+2023-01-05 18:30:00,Push,1h 5m,Overhead Press,1,40,8,0,0,,Felt good,
+2023-01-05 18:30:00,Push,1h 5m,Bench Press (Barbell),2,80,five,0,0,,Felt good,
+2023-01-07 09:00:00,Legs,45m,Squat (Barbell),1,100,5,0,0,,,
+"""
+
+HEVY_CSV = """title,start_time,end_time,description,exercise_title,superset_id,exercise_notes,set_index,set_type,weight_lbs,reps,distance_miles,duration_seconds,rpe
+Pull,"5 Jan 2023, 18:30","5 Jan 2023, 19:30",,Deadlift,,,0,warmup,135,5,,,
+Pull,"5 Jan 2023, 18:30","5 Jan 2023, 19:30",,Deadlift,,,1,normal,315,3,,,
+"""
+
+
+@pytest.mark.django_db
+def test_import_strong_csv(create_user, django_assert_max_num_queries):
+    """Test that a Strong export becomes workouts with numbered sets in a few INSERTs."""
+    with django_assert_max_num_queries(8):  # ✅ Not one INSERT per row
+        summary = import_workouts(create_user, io.StringIO(STRONG_CSV))
+
+    assert summary["format"] == "strong"
+    assert (summary["workouts"], summary["sets"], summary["error_count"]) == (2, 4, 1)
+    assert summary["errors"] == [{"line": 5, "error": "'five' is not a number"}]
+
+    push = Workout.objects.get(user=create_user, workout_name="Push")
+    assert push.duration == 3900
+    sets = list(push.set_dicts.order_by("set_order"))
+    assert [s.set_order for s in sets] == [SET_ORDER_GAP, 2 * SET_ORDER_GAP, 3 * SET_ORDER_GAP]
+    assert [s.set_number for s in sets] == [1, 2, 1]
+    assert sets[0].set_type == "Warm-up"
+    assert (push.summary.set_count, push.summary.exercise_count) == (3, 2)
+
+
+@pytest.mark.django_db
+def test_import_hevy_csv_converts_pounds(create_user):
+    """Test that Hevy exports in pounds are stored in kilograms."""
+    summary = import_workouts(create_user, io.StringIO(HEVY_CSV))
+
+    workout = Workout.objects.get(user=create_user)
+    assert summary["format"] == "hevy"
+    assert workout.duration == 3600
+    assert [s.loading for s in workout.set_dicts.order_by("set_order")] == [61.23, 142.88]
+
+
+@pytest.mark.django_db
+def test_import_reports_out_of_range_numbers(create_user):
+    """Test that numbers too big for their columns are row errors, not a failed import."""
+    header = STRONG_CSV.splitlines()[0]
+    rows = [
+        "2023-01-05 18:30:00,Push,1h,Bench Press,1,80,inf,0,0,,,",
+        "2023-01-05 18:30:00,Push,1h,Bench Press,1,80,99999999999,0,0,,,",
+        "2023-01-05 18:30:00,Push,1h,Bench Press,1,1e300,5,0,0,,,",
+        "2023-01-05 18:30:00,Push,1h,Bench Press,1,nan,5,0,0,,,",
+        "2023-01-05 18:30:00,Push,999999h,Bench Press,1,80,5,0,0,,,",
+        "2023-01-05 18:30:00,Push,1h,Bench Press,1,80,5,0,0,,,",
+    ]
+    summary = import_workouts(create_user, io.StringIO("\n".join([header, *rows])))
+
+    assert (summary["workouts"], summary["sets"], summary["error_count"]) == (1, 1, 5)
+    assert summary["errors"] == [
+        {"line": 2, "error": "'inf' is out of range"},
+        {"line": 3, "error": "'99999999999' is out of range"},
+        {"line": 4, "error": "'1e300' is out of range"},
+        {"line": 5, "error": "'nan' is not a number"},
+        {"line": 6, "error": "'999999h' is out of range"},
+    ]
+    assert SetDict.objects.get(workout__user=create_user).reps == 5
+
+
+@pytest.mark.django_db
+def test_import_rejects_unknown_csv(create_user):
+    """Test that a CSV from an unknown tracker is refused before anything is written."""
+    with pytest.raises(ValueError):
+        import_workouts(create_user, io.StringIO("a,b\n1,2\n"))
+    assert not Workout.objects.exists()
+
+
+@pytest.mark.django_db
+def test_import_workouts_command(create_user, tmp_path):
+    """Test that the management command imports a file and reports progress."""
+    path = tmp_path / "strong.csv"
+    path.write_text(STRONG_CSV)
+    out, err = io.StringIO(), io.StringIO()
+
+    call_command("import_workouts", str(path), user=create_user.username, stdout=out, stderr=err)
+
+    assert SetDict.objects.filter(workout__user=create_user).count() == 4
+    assert "5 rows read" in out.getvalue()
+    assert "Line 5" in err.getvalue()
@@ -0,0 +1,180 @@
+import pytest
+from datetime import date, timedelta
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils.timezone import now
+from users.models import Weight
+from workouts.models import Workout, SetDict
+from workouts.ordering import SET_ORDER_GAP
+
+User = get_user_model()
+
+
+@pytest.fixture
+def seeded_history(db):
+    """Seeds enough history for the planner to prefer indexes over seq scans."""
+    users = User.objects.bulk_create(
+        [User(username=f"lifter{i}", password="x") for i in range(30)]
+    )
+    workouts = Workout.objects.bulk_create(
+        [
+            Workout(
+                user=user,
+                workout_name=f"Session {day}",
+                date=date(2024, 1, 1) + timedelta(days=day),
+            )
+            for user in users
+            for day in range(25)
+        ]
+    )
+    SetDict.objects.bulk_create(
+        [
+            SetDict(
+                workout=workout,
+                exercise_name="Squat",
+                set_order=index * SET_ORDER_GAP,
+                complete=index < 10,  # Most logged sets are done
+                is_active_set=index == 10,
+            )
+            for workout in workouts
+            for index in range(1, 13)
+        ]
+    )
+    Weight.objects.bulk_create(
+        [Weight(user=user, weight=80) for user in users for _ in range(25)]
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "ANALYZE users_user, users_weight, workouts_workout, workouts_setdict"
+        )
+    return users[0], workouts[0]
+
+
+def _plan(queryset):
+    return queryset.explain()
+
+
+@pytest.mark.django_db
+def test_workout_list_uses_user_date_index(seeded_history):
+    """Test that a user's workouts by date come from the composite index."""
+    user, _ = seeded_history
+    # ✅ A page of the list, as the cursor paginator fetches it
+    plan = _plan(Workout.objects.filter(user=user).order_by("-date", "-id")[:11])
+
+    assert "workout_user_date_idx" in plan
+
+
+@pytest.mark.django_db
+def test_running_order_uses_workout_order_index(seeded_history):
+    """Test that a workout's sets in running order come from the composite index."""
+    _, workout = seeded_history
+    plan = _plan(SetDict.objects.filter(workout=workout).order_by("set_order", "id"))
+
+    assert "setdict_workout_order_idx" in plan
+
+
+@pytest.mark.django_db
+def test_next_incomplete_set_uses_partial_index(seeded_history):
+    """Test that the next incomplete set lookup uses the partial index."""
+    _, workout = seeded_history
+    plan = _plan(
+        SetDict.objects.filter(workout_id=workout.id, complete=False).order_by("set_order")
+    )
+
+    assert "setdict_incomplete_order_idx" in plan
+
+
+@pytest.mark.django_db
+def test_active_set_uses_partial_index(seeded_history):
+    """Test that the active set lookup uses the partial index."""
+    _, workout = seeded_history
+    plan = _plan(SetDict.objects.filter(workout_id=workout.id, is_active_set=True))
+
+    assert "setdict_one_active_set" in plan
+
+
+@pytest.mark.django_db
+def test_user_sets_use_user_date_index(seeded_history):
+    """Test that a user's sets are found from the user's workouts by index."""
+    user, _ = seeded_history
+    plan = _plan(SetDict.objects.filter(workout__user=user))
+
+    # ✅ Either user-leading workout index finds the user's workouts
+    assert "workout_user_date_idx" in plan or "workout_user_updated_idx" in plan
+    assert "Seq Scan on workouts_workout" not in plan
+
+
+@pytest.mark.django_db
+def test_sync_uses_user_updated_indexes(seeded_history):
+    """Test that delta sync finds recent changes by index, not by scanning history."""
+    user, _ = seeded_history
+    since = now()  # ✅ A recent cursor: nothing in the seeded history is newer
+
+    assert "workout_user_updated_idx" in _plan(
+        Workout.objects.filter(user=user, updated_at__gt=since)
+    )
+    assert "weight_user_updated_idx" in _plan(
+        Weight.objects.filter(user=user, updated_at__gt=since)
+    )
+
+
+@pytest.mark.django_db
+def test_weight_list_uses_user_recorded_index(seeded_history):
+    """Test that a user's weights by date come from the composite index."""
+    user, _ = seeded_history
+    plan = _plan(
+        Weight.objects.filter(user=user).order_by("-date_recorded", "id")[:11]
+    )
+
+    assert "weight_user_recorded_idx" in plan
+
+
+@pytest.mark.django_db
+def test_exercise_analytics_uses_workout_exercise_index(seeded_history):
+    """Test that one user's sets of an exercise come from the covering index."""
+    from core.models import Exercise
+
+    user, _ = seeded_history
+    deadlift = Exercise.objects.create(name="Deadlift")
+    # ✅ An exercise among many: only its sets should be read
+    plan = _plan(
+        SetDict.objects.filter(workout__user=user, exercise=deadlift).values(
+            "loading", "reps", "complete"
+        )
+    )
+
+    assert "setdict_workout_exercise_idx" in plan
+
+
+@pytest.mark.django_db
+def test_exercise_analytics_uses_workout_name_index(seeded_history):
+    """Test that one user's sets of an uncatalogued exercise come from the
+    partial name index."""
+    user, _ = seeded_history
+    # ✅ A name among many: only its sets should be read
+    plan = _plan(
+        SetDict.objects.filter(
+            workout__user=user, exercise__isnull=True, exercise_name="Farmer Carry"
+        ).values("loading", "reps", "complete")
+    )
+
+    assert "setdict_workout_name_idx" in plan
+
+
+@pytest.mark.django_db
+def test_exercise_catalogue_indexes():
+    """Test that catalogue lookups by muscle use their indexes."""
+    from core.models import Exercise
+
+    Exercise.objects.bulk_create(
+        [
+            Exercise(name=f"Exercise {i}", target_muscles=[f"Muscle {i % 1000}"])
+            for i in range(5000)
+        ]
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE core_exercise")
+
+    assert "exercise_target_gin_idx" in _plan(
+        Exercise.objects.filter(target_muscles__overlap=["Muscle 7"])
+    )
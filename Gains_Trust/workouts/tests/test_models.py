@@ -1,7 +1,9 @@
 import pytest
 from workouts.models import Workout, SetDict
+from workouts.ordering import SET_ORDER_GAP, move_set_to_position
 from datetime import datetime, timedelta
 from django.utils.timezone import now
+from django.db import IntegrityError, connection, transaction
 
 @pytest.mark.django_db
 def test_create_workout(create_user):
@@ -28,7 +30,7 @@ def test_create_setdict(create_workout):
 
     assert set_dict.workout == create_workout
     assert set_dict.exercise_name == "Squat"
-    assert set_dict.set_order == 1
+    assert set_dict.set_order == SET_ORDER_GAP  # ✅ Appended as the first key
     assert set_dict.set_number == 1
     assert set_dict.reps == 10
     assert set_dict.loading == 100.0
@@ -84,3 +86,44 @@ def test_setdict_with_optional_fields(create_workout):
     assert set_dict.is_active_set is True
     assert set_dict.set_start_time is not None
     assert set_dict.set_duration == 30
+
+
+def _check_deferred_constraints():
+    """Runs the checks that would otherwise wait for the test's uncommitted transaction."""
+    with connection.cursor() as cursor:
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+
+@pytest.mark.django_db
+def test_only_one_active_set_per_workout(create_workout):
+    """Test that a workout cannot have two active sets."""
+    SetDict.objects.create(workout=create_workout, exercise_name="Squat", is_active_set=True)
+
+    with pytest.raises(IntegrityError), transaction.atomic():
+        SetDict.objects.create(workout=create_workout, exercise_name="Squat", is_active_set=True)
+
+
+@pytest.mark.django_db
+def test_set_order_unique_per_workout_at_commit(create_workout):
+    """Test that duplicate sort keys are rejected once deferred checks run."""
+    set1 = SetDict.objects.create(workout=create_workout, exercise_name="Squat")
+    set2 = SetDict.objects.create(workout=create_workout, exercise_name="Squat")
+
+    with pytest.raises(IntegrityError), transaction.atomic():
+        SetDict.objects.filter(id=set2.id).update(set_order=set1.set_order)
+        _check_deferred_constraints()
+
+
+@pytest.mark.django_db
+def test_shifted_move_satisfies_unique_order(create_workout):
+    """Test that a move which shifts packed keys leaves them unique at commit."""
+    sets = [SetDict.objects.create(workout=create_workout, exercise_name="Squat") for _ in range(4)]
+    for index, s in enumerate(sets, start=1):
+        SetDict.objects.filter(id=s.id).update(set_order=index)
+    sets[3].set_order = 4
+
+    move_set_to_position(sets[3], 1)
+    _check_deferred_constraints()
+
+    orders = list(SetDict.objects.filter(workout=create_workout).values_list("set_order", flat=True))
+    assert len(orders) == len(set(orders))
@@ -0,0 +1,98 @@
+import pytest
+from workouts.models import SetDict, Workout
+from workouts.ordering import (
+    SET_ORDER_GAP,
+    move_set_to_position,
+    next_set_order,
+    set_position,
+)
+
+
+@pytest.mark.django_db
+def test_next_set_order_empty_workout(create_workout):
+    """Test that the first set in a workout gets the first gap-sized key."""
+    assert next_set_order(create_workout.id) == SET_ORDER_GAP
+
+
+@pytest.mark.django_db
+def test_move_set_to_position_uses_gap(create_workout):
+    """Test that moving between two sets picks a key between them."""
+    set1 = SetDict.objects.create(workout=create_workout, exercise_name="Squat")
+    set2 = SetDict.objects.create(workout=create_workout, exercise_name="Squat")
+    set3 = SetDict.objects.create(workout=create_workout, exercise_name="Squat")
+
+    move_set_to_position(set3, 2)
+
+    set3.refresh_from_db()
+    assert set1.set_order < set3.set_order < set2.set_order
+    assert set_position(set3) == 2
+
+
+def _packed_sets(workout, count):
+    """Creates sets whose keys are consecutive, leaving no gaps to move into."""
+    sets = [
+        SetDict.objects.create(workout=workout, exercise_name="Squat")
+        for _ in range(count)
+    ]
+    for index, s in enumerate(sets, start=1):
+        SetDict.objects.filter(id=s.id).update(set_order=index)
+        s.set_order = index
+    return sets
+
+
+@pytest.mark.django_db
+def test_move_up_without_gap_shifts_only_passed_sets(create_workout):
+    """Test that moving up shifts just the sets between the two positions."""
+    sets = _packed_sets(create_workout, 5)
+
+    move_set_to_position(sets[3], 2)
+
+    for s in sets:
+        s.refresh_from_db()
+    assert [s.set_order for s in sets] == [1, 3, 4, 2, 5]
+    assert [set_position(s) for s in sets] == [1, 3, 4, 2, 5]
+
+
+@pytest.mark.django_db
+def test_move_down_without_gap_shifts_only_passed_sets(create_workout):
+    """Test that moving down shifts just the sets between the two positions."""
+    sets = _packed_sets(create_workout, 5)
+
+    move_set_to_position(sets[0], 3)
+
+    for s in sets:
+        s.refresh_from_db()
+    assert [s.set_order for s in sets] == [3, 1, 2, 4, 5]
+    assert [set_position(s) for s in sets] == [3, 1, 2, 4, 5]
+
+
+@pytest.mark.django_db
+def test_move_past_end_appends(create_workout):
+    """Test that a position past the last set moves the set to the end."""
+    sets = _packed_sets(create_workout, 3)
+
+    move_set_to_position(sets[0], 10)
+
+    sets[0].refresh_from_db()
+    assert set_position(sets[0]) == 3
+    assert sets[0].set_order == 3 + SET_ORDER_GAP
+
+
+@pytest.mark.django_db
+def test_with_positions_partitions_by_workout(create_workout, create_user):
+    """Test that positions restart at 1 for every workout."""
+    other = Workout.objects.create(user=create_user, workout_name="Pull Day")
+    SetDict.objects.create(workout=create_workout, exercise_name="Squat")
+    SetDict.objects.create(workout=create_workout, exercise_name="Squat")
+    SetDict.objects.create(workout=other, exercise_name="Row")
+
+    positions = {
+        (s.workout_id, s.position)
+        for s in SetDict.objects.with_positions()
+    }
+
+    assert positions == {
+        (create_workout.id, 1),
+        (create_workout.id, 2),
+        (other.id, 1),
+    }
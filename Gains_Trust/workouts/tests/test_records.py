@@ -0,0 +1,196 @@
+import io
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from core.models import Exercise
+from users.models import UserRecord
+from workouts.exercises import exercise_ids_by_name
+from workouts.models import SetDict, Workout
+
+
+def _complete(client, set_dict):
+    response = client.patch(reverse("sets-complete-set", args=[set_dict.id]))
+    assert response.status_code == 200
+
+
+def _records(user):
+    return {
+        (r.kind, r.reps): (r.value, r.set_dict_id)
+        for r in UserRecord.objects.filter(user=user, exercise_name="Squat")
+    }
+
+
+@pytest.fixture
+def squat_sets(create_workout):
+    """Three planned squat sets in one workout."""
+    return [
+        SetDict.objects.create(workout=create_workout, exercise_name="Squat", loading=loading, reps=reps)
+        for loading, reps in [(100, 5), (90, 5), (110, 1)]
+    ]
+
+
+@pytest.mark.django_db
+def test_completing_sets_raises_records(authenticated_client, create_user, squat_sets):
+    """Test that completing a set records it only where it beats the standing record."""
+    top, lighter, single = squat_sets
+
+    _complete(authenticated_client, top)
+    _complete(authenticated_client, lighter)  # ❌ Lighter for 5 reps, no new record
+
+    assert _records(create_user) == {
+        (UserRecord.WEIGHT, 5): (100.0, top.id),
+        (UserRecord.ESTIMATED_1RM, 5): (pytest.approx(116.67, abs=0.01), top.id),
+        (UserRecord.SESSION_VOLUME, 10): (950.0, lighter.id),
+    }
+
+    _complete(authenticated_client, single)
+    records = _records(create_user)
+    assert records[(UserRecord.WEIGHT, 1)] == (110.0, single.id)
+    assert records[(UserRecord.ESTIMATED_1RM, 5)][1] == top.id  # ✅ 116.67 beats 110
+    assert records[(UserRecord.SESSION_VOLUME, 11)] == (1060.0, single.id)
+
+
+@pytest.mark.django_db
+def test_undoing_completion_rebuilds_records(authenticated_client, create_user, squat_sets):
+    """Test that un-completing a record set hands the record to the next best set."""
+    top, lighter, _ = squat_sets
+    _complete(authenticated_client, top)
+    _complete(authenticated_client, lighter)
+
+    _complete(authenticated_client, top)  # ✅ Toggles back to not done
+
+    assert _records(create_user)[(UserRecord.WEIGHT, 5)] == (90.0, lighter.id)
+    assert _records(create_user)[(UserRecord.SESSION_VOLUME, 5)] == (450.0, lighter.id)
+
+
+@pytest.mark.django_db
+def test_backfill_records_command(create_user, create_user_2):
+    """Test that the backfill finds every user's best sets and links catalogue exercises."""
+    squat = Exercise.objects.create(name="Squat")
+    for user, loadings in [(create_user, [100, 120, 110]), (create_user_2, [60])]:
+        workout = Workout.objects.create(user=user, workout_name="Legs")
+        SetDict.objects.bulk_create(
+            [
+                SetDict(workout=workout, exercise_name="Squat", set_order=i,
+                        loading=loading, reps=3, complete=True)
+                for i, loading in enumerate(loadings)
+            ]
+        )
+
+    call_command("backfill_set_exercises", stdout=io.StringIO())
+    call_command("backfill_records", batch_size=1, stdout=io.StringIO())
+
+    record = UserRecord.objects.get(user=create_user, kind=UserRecord.WEIGHT)
+    assert (record.value, record.reps, record.exercise_id) == (120.0, 3, squat.id)
+    assert UserRecord.objects.get(user=create_user_2, kind=UserRecord.SESSION_VOLUME).value == 180.0
+    assert UserRecord.objects.count() == 6
+
+
+@pytest.mark.django_db
+def test_records_list(authenticated_client, create_user, squat_sets, django_assert_num_queries):
+    """Test that `/api/records/` lists the user's records in one query."""
+    _complete(authenticated_client, squat_sets[0])
+
+    exercise_ids_by_name()  # ✅ The catalogue lookup is cached across requests
+    with django_assert_num_queries(1):
+        response = authenticated_client.get(reverse("records-list"), {"exercise_name": "Squat"})
+
+    assert response.status_code == 200
+    assert [r["kind"] for r in response.data] == [
+        UserRecord.ESTIMATED_1RM, UserRecord.SESSION_VOLUME, UserRecord.WEIGHT
+    ]
+
+
+@pytest.fixture
+def earlier_squat(create_user):
+    """A completed 90 × 5 squat in an earlier workout."""
+    workout = Workout.objects.create(user=create_user, workout_name="Legs")
+    return SetDict.objects.create(
+        workout=workout, exercise_name="Squat", loading=90, reps=5, complete=True
+    )
+
+
+@pytest.mark.django_db
+def test_deleting_workout_hands_records_to_next_best(
+    authenticated_client, create_user, create_workout, squat_sets, earlier_squat
+):
+    """Test that bulk workout deletion passes its sets' records to the best sets left."""
+    _complete(authenticated_client, squat_sets[0])
+    assert _records(create_user)[(UserRecord.WEIGHT, 5)] == (100.0, squat_sets[0].id)
+
+    response = authenticated_client.delete(reverse("workouts-detail", args=[create_workout.id]))
+
+    assert response.status_code == 204
+    assert _records(create_user) == {
+        (UserRecord.WEIGHT, 5): (90.0, earlier_squat.id),
+        (UserRecord.ESTIMATED_1RM, 5): (105.0, earlier_squat.id),
+        (UserRecord.SESSION_VOLUME, 5): (450.0, earlier_squat.id),
+    }
+
+
+@pytest.mark.django_db
+def test_orm_workout_deletion_hands_records_to_next_best(
+    authenticated_client, create_user, create_workout, squat_sets, earlier_squat
+):
+    """Test that deleting a workout through the ORM also rebuilds the records it held."""
+    _complete(authenticated_client, squat_sets[0])
+
+    create_workout.delete()
+
+    assert _records(create_user)[(UserRecord.WEIGHT, 5)] == (90.0, earlier_squat.id)
+
+
+@pytest.mark.django_db
+def test_deleting_record_set_hands_record_to_next_best(
+    authenticated_client, create_user, squat_sets
+):
+    """Test that deleting the set holding a record hands it to the next best set."""
+    top, lighter, _ = squat_sets
+    _complete(authenticated_client, top)
+    _complete(authenticated_client, lighter)
+
+    response = authenticated_client.delete(reverse("sets-detail", args=[top.id]))
+
+    assert response.status_code == 204
+    assert _records(create_user)[(UserRecord.WEIGHT, 5)] == (90.0, lighter.id)
+    assert _records(create_user)[(UserRecord.SESSION_VOLUME, 5)] == (450.0, lighter.id)
+
+
+@pytest.mark.django_db
+def test_editing_lifted_set_updates_records(authenticated_client, create_user, squat_sets):
+    """Test that changing the load of a completed set lowers or raises its records."""
+    top, lighter, _ = squat_sets
+    _complete(authenticated_client, top)
+    _complete(authenticated_client, lighter)
+    url = reverse("sets-detail", args=[top.id])
+
+    assert authenticated_client.patch(url, {"loading": 60}).status_code == 200
+    assert _records(create_user)[(UserRecord.WEIGHT, 5)] == (90.0, lighter.id)
+    assert _records(create_user)[(UserRecord.SESSION_VOLUME, 10)] == (750.0, lighter.id)
+
+    assert authenticated_client.patch(url, {"loading": 120}).status_code == 200
+    assert _records(create_user)[(UserRecord.WEIGHT, 5)] == (120.0, top.id)
+
+
+@pytest.mark.django_db
+def test_spellings_of_one_exercise_share_records(authenticated_client, create_user, create_workout):
+    """Test that sets logged under two spellings of a catalogue exercise hold one set of records."""
+    squat = Exercise.objects.create(name="Squat")
+    first, second = [
+        SetDict.objects.create(workout=create_workout, exercise_name=name, loading=loading, reps=5)
+        for name, loading in [("squat ", 100), ("SQUAT", 110)]
+    ]
+
+    _complete(authenticated_client, first)
+    _complete(authenticated_client, second)
+
+    records = UserRecord.objects.filter(user=create_user)
+    assert {(r.exercise_id, r.exercise_name) for r in records} == {(squat.id, "Squat")}
+    assert _records(create_user) == {
+        (UserRecord.WEIGHT, 5): (110.0, second.id),
+        (UserRecord.ESTIMATED_1RM, 5): (pytest.approx(128.33, abs=0.01), second.id),
+        (UserRecord.SESSION_VOLUME, 10): (1050.0, second.id),  # ✅ One session volume
+    }
+
+    call_command("backfill_records", stdout=io.StringIO())
+    assert _records(create_user)[(UserRecord.SESSION_VOLUME, 10)] == (1050.0, second.id)
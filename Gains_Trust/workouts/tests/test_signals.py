@@ -1,6 +1,7 @@
+import io
 import pytest
-from workouts.models import SetDict, Workout
-from workouts.signals import local_storage
+from workouts.models import SetDict, Workout, WorkoutSummary
+from workouts.ordering import SET_ORDER_GAP
 
 @pytest.mark.django_db
 def test_assign_set_order(create_user):
@@ -10,8 +11,8 @@ def test_assign_set_order(create_user):
     set1 = SetDict.objects.create(workout=workout, exercise_name="Squat")
     set2 = SetDict.objects.create(workout=workout, exercise_name="Bench Press")
     
-    assert set1.set_order == 1
-    assert set2.set_order == 2
+    assert set1.set_order == SET_ORDER_GAP
+    assert set2.set_order == 2 * SET_ORDER_GAP
 
 @pytest.mark.django_db
 def test_reorder_sets_after_creation(create_user):
@@ -49,9 +50,11 @@ def test_reorder_sets_after_deletion(create_user):
     set1.refresh_from_db()
     set3.refresh_from_db()
     
-    # Check that order is maintained
-    assert set1.set_order == 1
-    assert set3.set_order == 2
+    # Check that order is maintained without rewriting the remaining keys
+    assert set1.set_order == SET_ORDER_GAP
+    assert set3.set_order == 3 * SET_ORDER_GAP
+    assert set1.set_number == 1
+    assert set3.set_number == 2
 
 @pytest.mark.django_db
 def test_reorder_sets_with_different_exercises(create_user):
@@ -75,19 +78,19 @@ def test_reorder_sets_with_different_exercises(create_user):
     assert set4.set_number == 2  # Second bench press
 
 @pytest.mark.django_db 
-def test_reorder_sets_ensures_sequential_set_order(create_user):
-    """Test that set_order is always sequential regardless of creation order."""
+def test_new_sets_are_appended_after_highest_key(create_user):
+    """Test that existing keys are left alone and new sets go after the last one."""
     workout = Workout.objects.create(user=create_user, workout_name="Test Workout")
     
     # Create sets
     set1 = SetDict.objects.create(workout=workout, exercise_name="Squat")
     set2 = SetDict.objects.create(workout=workout, exercise_name="Bench Press")
     
-    # Manually change set_order to test reordering
-    set1.set_order = 5
+    # Manually move the first set past the second one
+    set1.set_order = 5 * SET_ORDER_GAP
     set1.save()
     
-    # Create another set to trigger reordering
+    # Create another set
     set3 = SetDict.objects.create(workout=workout, exercise_name="Deadlift")
     
     # Refresh all sets
@@ -95,35 +98,173 @@ def test_reorder_sets_ensures_sequential_set_order(create_user):
     set2.refresh_from_db()
     set3.refresh_from_db()
     
-    # Check that orders are sequential
-    orders = [set1.set_order, set2.set_order, set3.set_order]
-    orders.sort()
-    assert orders == [1, 2, 3]
+    # Check that no existing key was rewritten
+    assert set1.set_order == 5 * SET_ORDER_GAP
+    assert set2.set_order == 2 * SET_ORDER_GAP
+    assert set3.set_order == 6 * SET_ORDER_GAP
 
 @pytest.mark.django_db
-def test_disable_reorder_signal(create_user):
-    """Test that reordering is disabled when disable_reorder_signal is True."""
+def test_renumber_only_touches_affected_exercise(create_user):
+    """Test that saving a set only renumbers the sets of its own exercise."""
     workout = Workout.objects.create(user=create_user, workout_name="Test Workout")
-    
-    # Set the disable flag
-    local_storage.disable_reorder_signal = True
-    
-    try:
-        # Create sets - reordering should be skipped
-        set1 = SetDict.objects.create(workout=workout, exercise_name="Squat")
-        set2 = SetDict.objects.create(workout=workout, exercise_name="Squat")
-        
-        # Manually set different orders
-        set1.set_order = 10
-        set1.save()
-        
-        # Since reordering is disabled, the order should not change
-        set2.refresh_from_db()
-        
-        # The signal should not have reordered the sets
-        assert set1.set_order == 10
-        
-    finally:
-        # Always clean up the flag
-        local_storage.disable_reorder_signal = False
 
+    bench = SetDict.objects.create(workout=workout, exercise_name="Bench Press")
+    SetDict.objects.filter(id=bench.id).update(set_number=99)  # Deliberately stale
+
+    squat = SetDict.objects.create(workout=workout, exercise_name="Squat")
+
+    bench.refresh_from_db()
+    assert squat.set_number == 1  # ✅ In-memory instance is kept in sync
+    assert bench.set_number == 99  # ✅ Other exercises are never rewritten
+
+@pytest.mark.django_db
+def test_renaming_exercise_renumbers_old_and_new(create_user):
+    """Test that moving a set to another exercise renumbers both exercises."""
+    workout = Workout.objects.create(user=create_user, workout_name="Test Workout")
+
+    squat1 = SetDict.objects.create(workout=workout, exercise_name="Squat")
+    squat2 = SetDict.objects.create(workout=workout, exercise_name="Squat")
+    squat3 = SetDict.objects.create(workout=workout, exercise_name="Squat")
+    bench = SetDict.objects.create(workout=workout, exercise_name="Bench Press")
+
+    squat2.exercise_name = "Bench Press"
+    squat2.save()
+
+    for s in [squat1, squat2, squat3, bench]:
+        s.refresh_from_db()
+
+    assert (squat1.set_number, squat3.set_number) == (1, 2)
+    assert (squat2.set_number, bench.set_number) == (1, 2)
+
+
+def _summary(workout):
+    summary = WorkoutSummary.objects.get(workout=workout)
+    return (
+        summary.set_count,
+        summary.completed_set_count,
+        summary.exercise_count,
+        summary.total_volume,
+    )
+
+
+@pytest.mark.django_db
+def test_summary_follows_set_writes(create_user):
+    """Test that the workout summary is kept in step with set creates, edits and deletes."""
+    workout = Workout.objects.create(user=create_user, workout_name="Test Workout")
+    assert _summary(workout) == (0, 0, 0, 0)
+
+    squat = SetDict.objects.create(workout=workout, exercise_name="Squat", loading=100, reps=5)
+    bench = SetDict.objects.create(workout=workout, exercise_name="Bench Press", loading=60, reps=10)
+    assert _summary(workout) == (2, 0, 2, 1100)
+
+    squat.complete = True
+    squat.reps = 3
+    squat.save(update_fields=["complete", "reps", "updated_at"])
+    assert _summary(workout) == (2, 1, 2, 900)
+
+    bench.exercise_name = "Squat"
+    bench.save()
+    assert _summary(workout) == (2, 1, 1, 900)
+
+    SetDict.objects.get(id=squat.id).delete()
+    assert _summary(workout) == (1, 0, 1, 600)
+
+
+@pytest.mark.django_db
+def test_rebuild_workout_summaries_command(create_user):
+    """Test that the backfill recomputes summaries that are missing or stale."""
+    from django.core.management import call_command
+
+    workouts = Workout.objects.bulk_create(
+        [Workout(user=create_user, workout_name=f"Session {i}") for i in range(3)]
+    )
+    SetDict.objects.bulk_create(
+        [
+            SetDict(workout=workout, exercise_name="Squat", set_order=i, loading=100, reps=5)
+            for workout in workouts
+            for i in range(2)
+        ]
+    )
+
+    call_command("rebuild_workout_summaries", batch_size=2, stdout=io.StringIO())
+
+    assert [_summary(workout) for workout in workouts] == [(2, 0, 1, 1000)] * 3
+
+
+@pytest.mark.django_db
+def test_catalogued_spellings_share_numbering(create_user):
+    """Test that names of one catalogue exercise are linked and numbered together."""
+    from core.models import Exercise
+
+    squat = Exercise.objects.create(name="Squat")
+    workout = Workout.objects.create(user=create_user, workout_name="Test Workout")
+
+    first = SetDict.objects.create(workout=workout, exercise_name="Squat")
+    second = SetDict.objects.create(workout=workout, exercise_name=" squat ")
+    curl = SetDict.objects.create(workout=workout, exercise_name="Curl")  # ❌ Not catalogued
+
+    for s in [first, second, curl]:
+        s.refresh_from_db()
+
+    assert (first.exercise_id, second.exercise_id, curl.exercise_id) == (squat.id, squat.id, None)
+    assert (first.set_number, second.set_number, curl.set_number) == (1, 2, 1)
+    assert _summary(workout)[2] == 2
+
+
+@pytest.mark.django_db
+def test_backfill_set_exercises_command(create_user):
+    """Test that the backfill links old sets, renumbers them and can resume."""
+    from django.core.management import call_command
+    from core.models import Exercise
+
+    workout = Workout.objects.create(user=create_user, workout_name="Test Workout")
+    SetDict.objects.bulk_create(
+        [
+            SetDict(workout=workout, exercise_name=name, set_order=i, set_number=1)
+            for i, name in enumerate(["Squat", "SQUAT", "Curl"])
+        ]
+    )
+    squat = Exercise.objects.create(name="Squat")
+    version = workout.version
+
+    out = io.StringIO()
+    call_command("backfill_set_exercises", batch_size=2, stdout=out)
+
+    sets = list(
+        SetDict.objects.filter(workout=workout)
+        .order_by("set_order")
+        .values_list("exercise_id", "set_number")
+    )
+    assert sets == [(squat.id, 1), (squat.id, 2), (None, 1)]
+    assert "Linked 2 sets" in out.getvalue()
+    workout.refresh_from_db()
+    assert workout.version > version
+    assert _summary(workout)[2] == 2
+
+
+@pytest.mark.django_db
+def test_backfill_set_exercises_reaches_synced_clients(create_user):
+    """Test that linking a set moves it and its workout on for delta sync and ETags,
+    even when nothing needs renumbering."""
+    from datetime import timedelta
+    from django.core.management import call_command
+    from django.utils.timezone import now
+    from core.models import Exercise
+
+    workout = Workout.objects.create(user=create_user, workout_name="Test Workout")
+    SetDict.objects.bulk_create([SetDict(workout=workout, exercise_name="squat", set_order=1, set_number=1)])
+    squat = Exercise.objects.create(name="Squat")
+    synced_at = now() - timedelta(hours=1)
+    Workout.objects.update(updated_at=synced_at)
+    SetDict.objects.update(updated_at=synced_at)
+    workout.refresh_from_db()
+
+    call_command("backfill_set_exercises", stdout=io.StringIO())
+
+    set_dict = SetDict.objects.get(workout=workout)
+    assert set_dict.exercise_id == squat.id
+    assert set_dict.updated_at > synced_at
+    version = workout.version
+    workout.refresh_from_db()
+    assert workout.version == version + 1
+    assert workout.updated_at > synced_at
@@ -47,6 +47,18 @@ def test_duplicate_workout(authenticated_client, create_workout):
     assert response.status_code == 201
     assert Workout.objects.filter(workout_name__icontains="(Copy)").exists()
 
+@pytest.mark.django_db
+def test_duplicate_workout_reports_copied_summary(authenticated_client, create_workout):
+    """Test that the duplicate's response counts the sets it was given."""
+    for loading in (60, 80, 100):
+        SetDict.objects.create(workout=create_workout, exercise_name="Squat", loading=loading, reps=5)
+
+    response = authenticated_client.post(reverse("workouts-duplicate", args=[create_workout.id]))
+
+    workout = response.data["workout"]
+    assert (workout["set_count"], workout["exercise_count"]) == (3, 1)
+    assert workout["total_volume"] == 1200.0
+
 @pytest.mark.django_db
 def test_duplicate_set(authenticated_client, create_setdict):
     """Test duplicating a set."""
@@ -89,6 +101,31 @@ def test_complete_workout(authenticated_client, create_workout):
     assert create_workout.complete is True
     assert create_workout.duration > 0
 
+@pytest.mark.django_db
+def test_workout_writes_keep_active_set_moved_meanwhile(
+    authenticated_client, create_user, monkeypatch
+):
+    """Test that workout writes from a copy loaded before a set was completed
+    don't put the active set pointer back."""
+    from workouts.views import WorkoutViewSet
+
+    workout = Workout.objects.create(user=create_user, workout_name="Push Day", start_time=now())
+    first, second = [SetDict.objects.create(workout=workout, exercise_name="Squat") for _ in range(2)]
+    update_active_set(workout.id)
+    stale = Workout.objects.get(id=workout.id)
+    assert stale.active_set_id == first.id
+
+    authenticated_client.patch(reverse("sets-complete-set", args=[first.id]))
+    monkeypatch.setattr(WorkoutViewSet, "get_object", lambda self: stale)
+    for name, data in [("workouts-detail", {"notes": "Heavy"}), ("workouts-complete-workout", {})]:
+        response = authenticated_client.patch(reverse(name, args=[workout.id]), data)
+        assert response.status_code == 200
+
+    workout.refresh_from_db()
+    assert (workout.notes, workout.complete) == ("Heavy", True)
+    assert workout.active_set_id == second.id
+
+
 @pytest.mark.django_db
 def test_complete_workout_not_started(authenticated_client, create_workout):
     """Test completing a workout that hasn't been started."""
@@ -149,6 +186,19 @@ def test_create_set(authenticated_client, create_workout):
     assert set_dict.workout == create_workout
 
 
+@pytest.mark.django_db
+def test_create_set_rejects_oversized_loading(authenticated_client, create_workout):
+    """Test that a loading too heavy for a personal record is a 400, not a set
+    that fails when completed."""
+    set_data = {"exercise_name": "Bench Press", "reps": 1, "loading": 1e9, "workout": create_workout.id}
+
+    response = authenticated_client.post(reverse("sets-list"), set_data)
+
+    assert response.status_code == 400
+    assert "loading" in response.data
+    assert not SetDict.objects.filter(workout=create_workout).exists()
+
+
 @pytest.mark.django_db
 def test_retrieve_set(authenticated_client, create_setdict):
     """Test retrieving a set entry via SetDictViewSet."""
@@ -210,12 +260,12 @@ def test_move_set(authenticated_client, create_setdict):
     response = authenticated_client.patch(url, data)
 
     assert response.status_code == 200
+    assert response.data["set"]["set_order"] == 2  # ✅ Position, not the raw key
     create_setdict.refresh_from_db()
     set2.refresh_from_db()
 
     # Ensure the order is updated correctly
-    assert create_setdict.set_order == 2
-    assert set2.set_order == 1
+    assert create_setdict.set_order > set2.set_order
 
 @pytest.mark.django_db
 def test_complete_set_mark_incomplete(authenticated_client, create_setdict):
@@ -310,3 +360,614 @@ def test_skip_active_set(authenticated_client, create_user):
     assert set1.is_active_set is False  # ✅ The set we just skipped should no longer be active
     assert set2.is_active_set is True  # ✅ The skipped set should be marked as active
 
+
+
+@pytest.mark.django_db
+def test_list_sets_returns_positions(authenticated_client, create_workout):
+    """Test that the sparse set_order keys are exposed as 1-based positions."""
+    for name in ["Squat", "Bench Press", "Deadlift"]:
+        SetDict.objects.create(workout=create_workout, exercise_name=name)
+
+    response = authenticated_client.get(reverse("sets-list"), {"workout": create_workout.id})
+
+    assert response.status_code == 200
+    assert [s["set_order"] for s in response.data["results"]] == [1, 2, 3]
+
+
+@pytest.mark.django_db
+def test_move_set_only_writes_moved_set(authenticated_client, create_workout):
+    """Test that moving a set leaves every other set's key untouched."""
+    sets = [
+        SetDict.objects.create(workout=create_workout, exercise_name="Squat")
+        for _ in range(4)
+    ]
+    keys_before = {s.id: s.set_order for s in sets}
+
+    response = authenticated_client.patch(
+        reverse("sets-move-set", args=[sets[3].id]), {"new_position": 2}
+    )
+
+    assert response.status_code == 200
+    assert response.data["set"]["set_order"] == 2
+    for s in sets[:3]:
+        s.refresh_from_db()
+        assert s.set_order == keys_before[s.id]
+
+
+@pytest.mark.django_db
+def test_move_set_invalid_position(authenticated_client, create_setdict):
+    """Test that a missing or invalid new_position is rejected."""
+    response = authenticated_client.patch(
+        reverse("sets-move-set", args=[create_setdict.id]), {"new_position": "x"}
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_bulk_create_sets(authenticated_client, create_setdict):
+    """Test creating several sets in one request appends them in order."""
+    payload = {
+        "workout": create_setdict.workout.id,
+        "sets": [
+            {"exercise_name": "Bench Press", "reps": 8, "loading": 90},
+            {"exercise_name": "Squat", "reps": 5, "loading": 140},
+            {"exercise_name": "Bench Press", "reps": 8, "loading": 90},
+        ],
+    }
+
+    response = authenticated_client.post(reverse("sets-bulk"), payload, format="json")
+
+    assert response.status_code == 201
+    created = response.data["sets"]
+    assert [s["set_order"] for s in created] == [2, 3, 4]
+    assert [s["set_number"] for s in created] == [2, 1, 3]
+
+    stored = SetDict.objects.filter(workout=create_setdict.workout).order_by("set_order")
+    assert [s.exercise_name for s in stored] == [
+        "Bench Press", "Bench Press", "Squat", "Bench Press"
+    ]
+
+
+@pytest.mark.django_db
+def test_bulk_create_sets_validation(authenticated_client, create_workout, create_user_2):
+    """Test that invalid items, empty lists and foreign workouts are rejected."""
+    url = reverse("sets-bulk")
+
+    invalid = {"workout": create_workout.id, "sets": [{"reps": 5}]}
+    assert authenticated_client.post(url, invalid, format="json").status_code == 400
+
+    empty = {"workout": create_workout.id, "sets": []}
+    assert authenticated_client.post(url, empty, format="json").status_code == 400
+
+    other_workout = Workout.objects.create(user=create_user_2, workout_name="Not Mine")
+    foreign = {"workout": other_workout.id, "sets": [{"exercise_name": "Squat"}]}
+    assert authenticated_client.post(url, foreign, format="json").status_code == 400
+    assert not SetDict.objects.exists()
+
+
+@pytest.mark.django_db
+def test_reorder_workout_sets(authenticated_client, create_workout):
+    """Test replacing the whole running order in one request."""
+    squat1 = SetDict.objects.create(workout=create_workout, exercise_name="Squat")
+    bench = SetDict.objects.create(workout=create_workout, exercise_name="Bench Press")
+    squat2 = SetDict.objects.create(workout=create_workout, exercise_name="Squat")
+    url = reverse("workouts-reorder", args=[create_workout.id])
+
+    response = authenticated_client.patch(
+        url, {"set_ids": [squat2.id, bench.id, squat1.id]}, format="json"
+    )
+
+    assert response.status_code == 200
+    assert [s["id"] for s in response.data["sets"]] == [squat2.id, bench.id, squat1.id]
+    assert [s["set_order"] for s in response.data["sets"]] == [1, 2, 3]
+    squat1.refresh_from_db()
+    squat2.refresh_from_db()
+    assert (squat2.set_number, squat1.set_number) == (1, 2)
+
+    # ✅ The returned version is accepted for the next reorder...
+    version = response.data["version"]
+    response = authenticated_client.patch(
+        url, {"set_ids": [squat1.id, bench.id, squat2.id], "version": version}, format="json"
+    )
+    assert response.status_code == 200
+
+    # ...but a stale one is rejected
+    response = authenticated_client.patch(
+        url, {"set_ids": [squat2.id, bench.id, squat1.id], "version": version}, format="json"
+    )
+    assert response.status_code == 409
+
+
+@pytest.mark.django_db
+def test_reorder_workout_sets_must_match(authenticated_client, create_workout):
+    """Test that the id list must contain every set of the workout exactly once."""
+    set1 = SetDict.objects.create(workout=create_workout, exercise_name="Squat")
+    set2 = SetDict.objects.create(workout=create_workout, exercise_name="Squat")
+    url = reverse("workouts-reorder", args=[create_workout.id])
+
+    for set_ids in [[set1.id], [set1.id, set1.id], [set1.id, set2.id, 999999], "x"]:
+        response = authenticated_client.patch(url, {"set_ids": set_ids}, format="json")
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_sets_batch(authenticated_client, create_user):
+    """Test applying several set operations in a single request."""
+    workout = Workout.objects.create(user=create_user, workout_name="Push Day", start_time=now())
+    set1 = SetDict.objects.create(workout=workout, exercise_name="Squat")
+    set2 = SetDict.objects.create(workout=workout, exercise_name="Bench Press")
+    set3 = SetDict.objects.create(workout=workout, exercise_name="Deadlift")
+
+    operations = [
+        {"op": "complete", "id": set1.id},
+        {"op": "update", "id": set2.id, "data": {"reps": 12}},
+        {"op": "skip", "id": set2.id},
+        {"op": "delete", "id": set3.id},
+        {"op": "duplicate", "id": set1.id},
+        {"op": "create", "data": {"exercise_name": "Row", "reps": 10}},
+        {"op": "move", "id": set2.id, "position": 2},
+    ]
+
+    response = authenticated_client.post(
+        reverse("workouts-sets-batch", args=[workout.id]),
+        {"operations": operations},
+        format="json",
+    )
+
+    assert response.status_code == 200
+    results = response.data["sets"]
+    assert [s["exercise_name"] for s in results] == ["Squat", "Bench Press", "Squat", "Row"]
+    assert [s["set_order"] for s in results] == [1, 2, 3, 4]
+    assert results[1]["reps"] == 12
+    assert results[0]["complete"] is True
+    # ✅ Active set recomputed once: the first incomplete set
+    assert [s["is_active_set"] for s in results] == [False, True, False, False]
+
+
+@pytest.mark.django_db
+def test_sets_batch_is_atomic(authenticated_client, create_setdict):
+    """Test that a failing operation rolls back the whole batch."""
+    workout = create_setdict.workout
+    operations = [
+        {"op": "update", "id": create_setdict.id, "data": {"reps": 1}},
+        {"op": "move", "id": create_setdict.id, "position": "first"},
+    ]
+
+    response = authenticated_client.post(
+        reverse("workouts-sets-batch", args=[workout.id]),
+        {"operations": operations},
+        format="json",
+    )
+
+    assert response.status_code == 400
+    assert response.data["operation"] == 1
+    create_setdict.refresh_from_db()
+    assert create_setdict.reps == 5
+
+
+@pytest.mark.django_db
+def test_retrieve_workout_include_sets(
+    authenticated_client, create_workout, django_assert_num_queries
+):
+    """Test that ?include=sets embeds ordered sets using two queries."""
+    for name in ["Squat", "Bench Press", "Squat"]:
+        SetDict.objects.create(workout=create_workout, exercise_name=name)
+    url = reverse("workouts-detail", args=[create_workout.id])
+
+    with django_assert_num_queries(2):
+        response = authenticated_client.get(url, {"include": "sets"})
+
+    assert response.status_code == 200
+    assert [s["exercise_name"] for s in response.data["sets"]] == [
+        "Squat", "Bench Press", "Squat"
+    ]
+    assert [s["set_order"] for s in response.data["sets"]] == [1, 2, 3]
+    assert [s["set_number"] for s in response.data["sets"]] == [1, 1, 2]
+
+    # ✅ Without the flag the payload is unchanged
+    assert "sets" not in authenticated_client.get(url).data
+
+
+@pytest.mark.django_db
+def test_workout_feed_aggregates(
+    authenticated_client, create_workout, create_user, django_assert_num_queries
+):
+    """Test that the feed returns per-workout aggregates without extra queries."""
+    SetDict.objects.create(workout=create_workout, exercise_name="Squat", loading=100, reps=5, complete=True)
+    SetDict.objects.create(workout=create_workout, exercise_name="Squat", loading=100, reps=5)
+    SetDict.objects.create(workout=create_workout, exercise_name="Bench Press", loading=60, reps=10)
+    SetDict.objects.create(workout=create_workout, exercise_name="Plank")
+    empty = Workout.objects.create(user=create_user, workout_name="Rest Day")
+
+    with django_assert_num_queries(1):  # ✅ Just the annotated page, no COUNT(*)
+        response = authenticated_client.get(reverse("workouts-feed"))
+
+    assert response.status_code == 200
+    feed = {w["id"]: w for w in response.data["results"]}
+    assert feed[create_workout.id]["set_count"] == 4
+    assert feed[create_workout.id]["completed_set_count"] == 1
+    assert feed[create_workout.id]["exercise_count"] == 3
+    assert feed[create_workout.id]["total_volume"] == 1600.0
+    assert feed[empty.id]["set_count"] == 0
+    assert feed[empty.id]["total_volume"] == 0.0
+
+
+@pytest.mark.django_db
+def test_workouts_cursor_pagination(authenticated_client, create_multiple_workouts):
+    """Test that workouts page by cursor in (-date, -id) order with a chosen size."""
+    response = authenticated_client.get(reverse("workouts-list"), {"page_size": 4})
+
+    assert response.status_code == 200
+    assert "count" not in response.data  # ✅ No COUNT(*) per page
+    first_page = [w["id"] for w in response.data["results"]]
+    assert len(first_page) == 4
+
+    seen = list(first_page)
+    next_url = response.data["next"]
+    while next_url:
+        response = authenticated_client.get(next_url)
+        seen += [w["id"] for w in response.data["results"]]
+        next_url = response.data["next"]
+
+    assert seen == sorted((w.id for w in create_multiple_workouts), reverse=True)
+
+
+@pytest.mark.django_db
+def test_workouts_page_size_is_capped(authenticated_client, create_user):
+    """Test that the client page size cannot exceed the server maximum."""
+    Workout.objects.bulk_create(
+        [Workout(user=create_user, workout_name=f"W{i}") for i in range(105)]
+    )
+
+    response = authenticated_client.get(reverse("workouts-list"), {"page_size": 1000})
+
+    assert len(response.data["results"]) == 100
+
+
+@pytest.mark.django_db
+def test_sets_pages_keep_workout_positions(authenticated_client, create_workout):
+    """Test that later pages report positions within the workout, not the page."""
+    for _ in range(5):
+        SetDict.objects.create(workout=create_workout, exercise_name="Squat")
+    url = reverse("sets-list")
+
+    response = authenticated_client.get(url, {"workout": create_workout.id, "page_size": 3})
+    response = authenticated_client.get(response.data["next"])
+
+    assert [s["set_order"] for s in response.data["results"]] == [4, 5]
+
+
+@pytest.mark.django_db
+def test_complete_set_moves_active_set_pointer(authenticated_client, create_user):
+    """Test that completing the active set points the workout at the next one."""
+    workout = Workout.objects.create(user=create_user, workout_name="Push Day", start_time=now())
+    set1 = SetDict.objects.create(workout=workout, exercise_name="Squat", rest=90)
+    set2 = SetDict.objects.create(workout=workout, exercise_name="Squat")
+    update_active_set(workout.id)
+
+    workout.refresh_from_db()
+    assert workout.active_set_id == set1.id
+
+    response = authenticated_client.patch(reverse("sets-complete-set", args=[set1.id]))
+
+    workout.refresh_from_db()
+    set2.refresh_from_db()
+    assert response.status_code == 200
+    assert workout.active_set_id == set2.id
+    assert set2.is_active_set is True
+    assert response.data["active_set"]["id"] == set2.id
+    assert response.data["active_set"]["set_start_time"] is not None
+    assert set2.set_start_time > now() + timedelta(seconds=60)  # ✅ Rest applied
+
+
+@pytest.mark.django_db
+def test_complete_set_query_count_is_constant(
+    authenticated_client, create_user, django_assert_num_queries
+):
+    """Test that completing a set costs the same no matter how long the workout is,
+    bumping the version and notifying streams once."""
+
+    def complete_first_set(set_count):
+        workout = Workout.objects.create(user=create_user, workout_name="Push Day", start_time=now())
+        sets = [
+            SetDict.objects.create(workout=workout, exercise_name=f"Lift {i % 3}")
+            for i in range(set_count)
+        ]
+        update_active_set(workout.id)
+        with django_assert_num_queries(14) as captured:
+            response = authenticated_client.patch(
+                reverse("sets-complete-set", args=[sets[0].id])
+            )
+        assert response.status_code == 200
+        workout.refresh_from_db()
+        assert response["ETag"] == f'"{workout.id}-{workout.version}"'
+        statements = [query["sql"] for query in captured.captured_queries]
+        assert sum("version = version + 1" in sql for sql in statements) == 1
+        assert sum("pg_notify" in sql for sql in statements) == 1
+        return len(captured)
+
+    assert complete_first_set(3) == complete_first_set(40)
+
+
+@pytest.mark.django_db
+def test_complete_last_set_clears_active_set(authenticated_client, create_user):
+    """Test that completing the final set leaves the workout with no active set."""
+    workout = Workout.objects.create(user=create_user, workout_name="Push Day", start_time=now())
+    only_set = SetDict.objects.create(workout=workout, exercise_name="Squat")
+    update_active_set(workout.id)
+
+    response = authenticated_client.patch(reverse("sets-complete-set", args=[only_set.id]))
+
+    workout.refresh_from_db()
+    assert response.data["active_set"] is None
+    assert workout.active_set_id is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_set_actions_keep_one_active_set(create_user):
+    """Test that simultaneous complete and skip requests leave a consistent workout."""
+    from concurrent.futures import ThreadPoolExecutor
+    from django.db import connection
+    from rest_framework.test import APIClient
+
+    workout = Workout.objects.create(user=create_user, workout_name="Push Day", start_time=now())
+    sets = [SetDict.objects.create(workout=workout, exercise_name="Squat") for _ in range(6)]
+    update_active_set(workout.id)
+
+    def send(action, set_id):
+        client = APIClient()
+        client.force_authenticate(user=create_user)
+        try:
+            return client.patch(reverse(f"sets-{action}", args=[set_id])).status_code
+        finally:
+            connection.close()
+
+    requests = [("complete-set", sets[0].id), ("skip-set", sets[0].id)] * 3
+    with ThreadPoolExecutor(max_workers=len(requests)) as pool:
+        codes = list(pool.map(lambda request: send(*request), requests))
+
+    assert codes == [200] * len(requests)
+    orders = list(SetDict.objects.filter(workout=workout).values_list("set_order", flat=True))
+    assert len(orders) == len(set(orders))
+    active = list(SetDict.objects.filter(workout=workout, is_active_set=True))
+    workout.refresh_from_db()
+    assert len(active) <= 1
+    assert workout.active_set_id == (active[0].id if active else None)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_edit_keeps_completion(create_user):
+    """Test that editing a set while it is completed neither fails nor undoes the completion."""
+    from concurrent.futures import ThreadPoolExecutor
+    from django.db import connection
+    from rest_framework.test import APIClient
+
+    workout = Workout.objects.create(user=create_user, workout_name="Push Day", start_time=now())
+    sets = [SetDict.objects.create(workout=workout, exercise_name="Squat") for _ in range(8)]
+    update_active_set(workout.id)
+
+    def send(request):
+        method, name, set_id, data = request
+        client = APIClient()
+        client.force_authenticate(user=create_user)
+        try:
+            return getattr(client, method)(
+                reverse(name, args=[set_id]), data, format="json"
+            ).status_code
+        finally:
+            connection.close()
+
+    for set_dict in sets:
+        requests = [
+            ("patch", "sets-detail", set_dict.id, {"notes": "Felt good"}),
+            ("patch", "sets-complete-set", set_dict.id, {}),
+        ]
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            codes = list(pool.map(send, requests))
+
+        set_dict.refresh_from_db()
+        assert codes == [200, 200]
+        assert (set_dict.complete, set_dict.notes) == (True, "Felt good")
+        assert SetDict.objects.filter(workout=workout, is_active_set=True).count() <= 1
+
+
+def _summary_matches_sets(workout):
+    """Whether the workout's stored summary agrees with a recount of its sets."""
+    from workouts.models import WorkoutSummary
+
+    summary = WorkoutSummary.objects.get(workout=workout)
+    sets = SetDict.objects.filter(workout=workout)
+    return (summary.set_count, summary.completed_set_count) == (
+        sets.count(),
+        sets.filter(complete=True).count(),
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_completions_keep_summary_in_step(create_user):
+    """Test that racing completions of one set leave the summary matching a recount."""
+    from concurrent.futures import ThreadPoolExecutor
+    from django.db import connection
+    from rest_framework.test import APIClient
+
+    workout = Workout.objects.create(user=create_user, workout_name="Push Day", start_time=now())
+    sets = [SetDict.objects.create(workout=workout, exercise_name="Squat") for _ in range(3)]
+    update_active_set(workout.id)
+
+    def complete(set_id):
+        client = APIClient()
+        client.force_authenticate(user=create_user)
+        try:
+            return client.patch(reverse("sets-complete-set", args=[set_id])).status_code
+        finally:
+            connection.close()
+
+    for _ in range(3):
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            codes = list(pool.map(complete, [sets[0].id] * 4))
+        assert codes == [200] * 4
+        assert _summary_matches_sets(workout)
+
+    # ✅ And one after another, back and forth
+    for _ in range(2):
+        assert complete(sets[1].id) == 200
+        assert _summary_matches_sets(workout)
+
+
+@pytest.mark.django_db
+def test_workout_version_bumps_on_set_changes(create_setdict):
+    """Test that changing a set or its workout moves the workout's version on."""
+    workout = create_setdict.workout
+    workout.refresh_from_db()
+    start = workout.version
+
+    create_setdict.reps = 8
+    create_setdict.save()
+    workout.refresh_from_db()
+    assert workout.version == start + 1
+
+    workout.notes = "Heavy"
+    workout.save()
+    assert workout.version == start + 2
+
+    create_setdict.delete()
+    workout.refresh_from_db()
+    assert workout.version == start + 3
+
+
+@pytest.mark.django_db
+def test_retrieve_workout_not_modified(
+    authenticated_client, create_workout, django_assert_max_num_queries
+):
+    """Test that a matching If-None-Match gets a bodyless 304."""
+    url = reverse("workouts-detail", args=[create_workout.id])
+    etag = authenticated_client.get(url)["ETag"]
+
+    with django_assert_max_num_queries(1):  # ✅ Just the version lookup
+        response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+    assert not response.content
+
+
+@pytest.mark.django_db
+def test_set_list_etag_changes_with_sets(authenticated_client, create_setdict):
+    """Test that a workout's sets list is revalidated once a set changes."""
+    url = reverse("sets-list") + f"?workout={create_setdict.workout_id}"
+    etag = authenticated_client.get(url)["ETag"]
+
+    assert authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    authenticated_client.patch(reverse("sets-detail", args=[create_setdict.id]), {"reps": 9})
+    response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_stale_if_match_is_rejected(authenticated_client, create_setdict):
+    """Test that writes against an outdated version get 412 and change nothing."""
+    workout_url = reverse("workouts-detail", args=[create_setdict.workout_id])
+    set_url = reverse("sets-detail", args=[create_setdict.id])
+    etag = authenticated_client.get(workout_url)["ETag"]
+
+    fresh = authenticated_client.patch(set_url, {"reps": 6}, HTTP_IF_MATCH=etag)
+    assert fresh.status_code == 200
+    assert fresh["ETag"] != etag
+
+    stale = authenticated_client.patch(workout_url, {"notes": "Old"}, HTTP_IF_MATCH=etag)
+    assert stale.status_code == 412
+    create_setdict.workout.refresh_from_db()
+    assert create_setdict.workout.notes != "Old"
+
+
+@pytest.fixture
+def workouts_with_sets(create_user):
+    """Three workouts with a handful of sets each, one with an active set."""
+    workouts = [
+        Workout.objects.create(user=create_user, workout_name=f"Session {i}")
+        for i in range(3)
+    ]
+    for workout in workouts:
+        for exercise_name in ("Squat", "Squat", "Bench Press", "Bench Press"):
+            SetDict.objects.create(workout=workout, exercise_name=exercise_name)
+    active = workouts[0].set_dicts.first()
+    active.is_active_set = True
+    active.save()
+    Workout.objects.filter(id=workouts[0].id).update(active_set=active)
+    return workouts
+
+
+@pytest.mark.django_db
+def test_delete_workout_skips_per_set_work(
+    authenticated_client, workouts_with_sets, django_assert_max_num_queries
+):
+    """Test that deleting a workout costs the same however many sets it has."""
+    from core.models import Tombstone
+
+    workout = workouts_with_sets[0]
+    SetDict.objects.bulk_create(
+        [SetDict(workout=workout, exercise_name="Row", set_order=i) for i in range(100, 150)]
+    )
+
+    with django_assert_max_num_queries(10):
+        response = authenticated_client.delete(reverse("workouts-detail", args=[workout.id]))
+
+    assert response.status_code == 204
+    assert not SetDict.objects.filter(workout_id=workout.id).exists()
+    assert list(Tombstone.objects.values_list("kind", "object_id")) == [
+        (Tombstone.WORKOUT, workout.id)
+    ]
+
+
+@pytest.mark.django_db
+def test_bulk_delete_workouts(authenticated_client, workouts_with_sets, create_user_2):
+    """Test that `DELETE /api/workouts/?ids=` deletes only the user's own workouts."""
+    other = Workout.objects.create(user=create_user_2, workout_name="Not yours")
+    ids = [workouts_with_sets[0].id, workouts_with_sets[1].id, other.id]
+
+    response = authenticated_client.delete(
+        reverse("workouts-list") + "?ids=" + ",".join(map(str, ids))
+    )
+
+    assert response.status_code == 200
+    assert response.data == {"deleted": 2}
+    assert list(Workout.objects.values_list("id", flat=True).order_by("id")) == [
+        workouts_with_sets[2].id,
+        other.id,
+    ]
+    assert SetDict.objects.filter(workout=workouts_with_sets[2]).count() == 4
+
+
+@pytest.mark.django_db
+def test_bulk_delete_requires_ids(authenticated_client):
+    """Test that bulk deletion refuses a missing or malformed id list."""
+    assert authenticated_client.delete(reverse("workouts-list")).status_code == 400
+    assert authenticated_client.delete(reverse("workouts-list") + "?ids=1,x").status_code == 400
+
+
+@pytest.mark.django_db
+def test_orm_cascade_skips_renumbering(workouts_with_sets, django_assert_max_num_queries):
+    """Test that sets deleted in a workout's ORM cascade are not renumbered one by one."""
+    from core.models import Tombstone
+
+    workout = workouts_with_sets[1]
+    with django_assert_max_num_queries(8):
+        workout.delete()
+
+    assert not Tombstone.objects.filter(kind=Tombstone.SET).exists()
+
+
+@pytest.mark.django_db
+def test_workout_list_includes_summary(authenticated_client, workouts_with_sets, django_assert_num_queries):
+    """Test that workouts are listed with their summary counters without reading sets."""
+    with django_assert_num_queries(1):
+        response = authenticated_client.get(reverse("workouts-list"))
+
+    assert response.status_code == 200
+    assert {
+        (w["set_count"], w["exercise_count"]) for w in response.data["results"]
+    } == {(4, 2)}
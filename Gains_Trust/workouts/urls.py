@@ -3,6 +3,10 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     WorkoutViewSet,
     SetDictViewSet,
+    exercise_analytics,
+    load_analytics,
+    muscle_analytics,
+    workout_events,
 )
 
 # 🚀 DRF Router API Endpoints
@@ -11,5 +15,23 @@ router.register(r"workouts", WorkoutViewSet, basename="workouts")
 router.register(r"sets", SetDictViewSet, basename="sets")
 
 urlpatterns = [
+    # 🗑️ Bulk deletion shares the list route, which the router can't map to DELETE
+    path(
+        "workouts/",
+        WorkoutViewSet.as_view(
+            {"get": "list", "post": "create", "delete": "bulk_destroy"}
+        ),
+        name="workouts-list",
+    ),
+    # 📡 Server-sent events for a running workout (needs the ASGI server)
+    path("workouts/<int:pk>/events/", workout_events, name="workout-events"),
+    # 📈 Progress charts; `path` lets exercise names contain slashes
+    path("analytics/load/", load_analytics, name="load-analytics"),
+    path("analytics/muscles/", muscle_analytics, name="muscle-analytics"),
+    path(
+        "analytics/exercises/<path:exercise_name>/",
+        exercise_analytics,
+        name="exercise-analytics",
+    ),
     path("", include(router.urls)),  # ✅ Registers all workout routes automatically
 ]
@@ -0,0 +1,170 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.db import connection, transaction
+from django.utils.http import parse_etags
+from django.utils.timezone import now
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from .events import deferred_workout_events, send_workout_events
+from .models import Workout
+
+# Bumps held back by `workout_write`: workout id -> instances awaiting the version
+_deferred_bumps = ContextVar("deferred_workout_bumps", default=None)
+
+
+def bump_workout_version(workout_id, instance=None):
+    """Increments a workout's `version` in the database and returns the new value.
+
+    The increment happens in SQL, so writers never overwrite each other's bump.
+    `updated_at` moves with it, so delta sync sees set changes on the workout.
+    Inside `workout_write` the bump is deferred and None is returned; the
+    workout `instance`, if given, gets its `version` when the bump lands."""
+    deferred = _deferred_bumps.get()
+    if deferred is not None:
+        waiting = deferred.setdefault(workout_id, [])
+        if instance is not None:
+            waiting.append(instance)
+        return None
+
+    return _bump_workout_versions([workout_id]).get(workout_id)
+
+
+def _bump_workout_versions(workout_ids):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "UPDATE workouts_workout SET version = version + 1, updated_at = %s "
+            "WHERE id = ANY(%s) RETURNING id, version",
+            [now(), list(workout_ids)],
+        )
+        return dict(cursor.fetchall())
+
+
+@contextmanager
+def workout_write():
+    """Defers the version bumps and events of a block to its end.
+
+    A write touching a set several times (completing it, then activating
+    the next one) would otherwise bump and notify once per touch. Here each
+    workout written is bumped once and the events go out in one statement,
+    all carrying the final version. Yields a dict that is filled with each
+    written workout's new version. Must be used inside a transaction."""
+    bumps, versions = {}, {}
+    token = _deferred_bumps.set(bumps)
+    try:
+        with deferred_workout_events() as events:
+            yield versions
+    finally:
+        _deferred_bumps.reset(token)
+
+    versions.update(_bump_workout_versions(bumps) if bumps else {})
+    for workout_id, instances in bumps.items():
+        for instance in instances:
+            instance.version = versions.get(workout_id)
+    unread = {workout_id for workout_id, _, _ in events} - versions.keys()
+    if unread:
+        versions.update(
+            Workout.objects.filter(id__in=unread).values_list("id", "version")
+        )
+    send_workout_events(events, versions)
+
+
+def workout_etag(workout_id, version):
+    """Returns the strong ETag for one version of a workout and its sets."""
+    return f'"{workout_id}-{version}"'
+
+
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+    default_detail = "Not modified."
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "The workout has changed since it was loaded."
+    default_code = "precondition_failed"
+
+
+class WorkoutVersionMixin:
+    """Conditional requests for views whose data belongs to a single workout.
+
+    Responses carry the workout's version as an `ETag`. Reads sending a
+    matching `If-None-Match` get a 304 before anything is serialized, and
+    writes sending a stale `If-Match` get a 412. A write with `If-Match`
+    holds the workout's row lock from the check until the response, so
+    nothing can change the workout in between.
+
+    Views that load the workout anyway, or learn its new version from
+    `workout_write`, can record `(id, version)` as `self.workout_version`
+    to save the lookup."""
+
+    # Reads that can be answered with a 304
+    conditional_read_actions = ("retrieve", "list")
+
+    def get_versioned_workout_id(self):
+        """Returns the id of the workout this request reads or writes, if any."""
+        raise NotImplementedError
+
+    def get_workout_version(self, lock=False):
+        """Returns `(workout_id, version)` for the request's workout, or None."""
+        workout_id = self.get_versioned_workout_id()
+        if workout_id is None:
+            return None
+
+        try:
+            queryset = Workout.objects.filter(id=workout_id, user=self.request.user)
+        except (ValueError, TypeError):
+            return None  # ✅ Malformed id, the view itself reports it
+        if lock:
+            queryset = queryset.select_for_update()
+        return queryset.values_list("id", "version").first()
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in SAFE_METHODS and request.headers.get("If-Match"):
+            with transaction.atomic():
+                return super().dispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        if request.method in SAFE_METHODS:
+            if_none_match = request.headers.get("If-None-Match")
+            if if_none_match and self.action in self.conditional_read_actions:
+                current = self.get_workout_version()
+                if current and workout_etag(*current) in parse_etags(if_none_match):
+                    self.workout_version = current
+                    raise NotModified()
+            return
+
+        if_match = request.headers.get("If-Match")
+        if if_match:
+            current = self.get_workout_version(lock=True)
+            if current and if_match.strip() != "*" and (
+                workout_etag(*current) not in parse_etags(if_match)
+            ):
+                raise PreconditionFailed()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            # ✅ 304s carry no body, just the validator the client already has
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": workout_etag(*self.workout_version)},
+            )
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if (
+            response.status_code < 300
+            and request.user.is_authenticated
+            and getattr(self, "action", None)
+            and not response.has_header("ETag")
+        ):
+            # ✅ Reuses a version the view already loaded or wrote, if it did
+            current = getattr(self, "workout_version", None) or self.get_workout_version()
+            if current:
+                response["ETag"] = workout_etag(*current)
+        return response
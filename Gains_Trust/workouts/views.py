@@ -1,86 +1,263 @@
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework import status, serializers
+from rest_framework import generics, status, serializers
 from .models import Workout, SetDict
-from .serializers import SetDictSerializer, WorkoutSerializer
+from .serializers import (
+    SetDictSerializer,
+    WorkoutDetailSerializer,
+    WorkoutSerializer,
+)
+from Gains_Trust.pagination import SetDictPagination, WorkoutPagination
+from .ordering import (
+    apply_set_order,
+    attach_positions,
+    lock_workout,
+    move_set_to_position,
+    next_set_order,
+    number_appended_sets,
+    order_version,
+)
+from .versioning import WorkoutVersionMixin, bump_workout_version, workout_write
+from .deletion import delete_workouts
+from .summaries import rebuild_workout_summaries
+from .exercises import exercise_key, link_exercises
+from .records import holds_record, rebuild_user_records
+from .analytics import (
+    DEFAULT_PROGRESS_POINTS,
+    MAX_PROGRESS_POINTS,
+    PROGRESS_BUCKETS,
+    SYNERGIST_WEIGHT,
+    exercise_progress,
+    muscle_volume,
+    training_load,
+)
+from .events import get_event_hub, publish_workout_event
 from datetime import timedelta
+from django.utils.dateparse import parse_date
 from django.utils.timezone import now
-import threading
 from django.db import transaction
+from django.db.models import Prefetch
 from rest_framework.viewsets import ModelViewSet
 
-local_storage = threading.local()
-
 
 # 💻 Helper Functions
-def update_active_set(workout_id):
-    """Ensures only one active set per workout, adjusting start times correctly."""
-    workout = get_object_or_404(Workout, id=workout_id)
+def set_active_set(workout, next_set, start_time):
+    """Points the workout at `next_set` (or nothing) as its active set,
+    writing only the rows whose state actually changes."""
+    if next_set and next_set.id == workout.active_set_id and next_set.is_active_set:
+        return next_set  # ✅ Already active, keep its timer running
+
+    # ✅ Ensure every other set dict is inactive (served by a partial index)
+    stale = SetDict.objects.filter(workout_id=workout.id, is_active_set=True)
+    if next_set:
+        stale = stale.exclude(id=next_set.id)
+    stale.update(is_active_set=False, updated_at=now())
 
+    if next_set:
+        next_set.set_start_time = start_time
+        next_set.is_active_set = True
+        next_set.save(
+            update_fields=["is_active_set", "set_start_time", "updated_at"]
+        )
+
+    new_active_id = next_set.id if next_set else None
+    if workout.active_set_id != new_active_id:
+        workout.active_set_id = new_active_id
+        Workout.objects.filter(id=workout.id).update(active_set_id=new_active_id)
+
+    # 📡 Tell live sessions which set is up and when its timer starts
+    publish_workout_event(
+        workout.id,
+        "active_set",
+        set=new_active_id,
+        set_start_time=next_set.set_start_time if next_set else None,
+    )
+    return next_set
+
+
+def activate_next_set(workout):
+    """Activates the first incomplete set of a started workout, starting its
+    timer after the previous set's rest. Returns the active set, if any."""
     if not workout.start_time:
-        return
+        return None
 
     # ✅ Find the next incomplete set
     next_set = (
-        SetDict.objects.filter(workout_id=workout_id, complete=False)
-        .order_by("set_order")
+        SetDict.objects.filter(workout_id=workout.id, complete=False)
+        .order_by("set_order", "id")
         .first()
     )
 
-    # ✅ Ensure all set dicts are inactive
-    SetDict.objects.filter(workout_id=workout_id, is_active_set=True).update(
-        is_active_set=False
-    )
-
+    start_time = now()
     if next_set:
         # ✅ Get the last completed set, if available
         last_completed_set = (
-            SetDict.objects.filter(workout_id=workout_id, complete=True)
-            .order_by("-set_order")
+            SetDict.objects.filter(workout_id=workout.id, complete=True)
+            .order_by("-set_order", "-id")
             .first()
         )
 
         # ✅ Apply rest time if the last completed set was previous set
-        if last_completed_set and last_completed_set.set_order == (
-            next_set.set_order - 1
+        # (every set before `next_set` is complete, so any completed set
+        # ordered before it is its immediate predecessor)
+        if (
+            last_completed_set
+            and last_completed_set.set_order < next_set.set_order
+            and last_completed_set.rest
         ):
-            next_set.set_start_time = (
-                now() + timedelta(seconds=last_completed_set.rest)
-                if last_completed_set.rest
-                else now()
-            )
-        else:
-            next_set.set_start_time = now()
+            start_time = now() + timedelta(seconds=last_completed_set.rest)
 
-        next_set.is_active_set = True
-        next_set.save()
+    return set_active_set(workout, next_set, start_time)
+
+
+def update_active_set(workout_id):
+    """Ensures only one active set per workout, adjusting start times correctly."""
+    with transaction.atomic():
+        # ✅ Holds the workout lock so concurrent writers can't both activate
+        workout = get_object_or_404(Workout.objects.select_for_update(), id=workout_id)
+        return activate_next_set(workout)
 
 
 def skip_active_set(workout_id, skipped_set):
     """Handles skipping a set and ensures the correct next set is activated."""
+    with transaction.atomic():
+        workout = get_object_or_404(Workout.objects.select_for_update(), id=workout_id)
+
+        # ✅ Find the next available set to activate
+        next_set = (
+            SetDict.objects.filter(workout_id=workout_id, complete=False)
+            .exclude(id=skipped_set.id)
+            .order_by("set_order", "id")
+            .first()
+        )
 
-    # ✅ Find the next available set to activate
-    next_set = (
-        SetDict.objects.filter(workout_id=workout_id, complete=False)
-        .exclude(id=skipped_set.id)
-        .order_by("set_order")
-        .first()
+        # ❌ Since a set was skipped, start immediately (no rest delay)
+        return set_active_set(workout, next_set, now())
+
+
+def toggle_set_completion(set_dict):
+    """Marks a set complete, or undoes completion, without touching the active set.
+
+    Only the completion fields are written, so the running order is untouched.
+    The save hooks raise the user's personal records, or rebuild one undone."""
+    if set_dict.complete:  # ✅ Undo completion
+        set_dict.complete = False
+        set_dict.set_duration = None
+        set_dict.set_start_time = None
+    else:  # ✅ Marking set as complete
+        set_dict.complete = True
+        if set_dict.set_start_time and set_dict.set_start_time <= now():
+            set_dict.set_duration = int(
+                (now() - set_dict.set_start_time).total_seconds()
+            )
+
+    set_dict.save(
+        update_fields=["complete", "set_duration", "set_start_time", "updated_at"]
+    )
+    publish_workout_event(
+        set_dict.workout_id,
+        "set_completed",
+        set=set_dict.id,
+        complete=set_dict.complete,
+        set_duration=set_dict.set_duration,
+    )
+    return set_dict
+
+
+def skip_set_to_end(set_dict):
+    """Moves a set to the end of its workout and deactivates it."""
+    # Only the skipped set is written: it gets a key past the current last set
+    set_dict.set_order = next_set_order(set_dict.workout_id)
+
+    set_dict.is_active_set = False  # 🔥 Ensure skipped sets aren't active
+    set_dict.set_start_time = None
+    set_dict.save()
+    publish_workout_event(set_dict.workout_id, "reorder", set=set_dict.id)
+    return set_dict
+
+
+def duplicate_set(original_set):
+    """Copies a set to the end of its workout as a fresh, incomplete set."""
+    # `assign_set_order` places the copy at the end of the workout
+    return SetDict.objects.create(
+        workout_id=original_set.workout_id,
+        exercise_name=original_set.exercise_name,
+        set_type=original_set.set_type,
+        reps=original_set.reps,
+        loading=original_set.loading,
+        rest=original_set.rest,
+        focus=original_set.focus,
+        notes=original_set.notes,
+        complete=False,  # Always start as incomplete
+        set_duration=None,
+        set_start_time=None,
+        is_active_set=False
     )
 
-    # ✅ Reset all sets to inactive
-    SetDict.objects.filter(workout_id=workout_id).update(is_active_set=False)
 
-    if next_set:
-        # ❌ Since a set was skipped, start immediately (no rest delay)
-        next_set.set_start_time = now()
-        next_set.is_active_set = True
-        next_set.save()
+SET_BATCH_OPERATIONS = {
+    "create", "update", "delete", "complete", "skip", "move", "duplicate"
+}
+
+
+def apply_set_operation(workout, operation):
+    """Applies one operation from a batch to a workout's sets.
+
+    Raises `ValidationError` for anything that cannot be applied; the
+    active set is left for the caller to recompute once the batch is done."""
+    op = operation.get("op") if isinstance(operation, dict) else None
+    if op not in SET_BATCH_OPERATIONS:
+        raise serializers.ValidationError(
+            {"op": f"Must be one of: {', '.join(sorted(SET_BATCH_OPERATIONS))}."}
+        )
+
+    if op == "create":
+        serializer = SetDictSerializer(data=operation.get("data", {}))
+        serializer.is_valid(raise_exception=True)
+        serializer.save(workout=workout)
+        return
+
+    try:
+        set_dict = SetDict.objects.get(id=operation.get("id"), workout=workout)
+    except (SetDict.DoesNotExist, ValueError, TypeError):
+        raise serializers.ValidationError({"id": "Set not found in this workout."})
+
+    if op == "update":
+        serializer = SetDictSerializer(
+            set_dict, data=operation.get("data", {}), partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+    elif op == "delete":
+        set_dict.delete()
+    elif op == "complete":
+        toggle_set_completion(set_dict)
+    elif op == "skip":
+        skip_set_to_end(set_dict)
+    elif op == "duplicate":
+        duplicate_set(set_dict)
+    elif op == "move":
+        position = operation.get("position")
+        if not isinstance(position, int) or position < 1:
+            raise serializers.ValidationError(
+                {"position": "Must be an integer of 1 or greater."}
+            )
+        move_set_to_position(set_dict, position)
+        publish_workout_event(workout.id, "reorder", set=set_dict.id)
 
 
 # ✅ Workout ViewSet
-class WorkoutViewSet(ModelViewSet):
+class WorkoutViewSet(WorkoutVersionMixin, ModelViewSet):
     """
     ViewSet for managing Workouts.
     - `list`: Retrieves all workouts (paginated).
@@ -88,23 +265,102 @@ class WorkoutViewSet(ModelViewSet):
     - `create`: Creates a new workout.
     - `update`: Updates a workout.
     - `destroy`: Deletes a workout.
+    - `bulk_destroy`: Deletes several workouts (`DELETE /api/workouts/?ids=1,2`).
+
+    Single-workout responses carry the workout's `version` as an `ETag` and
+    honour `If-None-Match` (304) and `If-Match` (412).
     """
 
     queryset = Workout.objects.all().order_by("-date")  # Default ordering
     serializer_class = WorkoutSerializer
+    pagination_class = WorkoutPagination
     permission_classes = [
         IsAuthenticated
     ]  # Ensures only authenticated users can access
 
     def get_queryset(self):
         """Ensure users only see their own workouts."""
-        return Workout.objects.filter(user=self.request.user).order_by("-date")
+        queryset = (
+            Workout.objects.filter(user=self.request.user)
+            .select_related("summary")
+            .order_by("-date")
+        )
+
+        if self.includes_sets():
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "set_dicts",
+                    queryset=SetDict.objects.with_positions().order_by(
+                        "set_order", "id"
+                    ),
+                )
+            )
+
+        return queryset
+
+    def get_versioned_workout_id(self):
+        """Conditional requests apply to single-workout routes."""
+        return self.kwargs.get("pk")
+
+    def get_object(self):
+        workout = super().get_object()
+        if self.request.method in SAFE_METHODS:
+            self.workout_version = (workout.id, workout.version)
+        return workout
+
+    def get_serializer_class(self):
+        if self.includes_sets():
+            return WorkoutDetailSerializer
+        return super().get_serializer_class()
+
+    def includes_sets(self):
+        """`?include=sets` on retrieve embeds the workout's sets in one request."""
+        include = self.request.query_params.get("include", "")
+        return self.action == "retrieve" and "sets" in include.split(",")
 
     def perform_create(self, serializer):
         """Ensures the logged-in user is assigned to the created workout,
         logic moved from serializer."""
         serializer.save(user=self.request.user)
 
+    def perform_destroy(self, instance):
+        """Deletes the workout and its sets in bulk, skipping per-set signals."""
+        delete_workouts(Workout.objects.filter(id=instance.id))
+
+    def bulk_destroy(self, request, *args, **kwargs):
+        """Deletes the user's workouts listed in `?ids=`; ids of other users'
+        workouts are ignored."""
+        try:
+            ids = [int(i) for i in request.query_params.get("ids", "").split(",") if i]
+        except ValueError:
+            return Response(
+                {"error": "ids must be a comma-separated list of integers"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not ids:
+            return Response(
+                {"error": "ids is required"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        deleted = delete_workouts(
+            Workout.objects.filter(user=request.user, id__in=ids)
+        )
+        return Response({"deleted": deleted})
+
+    @action(detail=False, methods=["GET"])
+    def feed(self, request):
+        """Lists workouts with set counts, distinct exercises and total volume
+        from their summaries, joined in the same query, so the feed needs no
+        set requests."""
+        queryset = self.get_queryset()
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = WorkoutSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        return Response(WorkoutSerializer(queryset, many=True).data)
+
     @action(detail=True, methods=["POST"])
     def duplicate(self, request, pk=None):
         """Duplicates a workout and its sets."""
@@ -123,6 +379,7 @@ class WorkoutViewSet(ModelViewSet):
                 SetDict(
                     workout=new_workout,
                     exercise_name=s.exercise_name,
+                    exercise_id=s.exercise_id,
                     set_number=s.set_number,
                     set_order=s.set_order,
                     set_type=s.set_type,
@@ -135,6 +392,9 @@ class WorkoutViewSet(ModelViewSet):
                 for s in og_workout_sets
             ]
         )
+        rebuild_workout_summaries([new_workout.id])  # ✅ bulk_create skips the signals
+        # ✅ The summary cached on `new_workout` predates the rebuild
+        new_workout = Workout.objects.select_related("summary").get(id=new_workout.id)
 
         return Response(
             {
@@ -144,6 +404,114 @@ class WorkoutViewSet(ModelViewSet):
             status=201,
         )
 
+    @action(detail=True, methods=["PATCH"])
+    def reorder(self, request, pk=None):
+        """Replaces the workout's running order with a full ordered list of set ids.
+
+        Returns a `version` token for the new order; sending it back as `version`
+        on the next reorder rejects the request if the sets changed meanwhile."""
+        workout = self.get_object()
+        set_ids = request.data.get("set_ids")
+
+        if not isinstance(set_ids, list) or not all(
+            isinstance(set_id, int) for set_id in set_ids
+        ):
+            return Response(
+                {"error": "set_ids must be a list of set ids"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with transaction.atomic():
+            # ✅ Serialise concurrent reorders of the same workout
+            lock_workout(workout.id)
+
+            current = [
+                (set_id, exercise_key(exercise_id, exercise_name))
+                for set_id, exercise_id, exercise_name in SetDict.objects.filter(
+                    workout=workout
+                )
+                .order_by("set_order", "id")
+                .values_list("id", "exercise_id", "exercise_name")
+            ]
+            expected_version = request.data.get("version")
+            if expected_version and expected_version != order_version(
+                set_id for set_id, _ in current
+            ):
+                return Response(
+                    {"error": "Workout sets changed since this order was loaded"},
+                    status=status.HTTP_409_CONFLICT,
+                )
+
+            exercises = dict(current)
+            if len(set_ids) != len(exercises) or set(set_ids) != set(exercises):
+                return Response(
+                    {"error": "set_ids must list every set in the workout exactly once"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            apply_set_order([(set_id, exercises[set_id]) for set_id in set_ids])
+            bump_workout_version(workout.id)  # ✅ The bulk UPDATE skips the signals
+            publish_workout_event(workout.id, "reorder")
+
+        sets = SetDict.objects.filter(workout=workout).with_positions().order_by(
+            "set_order"
+        )
+        return Response(
+            {
+                "message": "Workout sets reordered",
+                "version": order_version(set_ids),
+                "sets": SetDictSerializer(sets, many=True).data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @action(
+        detail=True, methods=["POST"], url_path="sets/batch", url_name="sets-batch"
+    )
+    def sets_batch(self, request, pk=None):
+        """Applies an ordered list of set operations in one transaction.
+
+        Each operation is `{"op": ..., "id": ..., "data": {...}, "position": n}`
+        with `op` one of create, update, delete, complete, skip, move or
+        duplicate. If any operation fails, none are applied. The active set
+        is recomputed once, after the last operation."""
+        workout = self.get_object()
+        operations = request.data.get("operations")
+
+        if not isinstance(operations, list) or not operations:
+            return Response(
+                {"error": "operations must be a non-empty list"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with transaction.atomic():
+            # ✅ Serialise concurrent batches against the same workout
+            lock_workout(workout.id)
+
+            for index, operation in enumerate(operations):
+                try:
+                    apply_set_operation(workout, operation)
+                except serializers.ValidationError as error:
+                    transaction.set_rollback(True)  # ✅ All or nothing
+                    return Response(
+                        {"operation": index, "errors": error.detail},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+
+            update_active_set(workout.id)
+            publish_workout_event(workout.id, "sets_changed")
+
+        sets = SetDict.objects.filter(workout=workout).with_positions().order_by(
+            "set_order"
+        )
+        return Response(
+            {
+                "message": f"{len(operations)} operations applied",
+                "sets": SetDictSerializer(sets, many=True).data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
     @action(detail=True, methods=["PATCH"])
     def start_workout(self, request, pk=None):
         """Starts or restarts a workout timer."""
@@ -151,7 +519,11 @@ class WorkoutViewSet(ModelViewSet):
 
         if workout.start_time is None:
             workout.start_time = now()
-            workout.save()
+            # ✅ Only the timer, so a stale `active_set` is never written back
+            workout.save(update_fields=["start_time", "updated_at"])
+            publish_workout_event(
+                workout.id, "workout_timer", start_time=workout.start_time
+            )
             update_active_set(workout.id)
 
             return Response(
@@ -189,7 +561,14 @@ class WorkoutViewSet(ModelViewSet):
         if not workout.complete:
             workout.duration = int((now() - workout.start_time).total_seconds())
             workout.complete = True
-            workout.save()
+            workout.save(update_fields=["duration", "complete", "updated_at"])
+            publish_workout_event(
+                workout.id,
+                "workout_timer",
+                start_time=workout.start_time,
+                complete=True,
+                duration=workout.duration,
+            )
             return Response(
                 {
                     "message": "Workout marked complete!",
@@ -206,12 +585,16 @@ class WorkoutViewSet(ModelViewSet):
 
 
 # ✅ SetDict ViewSet
-class SetDictViewSet(ModelViewSet):
-    """ViewSet for managing sets"""
+class SetDictViewSet(WorkoutVersionMixin, ModelViewSet):
+    """ViewSet for managing sets
+
+    Sets share their workout's `version` as an `ETag`, so a workout's sets
+    list (`?workout=`) and each set honour `If-None-Match` and `If-Match`."""
 
     queryset = SetDict.objects.all().order_by("set_order")
     serializer_class = SetDictSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = SetDictPagination
 
     def get_queryset(self):
         """Ensure users only see their own sets & allow filtering by workout"""
@@ -226,13 +609,72 @@ class SetDictViewSet(ModelViewSet):
 
         return queryset
 
+    def get_versioned_workout_id(self):
+        """A set's workout, the `?workout=` filter, or the workout written to."""
+        pk = self.kwargs.get("pk")
+        if pk is not None:
+            try:
+                return (
+                    SetDict.objects.filter(id=pk, workout__user=self.request.user)
+                    .values_list("workout_id", flat=True)
+                    .first()
+                )
+            except (ValueError, TypeError):
+                return None
+
+        workout_id = self.request.query_params.get("workout")
+        if workout_id is None and self.request.method not in SAFE_METHODS:
+            if isinstance(self.request.data, dict):
+                workout_id = self.request.data.get("workout")
+        return workout_id
+
+    def get_locked_object(self):
+        """Returns the requested set after locking its workout, read once the
+        lock is held so it reflects any write that finished while waiting.
+        Must be called inside a transaction."""
+        pk = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        # ✅ Finds and locks only the workout row, through the set it owns
+        workout = generics.get_object_or_404(
+            Workout.objects.select_for_update(of=("self",)).filter(
+                user=self.request.user
+            ),
+            set_dicts=pk,
+        )
+        # ✅ Read under the lock, so the state the save hooks diff against
+        # is the one every later write starts from
+        set_dict = generics.get_object_or_404(SetDict, pk=pk, workout=workout)
+        self.check_object_permissions(self.request, set_dict)
+        set_dict.workout = workout
+        return set_dict
+
+    def record_written_version(self, workout_id, versions):
+        """Uses the version a `workout_write` block ended on as the ETag."""
+        if workout_id in versions:
+            self.workout_version = (workout_id, versions[workout_id])
+
+    def list(self, request, *args, **kwargs):
+        """Lists sets a page at a time, reporting each set's position
+        within its whole workout rather than within the page."""
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        sets = attach_positions(page if page is not None else list(queryset))
+        serializer = self.get_serializer(sets, many=True)
+
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
     def perform_create(self, serializer):
         """Handle set creation by getting workout instance from the request data"""
         workout_id = self.request.data.get('workout')
         if workout_id:
             try:
                 workout = Workout.objects.get(id=workout_id, user=self.request.user)
-                serializer.save(workout=workout)
+                with transaction.atomic(), workout_write() as versions:
+                    lock_workout(workout.id)  # ✅ Appends queue up per workout
+                    serializer.save(workout=workout)
+                    publish_workout_event(workout.id, "sets_changed")
+                self.record_written_version(workout.id, versions)
             except Workout.DoesNotExist:
                 raise serializers.ValidationError(
                     {"workout": "Workout not found or you don't have permission to access it."}
@@ -242,32 +684,87 @@ class SetDictViewSet(ModelViewSet):
                 {"workout": "Workout ID is required."}
             )
 
+    def update(self, request, *args, **kwargs):
+        """Updates a set while holding its workout's lock, as a rename renumbers sets.
+
+        The set is read under the lock, so fields the request leaves alone
+        (completion, the active set, the running order) keep whatever a
+        concurrent write just gave them."""
+        partial = kwargs.pop("partial", False)
+        with transaction.atomic(), workout_write() as versions:
+            set_dict = self.get_locked_object()
+            serializer = self.get_serializer(set_dict, data=request.data, partial=partial)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+            publish_workout_event(set_dict.workout_id, "sets_changed")
+        self.record_written_version(set_dict.workout_id, versions)
+        attach_positions([set_dict])
+        return Response(serializer.data)
+
+    def perform_destroy(self, instance):
+        """Deletes a set while holding its workout's lock, as the delete renumbers sets."""
+        with transaction.atomic(), workout_write() as versions:
+            lock_workout(instance.workout_id)
+            workout_id = instance.workout_id
+            instance.delete()
+            publish_workout_event(workout_id, "sets_changed")
+        self.record_written_version(workout_id, versions)
+
+    @action(detail=False, methods=["POST"])
+    def bulk(self, request):
+        """Creates a list of sets at the end of a workout in one insert."""
+        try:
+            workout = Workout.objects.get(
+                id=request.data.get("workout"), user=request.user
+            )
+        except (Workout.DoesNotExist, ValueError, TypeError):
+            return Response(
+                {"workout": "Workout not found or you don't have permission to access it."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = SetDictSerializer(data=request.data.get("sets"), many=True)
+        serializer.is_valid(raise_exception=True)
+
+        if not serializer.validated_data:
+            return Response(
+                {"sets": "At least one set is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with transaction.atomic(), workout_write() as versions:
+            lock_workout(workout.id)
+            new_sets = number_appended_sets(
+                workout.id,
+                link_exercises(
+                    [SetDict(workout=workout, **data) for data in serializer.validated_data]
+                ),
+            )
+            created_sets = SetDict.objects.bulk_create(new_sets)
+            bump_workout_version(workout.id)  # ✅ bulk_create skips the signals
+            rebuild_workout_summaries([workout.id])
+            if any(holds_record(s.complete, s.loading, s.reps) for s in created_sets):
+                rebuild_user_records([request.user.id])
+            publish_workout_event(workout.id, "sets_changed")
+        self.record_written_version(workout.id, versions)
+
+        return Response(
+            {
+                "message": f"{len(created_sets)} sets created",
+                "sets": SetDictSerializer(created_sets, many=True).data,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
     @action(detail=True, methods=["POST"])
     def duplicate(self, request, pk=None):
         """Duplicates a set within the same workout."""
-        original_set = self.get_object()
-        workout = original_set.workout
-
-        # Get the maximum set_order for this workout
-        max_set_order = SetDict.objects.filter(workout=workout).count()
-
-        # Create new set with incremented set_order
-        new_set = SetDict.objects.create(
-            workout=workout,
-            exercise_name=original_set.exercise_name,
-            set_type=original_set.set_type,
-            reps=original_set.reps,
-            loading=original_set.loading,
-            rest=original_set.rest,
-            focus=original_set.focus,
-            notes=original_set.notes,
-            set_order=max_set_order + 1,  # Place at the end
-            set_number=max_set_order + 1,  # New set number
-            complete=False,  # Always start as incomplete
-            set_duration=None,
-            set_start_time=None,
-            is_active_set=False
-        )
+        with transaction.atomic(), workout_write() as versions:
+            original_set = self.get_locked_object()
+            new_set = duplicate_set(original_set)
+            publish_workout_event(new_set.workout_id, "sets_changed")
+        self.record_written_version(new_set.workout_id, versions)
+        attach_positions([new_set])
 
         return Response(
             {
@@ -280,29 +777,22 @@ class SetDictViewSet(ModelViewSet):
     @action(detail=True, methods=["PATCH"])
     def complete_set(self, request, pk=None):
         """Mark a SetDict as Complete or Undo Completion"""
-        set_dict = self.get_object()
-        workout = set_dict.workout
-
-        if set_dict.complete:  # ✅ Undo completion
-            set_dict.complete = False
-            set_dict.set_duration = None
-            set_dict.set_start_time = None
-        else:  # ✅ Marking set as complete
-            set_dict.complete = True
-            if set_dict.set_start_time and set_dict.set_start_time <= now():
-                set_dict.set_duration = int(
-                    (now() - set_dict.set_start_time).total_seconds()
-                )
-
-        set_dict.save()
+        with transaction.atomic(), workout_write() as versions:
+            set_dict = toggle_set_completion(self.get_locked_object())
 
-        # 🔥 Update which set is now active
-        update_active_set(workout.id)
+            # 🔥 Update which set is now active via the workout's pointer
+            active_set = activate_next_set(set_dict.workout)
+        self.record_written_version(set_dict.workout_id, versions)
+        # ✅ Both positions from one windowed query
+        attach_positions([s for s in (set_dict, active_set) if s])
 
         return Response(
             {
                 "message": f"Set {set_dict.id} completion status changed",
                 "set": SetDictSerializer(set_dict).data,
+                "active_set": (
+                    SetDictSerializer(active_set).data if active_set else None
+                ),
             },
             status=status.HTTP_200_OK,
         )
@@ -310,23 +800,13 @@ class SetDictViewSet(ModelViewSet):
     @action(detail=True, methods=["PATCH"])
     def skip_set(self, request, pk=None):
         """Moves a set to the last position in `set_order`."""
-        set_dict = self.get_object()
-        workout = set_dict.workout
-
-        max_set_order = SetDict.objects.filter(workout_id=workout.id).count()
+        with transaction.atomic(), workout_write() as versions:
+            set_dict = skip_set_to_end(self.get_locked_object())
 
-        """We move the set_dict beyond the last position in the running order,
-        because the post save signal ensures a consistent running order,
-        so by pushing the skipped set beyond that,
-        we escape race conditions of indexing conflicts."""
-        set_dict.set_order = max_set_order + 1  # Moves set beyond last position
-
-        set_dict.is_active_set = False  # 🔥 Ensure skipped sets aren't active
-        set_dict.set_start_time = None
-        set_dict.save()
-
-        # 🔥 Update which set is now active
-        skip_active_set(workout.id, set_dict)
+            # 🔥 Update which set is now active
+            skip_active_set(set_dict.workout_id, set_dict)
+        self.record_written_version(set_dict.workout_id, versions)
+        attach_positions([set_dict])
 
         return Response(
             {
@@ -338,47 +818,232 @@ class SetDictViewSet(ModelViewSet):
 
     @action(detail=True, methods=["PATCH"])
     def move_set(self, request, pk=None):
-        """Moves a set to a new position,
-        keeping all other sets ordered sequentiallly."""
+        """Moves a set to a new position in the workout's running order.
+        Only the moved set, or at most the sets it moves past, are written."""
 
         set_dict = self.get_object()
-        workout = set_dict.workout
-
-        new_position = int(request.data.get("new_position"))
 
         try:
-            with transaction.atomic():  # ✅ Ensure atomicity
-                set_to_move = SetDict.objects.get(id=set_dict.id, workout_id=workout.id)
-
-                # 🚀 Temporarily disable the signal
-                local_storage.disable_reorder_signal = True
-
-                # ✅ Shift all other sets down/up
-                affected_sets = (
-                    SetDict.objects.filter(workout=workout.id)
-                    .exclude(id=set_dict.id)
-                    .order_by("set_order")
-                )
-                for index, set_instance in enumerate(affected_sets, start=1):
-                    set_instance.set_order = (
-                        index if index < new_position else index + 1
-                    )
-
-                SetDict.objects.bulk_update(affected_sets, ["set_order"])
+            new_position = int(request.data.get("new_position"))
+        except (TypeError, ValueError):
+            return Response(
+                {"error": "new_position must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-                # ✅ Assign new position to the moved set
-                set_to_move.set_order = new_position
-                set_to_move.save()
+        if new_position < 1:
+            return Response(
+                {"error": "new_position must be 1 or greater"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-                # ✅ Re-enable the signal
-                local_storage.disable_reorder_signal = False
+        try:
+            # ✅ Locks the set and shifts only what it passes, in one transaction
+            move_set_to_position(set_dict, new_position)
+            publish_workout_event(set_dict.workout_id, "reorder", set=set_dict.id)
 
             return Response(
                 {
                     "message": f"Set {set_dict.id} moved to position {new_position}",
-                    "set": SetDictSerializer(set_to_move).data,
+                    "set": SetDictSerializer(set_dict).data,
                 }
             )
 
         except SetDict.DoesNotExist:
             return Response({"error": "Set not found"}, status=404)
+
+
+# 📈 Analytics
+def parse_date_range(query_params):
+    """Reads inclusive `from` and `to` dates (YYYY-MM-DD) from the query.
+
+    Returns `(date_from, date_to, errors)`; missing dates are None."""
+    dates, errors = {}, {}
+    for param in ("from", "to"):
+        value = query_params.get(param)
+        if not value:
+            dates[param] = None
+            continue
+        try:
+            dates[param] = parse_date(value)
+        except ValueError:
+            dates[param] = None
+        if dates[param] is None:
+            errors[param] = "Must be a date in YYYY-MM-DD format."
+    return dates["from"], dates["to"], errors
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def exercise_analytics(request, exercise_name):
+    """Charts the user's progress on one exercise: best set, estimated 1RM,
+    volume and reps per session, or per `bucket=day|week|month`.
+
+    Long histories are downsampled to at most `points` points; `from` and
+    `to` limit the workout dates."""
+    bucket = request.query_params.get("bucket", "session")
+    if bucket not in PROGRESS_BUCKETS:
+        return Response(
+            {"bucket": f"Must be one of: {', '.join(PROGRESS_BUCKETS)}."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        points = int(request.query_params.get("points", DEFAULT_PROGRESS_POINTS))
+    except ValueError:
+        points = 0
+    if not 1 <= points <= MAX_PROGRESS_POINTS:
+        return Response(
+            {"points": f"Must be an integer from 1 to {MAX_PROGRESS_POINTS}."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    date_from, date_to, errors = parse_date_range(request.query_params)
+    if errors:
+        return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(
+        {
+            "exercise_name": exercise_name,
+            "bucket": bucket,
+            "points": exercise_progress(
+                request.user, exercise_name, bucket, points, date_from, date_to
+            ),
+        }
+    )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def load_analytics(request):
+    """Charts the user's daily training load: rolling 7- and 28-day load,
+    acute:chronic workload ratio, monotony and strain, one column each.
+
+    `from` and `to` limit the days shown; the series runs to today by default."""
+    date_from, date_to, errors = parse_date_range(request.query_params)
+    if not errors and date_from and date_to and date_from > date_to:
+        errors["from"] = "Must not be after `to`."
+    if errors:
+        return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(training_load(request.user, date_from, date_to))
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def muscle_analytics(request):
+    """Weekly completed sets and volume per muscle for a heatmap, with
+    synergists credited a fraction of each set.
+
+    `from` and `to` limit the workout dates; `muscle` keeps one muscle."""
+    date_from, date_to, errors = parse_date_range(request.query_params)
+    if errors:
+        return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(
+        {
+            "from": date_from,
+            "to": date_to,
+            "synergist_weight": SYNERGIST_WEIGHT,
+            "totals": muscle_volume(
+                request.user,
+                date_from,
+                date_to,
+                request.query_params.get("muscle") or None,
+            ),
+        }
+    )
+
+
+# 📡 Live session events, streamed over ASGI
+STREAM_KEEPALIVE_SECONDS = 15
+
+
+def format_server_sent_event(event):
+    """Formats a workout event as one `text/event-stream` message, using the
+    workout's version as the event id."""
+    data = json.dumps(event, cls=DjangoJSONEncoder)
+    return f"id: {event['version']}\nevent: {event['event']}\ndata: {data}\n\n"
+
+
+def authenticate_stream_user(request):
+    """Authenticates an event stream by JWT. Browsers' EventSource can't set
+    headers, so the access token may also be sent as `?token=`."""
+    authenticator = JWTAuthentication()
+    header = authenticator.get_header(request)
+    raw_token = authenticator.get_raw_token(header) if header else None
+    raw_token = raw_token or request.GET.get("token")
+    if not raw_token:
+        return None
+
+    try:
+        return authenticator.get_user(authenticator.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+def workout_snapshot(user, workout_id):
+    """Returns the current live-session state of a user's workout as an event."""
+    workout = (
+        Workout.objects.filter(id=workout_id, user=user)
+        .select_related("active_set")
+        .first()
+    )
+    if workout is None:
+        return None
+
+    active_set = workout.active_set
+    return {
+        "workout": workout.id,
+        "version": workout.version,
+        "event": "snapshot",
+        "data": {
+            "start_time": workout.start_time,
+            "complete": workout.complete,
+            "duration": workout.duration,
+            "active_set": SetDictSerializer(active_set).data if active_set else None,
+        },
+    }
+
+
+async def workout_events(request, pk):
+    """Streams a workout's live-session events as server-sent events.
+
+    Starts with a `snapshot` of the session, then pushes `active_set`,
+    `set_completed`, `reorder`, `sets_changed` and `workout_timer` events as
+    they are committed by any worker process."""
+    user = await sync_to_async(authenticate_stream_user)(request)
+    if user is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."}, status=401
+        )
+
+    # ✅ Subscribe before reading the snapshot so no event falls in between
+    hub = get_event_hub()
+    queue = await hub.subscribe(pk)
+    snapshot = await sync_to_async(workout_snapshot)(user, pk)
+    if snapshot is None:
+        hub.unsubscribe(pk, queue)
+        return JsonResponse({"detail": "Not found."}, status=404)
+
+    async def stream():
+        try:
+            yield format_server_sent_event(snapshot)
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), STREAM_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"  # ✅ Keeps proxies from closing the stream
+                    continue
+                if event is None:
+                    return  # ❌ Lost the listener; the client reconnects
+                yield format_server_sent_event(event)
+        finally:
+            hub.unsubscribe(pk, queue)
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # ✅ Don't let proxies buffer events
+    return response
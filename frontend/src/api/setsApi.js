@@ -7,46 +7,31 @@ export const getSets = async (params = {}) => {
 }
 
 export const getSetsByWorkoutId = async (workoutId, params = {}) => {
-    // First request to get initial data and total count
-    const initialResponse = await apiClient.get('/sets/', {
-        params: {
-            ...params,
-            workout: workoutId,
-            page: 1,
-        },
-    })
-
-    const { count, results } = initialResponse.data
-    let allSets = [...results]
-
-    // Calculate number of additional pages needed based on the actual page size we received
-    const actualPageSize = results.length
-    const totalPages = Math.ceil(count / actualPageSize)
+    // Pages are cursor based: keep following `next` until it runs out
+    let cursor = null
+    let allSets = []
+    let firstPage = null
 
-    // Fetch remaining pages if any
-    if (totalPages > 1) {
-        const remainingPages = Array.from(
-            { length: totalPages - 1 },
-            (_, i) => i + 2
-        )
-
-        // Fetch each page sequentially to ensure order
-        for (const page of remainingPages) {
-            const response = await apiClient.get('/sets/', {
-                params: {
-                    ...params,
-                    workout: workoutId,
-                    page,
-                },
-            })
-            const pageResults = response.data.results
-            allSets = [...allSets, ...pageResults]
-        }
-    }
+    do {
+        const response = await apiClient.get('/sets/', {
+            params: {
+                ...params,
+                workout: workoutId,
+                page_size: 100,
+                ...(cursor ? { cursor } : {}),
+            },
+        })
+        firstPage = firstPage || response.data
+        allSets = [...allSets, ...response.data.results]
+        cursor = response.data.next
+            ? new URL(response.data.next).searchParams.get('cursor')
+            : null
+    } while (cursor)
 
     // Return in the same format as the API, but with all results
     return {
-        ...initialResponse.data,
+        ...firstPage,
+        count: allSets.length,
         results: allSets,
         next: null, // Since we've fetched everything
         previous: null,
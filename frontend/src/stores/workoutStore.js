@@ -57,15 +57,20 @@ const useWorkoutStore = create(
                 set({ loading: true, error: null })
                 try {
                     let allWorkouts = []
-                    let currentPage = 1
+                    let cursor = null
                     let hasNextPage = true
 
                     while (hasNextPage) {
-                        const data = await getWorkouts({ page: currentPage })
+                        const data = await getWorkouts({
+                            page_size: 100,
+                            ...(cursor ? { cursor } : {}),
+                        })
                         if (data && Array.isArray(data.results)) {
                             allWorkouts = [...allWorkouts, ...data.results]
-                            hasNextPage = data.next !== null
-                            currentPage += 1
+                            cursor = data.next
+                                ? new URL(data.next).searchParams.get('cursor')
+                                : null
+                            hasNextPage = cursor !== null
                         } else {
                             hasNextPage = false
                         }